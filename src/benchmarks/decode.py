@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Decode time per packet type for what most of the TUI does, reading one field of
+one car, through the lazy dataclass records and through the NumPy column views.
+The first column builds all 22 records, as every decoder used to.
+Run from `src/` with `python -m benchmarks.decode`"""
+
+import argparse
+import os
+import timeit
+from dataclasses import fields
+
+from models import udp_arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Decode time per packet type, lazy dataclass records against NumPy column views",
+        epilog="Run from `src/` with `python -m benchmarks.decode`",
+    )
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(
+        f"{'':16} {'all 22 cars':>12} {'one car':>10} {'one column':>11} {'untouched':>10}"
+    )
+    for cls in udp_arrays.ARRAY_CLASSES.values():
+        packet = bytes(29) + os.urandom(cls.DTYPE.itemsize)
+        cars = cls.CARS
+        field = fields(cls.RECORD)[0].name
+
+        def per_packet(function) -> float:
+            return timeit.timeit(function, number=args.number) / args.number * 1e6
+
+        eager = per_packet(lambda: list(getattr(cls.PACKET.decode(packet), cars)))
+        lazy = per_packet(
+            lambda: getattr(getattr(cls.PACKET.decode(packet), cars)[3], field)
+        )
+        array = per_packet(lambda: cls.decode(packet)[field][3])
+        untouched = per_packet(lambda: cls.PACKET.decode(packet))
+
+        print(
+            f"{cls.PACKET.__name__:16} {eager:10.1f}us {lazy:8.1f}us"
+            f" {array:9.1f}us {untouched:8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
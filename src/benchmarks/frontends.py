@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""CPU for a second of updates and redraws through the Rich Live layout against
+the Textual app, both at the same frame rate and size, headless.
+Run from `src/` with `python -m benchmarks.frontends`"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.layout_render import run as run_live
+from benchmarks.layout_render import strings
+from models.textual_layout import RaceApp
+
+
+async def run_textual(rate: int, fps: int, changing: float) -> float:
+    app = RaceApp()
+    async with app.run_test(size=(160, 48)) as pilot:
+        await pilot.pause()
+        start = time.process_time()
+        for frame in range(rate):
+            for path, string in strings(frame, changing).items():
+                app.regions.show(path, string)
+            # Textual repaints whatever changed when the app gets to idle
+            if frame % (rate // fps) == 0:
+                await pilot.pause()
+        await pilot.pause()
+        return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU for a second of updates and redraws, Rich Live against the Textual app",
+        epilog="Run from `src/` with `python -m benchmarks.frontends`",
+    )
+    parser.add_argument("--rate", type=int, default=60, help="updates a second")
+    parser.add_argument("--fps", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'fast regions changing':>22} {'rich live':>12} {'textual':>12}")
+    for changing in (1.0, 0.25, 0.05, 0.0):
+        live = run_live(True, args.rate, args.fps, changing)
+        textual = asyncio.run(run_textual(args.rate, args.fps, changing))
+        print(f"{changing:>21.0%} {live * 1000:>10.1f}ms {textual * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
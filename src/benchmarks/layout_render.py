@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""CPU for a second of updates and redraws of the race layout, building a new
+Panel per region on every update against the panel registry, which leaves
+unchanged regions alone and reuses their rendered lines.
+Run from `src/` with `python -m benchmarks.layout_render`"""
+
+import argparse
+import io
+import time
+
+import rich
+from rich.console import Console
+from rich.panel import Panel
+
+from models import rich_layout
+from utils import layout_updaters
+
+# Every region the updaters write to
+REGIONS = [
+    ("header_upper", "track"),
+    ("header_lower", "position"),
+    ("header_lower", "track"),
+    ("header_lower", "lap", "completed_laps"),
+    ("header_lower", "lap", "total_laps"),
+    ("body", "right", "current_lap"),
+    ("body", "right", "my_best_lap"),
+    ("body", "right", "session_best"),
+    ("footer", "pit_info"),
+    *[
+        ("footer", group, axle, side)
+        for group in ("tyre_temp", "tyre_deg")
+        for axle in ("front", "rear")
+        for side in ("left", "right")
+    ],
+    *[
+        ("footer", "available_tyres", row, tyre)
+        for row, tyres in (("r1", ("soft", "hard")), ("r2", ("medium", "inter")))
+        for tyre in tyres
+    ],
+]
+# The ones telemetry and lap data touch every frame
+FAST_REGIONS = REGIONS[1:8] + REGIONS[9:13]
+
+
+def strings(frame: int, changing: float) -> dict:
+    """What each region shows at a frame, the fast regions changing on `changing`
+    of frames, as tyre temperatures or the lap timer would"""
+    step = int(frame * changing)
+    return {
+        path: f"{path[-1]}\n{step if path in FAST_REGIONS else 0}" for path in REGIONS
+    }
+
+
+def new_panels(layout, shown: dict):
+    for path, string in shown.items():
+        node = layout
+        for name in path:
+            node = node[name]
+        node.update(Panel(rich.text.Text(string, justify="center")))
+
+
+def run(registry: bool, rate: int, fps: int, changing: float) -> float:
+    layout = rich_layout.create_race_layout()
+    regions = layout_updaters.panels(layout)
+    console = Console(
+        file=io.StringIO(),
+        width=160,
+        height=48,
+        force_terminal=True,
+        color_system="truecolor",
+    )
+
+    start = time.process_time()
+    for frame in range(rate):
+        shown = strings(frame, changing)
+        if registry:
+            for path, string in shown.items():
+                regions.show(path, string)
+        else:
+            new_panels(layout, shown)
+
+        # Live draws at fps, whatever rate the updates come in at
+        if frame % (rate // fps) == 0 and (not registry or regions.take_dirty()):
+            console.print(layout)
+            console.file.seek(0)
+            console.file.truncate()
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU for a second of race layout updates and redraws, new Panels against the panel registry",
+        epilog="Run from `src/` with `python -m benchmarks.layout_render`",
+    )
+    parser.add_argument("--rate", type=int, default=60, help="updates a second")
+    parser.add_argument("--fps", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'fast regions changing':>22} {'new panels':>12} {'registry':>12}")
+    for changing in (1.0, 0.25, 0.05, 0.0):
+        before = run(False, args.rate, args.fps, changing)
+        after = run(True, args.rate, args.fps, changing)
+        print(f"{changing:>21.0%} {before * 1000:>10.1f}ms {after * 1000:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Memory per decoded packet, decode rate and garbage collector pauses for the
+protocol record classes, with every car's record built. The pauses come from a
+replayed race: synthetic frames of every per frame packet, decoded the way the
+TUI does it and kept as latest and previous like `State`. Steady state
+frees about as much as it allocates, so the extra cost a full collection pays
+for the packets held alive is reported too.
+Run from `src/` with `python -m benchmarks.records`"""
+
+import argparse
+import gc
+import os
+import statistics
+import time
+import timeit
+import tracemalloc
+
+from models import udp_protocol
+
+# The packets sent every frame, plus how many bytes follow the header
+FRAME_PACKETS = [
+    (udp_protocol.MotionPacket, "cars", udp_protocol.MOTION_STRUCT.size),
+    (udp_protocol.LapdataPacket, "cars", udp_protocol.LAPDATA_STRUCT.size),
+    (udp_protocol.TelemetryPacket, "statuses", udp_protocol.CARTELEMETRY_STRUCT.size),
+    (udp_protocol.StatusPacket, "statuses", udp_protocol.CARSTATUS_STRUCT.size),
+    (udp_protocol.DamagePacket, "statuses", udp_protocol.CARDAMAGE_STRUCT.size),
+]
+
+
+def decode(cls, cars: str, packet: bytes):
+    decoded = cls.decode(packet)
+    # Build every car, as the lap data panels do
+    list(getattr(decoded, cars))
+    return decoded
+
+
+def memory_per_packet(cls, cars: str, packet: bytes, count: int = 200) -> float:
+    tracemalloc.start()
+    kept = [decode(cls, cars, packet) for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / count
+
+
+def replay(frames: int, packets: list) -> tuple[list[float], dict]:
+    pauses = []
+    started = []
+
+    def timer(phase, info):
+        if phase == "start":
+            started.append(time.perf_counter())
+        else:
+            pauses.append(time.perf_counter() - started.pop())
+
+    # latest and previous of each packet, as State keeps them
+    shared = {}
+    gc.callbacks.append(timer)
+    try:
+        for _ in range(frames):
+            for cls, cars, packet in packets:
+                shared[cls] = (decode(cls, cars, packet), shared.get(cls, (None,))[0])
+    finally:
+        gc.callbacks.remove(timer)
+    return pauses, shared
+
+
+def full_collection(count: int = 100) -> float:
+    """Worst case pause, a full collection walking everything still alive"""
+    return statistics.median(timeit.repeat(gc.collect, number=1, repeat=count))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory per decoded packet, decode rate and garbage collector pauses of the protocol record classes",
+        epilog="Run from `src/` with `python -m benchmarks.records`",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=3600, help="60 Hz frames to replay"
+    )
+    args = parser.parse_args()
+
+    packets = [
+        (cls, cars, bytes(29) + os.urandom(size)) for cls, cars, size in FRAME_PACKETS
+    ]
+
+    print(f"{'':16} {'bytes/packet':>13} {'packets/s':>10}")
+    for cls, cars, packet in packets:
+        memory = memory_per_packet(cls, cars, packet)
+        number = 2000
+        rate = number / timeit.timeit(lambda: decode(cls, cars, packet), number=number)
+        print(f"{cls.__name__:16} {memory:13,.0f} {rate:10,.0f}")
+
+    gc.collect()
+    objects = len(gc.get_objects())
+    pauses, shared = replay(args.frames, packets)
+    print(
+        f"\nreplay of {args.frames} frames: {len(pauses)} collections,"
+        f" {sum(pauses) * 1000:.1f}ms total, {max(pauses, default=0) * 1000:.2f}ms worst"
+    )
+    print(
+        f"latest + previous packets alive: {len(gc.get_objects()) - objects:,} more"
+        f" tracked objects, full collection {full_collection() * 1000:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""CPU per packet to get decoded values from the processor to the TUI, pickling
+them through a Queue against publishing the raw packet in the state table.
+Pipe writes are left out, so the Queue numbers flatter it.
+Run from `src/` with `python -m benchmarks.state_handoff`"""
+
+import argparse
+import pickle
+import time
+
+from models import udp_protocol
+from utils import udp_processor
+from utils.state_table import StateTable
+
+# packet_id -> size of the packets sent every frame, which is what the handoff has to keep up with
+FRAME_PACKETS = {0: 1349, 2: 1285, 6: 1352, 7: 1239, 10: 1041, 13: 273}
+
+
+def make_packet(packet_id: int, length: int) -> bytes:
+    header = udp_protocol.HEADER_STRUCT.pack(
+        2025, 25, 1, 0, 1, packet_id, 0, 0.0, 0, 0, 0, 255
+    )
+    return header + bytes(length - len(header))
+
+
+def queue_handoff(packets: list[bytes]):
+    for packet in packets:
+        item = udp_processor.decode_udp(packet, len(packet))
+        pickle.loads(pickle.dumps(item))
+
+
+def table_handoff(packets: list[bytes], table: StateTable, reader: StateTable):
+    for packet in packets:
+        udp_processor.publish_udp(table, packet)
+        for changed in reader.changes():
+            udp_processor.decode_udp(changed, len(changed))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU per packet to hand decoded values to the TUI, Queue pickling against the state table",
+        epilog="Run from `src/` with `python -m benchmarks.state_handoff`",
+    )
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args()
+
+    packets = [make_packet(*packet) for packet in FRAME_PACKETS.items()] * args.frames
+    table = StateTable.create()
+    reader = StateTable.attach(table.shm.name, reader=0)
+
+    for label, run in [
+        ("decode + pickle round trip", lambda: queue_handoff(packets)),
+        ("state table + decode", lambda: table_handoff(packets, table, reader)),
+    ]:
+        start = time.process_time()
+        run()
+        per_packet = (time.process_time() - start) / len(packets)
+        print(f"{label:28} {per_packet * 1e6:8.1f}us per packet")
+
+    reader.close()
+    table.close()
+    table.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Packets-per-second of the copying receive loop against the zero-copy one.
+Run from `src/` with `python -m benchmarks.udp_receive`"""
+
+import argparse
+import os
+import socket
+import time
+from multiprocessing import Event, Process
+
+from utils import udp_receiver
+from utils.packet_ring import PacketRing
+
+# Sizes of every packet type the game sends, so the mix looks like a real session
+PACKET_SIZES = [1349, 753, 1285, 45, 1284, 1133, 1352, 1239, 1460, 231, 273, 1131]
+
+
+def flood(port: int, stop):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    payloads = [os.urandom(size) for size in PACKET_SIZES]
+    while not stop.is_set():
+        for payload in payloads:
+            sock.sendto(payload, ("127.0.0.1", port))
+
+
+def measure(receive, seconds: float, senders: int, batch_size: int):
+    ring = PacketRing.create()
+
+    sock = udp_receiver.open_socket("127.0.0.1", 0)
+    sock.settimeout(1.0)
+    port = sock.getsockname()[1]
+
+    stop = Event()
+    floods = [
+        Process(target=flood, args=(port, stop), daemon=True) for _ in range(senders)
+    ]
+    for proc in floods:
+        proc.start()
+
+    received = 0
+    try:
+        # Let the senders fill the socket before timing
+        receive(sock, ring, batch_size)
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        while time.perf_counter() - start < seconds:
+            received += receive(sock, ring, batch_size)
+        cpu = time.process_time() - cpu_start
+    finally:
+        stop.set()
+        for proc in floods:
+            proc.join()
+        sock.close()
+        ring.close()
+        ring.unlink()
+
+    # Senders compete for the same cores, so the receiver's own CPU time is the fair measure
+    return received / cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Packets per second of the copying receive loop against the zero copy one",
+        epilog="Run from `src/` with `python -m benchmarks.udp_receive`",
+    )
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--senders", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    before = measure(
+        udp_receiver.receive_copy, args.seconds, args.senders, args.batch_size
+    )
+    after = measure(
+        udp_receiver.receive_into, args.seconds, args.senders, args.batch_size
+    )
+
+    print(f"recvfrom + copy : {before:12,.0f} packets per receiver CPU second")
+    print(f"recv_into batch : {after:12,.0f} packets per receiver CPU second")
+    print(f"speedup         : {after / before:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Latency from publish to pickup, and consumer CPU while mostly idle, for the
+sleep polling consumers against the event driven ones.
+Run from `src/` with `python -m benchmarks.wakeup_latency`"""
+
+import argparse
+import random
+import statistics
+import time
+from multiprocessing import Process, Queue
+
+from utils import packet_ring
+from utils.packet_ring import PacketRing
+
+
+def ring_consumer(name: str, count: int, poll: bool, results: Queue):
+    ring = PacketRing.attach(name, packet_ring.PROCESSOR_READER, "bench")
+    results.put(None)  # attached
+    latencies = []
+    cpu_start = time.process_time()
+
+    while len(latencies) < count:
+        data = ring.read()
+        if data is not None:
+            latencies.append(time.perf_counter_ns() - int.from_bytes(data))
+        elif poll:
+            time.sleep(0.01)  # Old processor backoff
+        else:
+            ring.wait(timeout=1.0)
+
+    results.put((latencies, time.process_time() - cpu_start))
+    ring.close()
+
+
+def queue_consumer(items: Queue, count: int, poll: bool, results: Queue):
+    results.put(None)
+    latencies = []
+    cpu_start = time.process_time()
+
+    while len(latencies) < count:
+        if poll:
+            # Old TUI main loop
+            if not items.empty():
+                sent = items.get()
+            else:
+                time.sleep(0.5)
+                continue
+        else:
+            sent = items.get()
+        latencies.append(time.perf_counter_ns() - sent)
+
+    results.put((latencies, time.process_time() - cpu_start))
+
+
+def run(stage: str, poll: bool, count: int, gap: float):
+    results = Queue()
+
+    if stage == "ring":
+        ring = PacketRing.create()
+        consumer = Process(
+            target=ring_consumer, args=(ring.shm.name, count, poll, results)
+        )
+    else:
+        items = Queue()
+        consumer = Process(target=queue_consumer, args=(items, count, poll, results))
+
+    consumer.start()
+    results.get()
+
+    # Packets arrive after idle gaps, which is where polling hurts
+    for _ in range(count):
+        time.sleep(random.uniform(gap / 2, gap * 1.5))
+        if stage == "ring":
+            ring.write_payload[:8] = time.perf_counter_ns().to_bytes(8)
+            ring.publish(8)
+            ring.notify()
+        else:
+            items.put(time.perf_counter_ns())
+
+    latencies, cpu = results.get()
+    consumer.join()
+    if stage == "ring":
+        ring.close()
+        ring.unlink()
+
+    latencies = sorted(latency / 1e6 for latency in latencies)
+    return (
+        statistics.median(latencies),
+        latencies[int(len(latencies) * 0.99) - 1],
+        cpu,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Publish to pickup latency and idle consumer CPU, sleep polling against event driven",
+        epilog="Run from `src/` with `python -m benchmarks.wakeup_latency`",
+    )
+    parser.add_argument("--count", type=int, default=40)
+    parser.add_argument("--gap", type=float, default=0.1, help="mean idle gap, s")
+    args = parser.parse_args()
+
+    print(f"{'':34} {'median':>9} {'p99':>9} {'consumer CPU':>13}")
+    for stage, before, after in [
+        ("ring", "sleep(0.01) poll", "doorbell wait"),
+        ("queue", "empty() + sleep(0.5)", "blocking get"),
+    ]:
+        for label, poll in [(before, True), (after, False)]:
+            median, p99, cpu = run(stage, poll, args.count, args.gap)
+            print(
+                f"{stage:>5} {label:28} {median:7.3f}ms {p99:7.3f}ms {cpu * 1000:10.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Everything the front ends know about the session, latest and previous of each
+packet. Every assignment to a field bumps its version, so anything derived from
+it can tell whether it needs working out again, and wakes whatever subscribed"""
+
+import copy
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields
+
+from models import udp_arrays, udp_protocol
+from models.track_geometry import TrackGeometry
+from utils.channel_history import ChannelHistory
+from utils.gap_table import GapTable
+from utils.lap_delta import LapDelta
+from utils.position_index import PositionIndex
+from utils.tyre_inventory import TyreInventory
+
+
+def _per_car() -> list:
+    return [None] * 22
+
+
+@dataclass(slots=True, eq=False)
+class State:
+    """The latest of each packet, with a version per field. `version` counts every
+    change, and `versions[name]` is the value it had when name last changed, so a
+    reader keeping the version it last looked at can ask `changed_since` of any
+    field. Fields are set as attributes as before, per car lists through `set_item`"""
+
+    # Set first, __init__ setting the fields below already counts as changing them
+    version: int = field(default=0, init=False, repr=False)
+    versions: Counter = field(default_factory=Counter, init=False, repr=False)
+    subscribers: defaultdict = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False
+    )
+
+    # Header
+    header: udp_protocol.Header | None = None
+
+    # Header 0
+    prev_motion: udp_arrays.MotionArray | None = None
+    motion: udp_arrays.MotionArray | None = None
+
+    # Header 1
+    prev_session: udp_protocol.SessionPacket | None = None
+    session: udp_protocol.SessionPacket | None = None
+    track: TrackGeometry | None = None
+
+    # Header 2
+    prev_lapdata: udp_arrays.LapdataArray | None = None
+    lapdata: udp_arrays.LapdataArray | None = None
+    prev_positions: PositionIndex | None = None
+    positions: PositionIndex | None = None
+    lap_delta: LapDelta | None = None
+    gaps: GapTable | None = None
+
+    # Header 3
+    event: udp_protocol.EventPacket | None = None
+    event_fastest_lap: dict | None = None
+
+    # Header 4
+    participants_cache: int = 0
+    participants: list | None = None
+
+    # Header 5
+    prev_setup: udp_arrays.SetupArray | None = None
+    setup: udp_arrays.SetupArray | None = None
+
+    # Header 6
+    prev_telemetry: udp_arrays.TelemetryArray | None = None
+    telemetry: udp_arrays.TelemetryArray | None = None
+
+    # Header 7
+    prev_status: udp_arrays.StatusArray | None = None
+    status: udp_arrays.StatusArray | None = None
+
+    # Header 8
+    prev_classification: udp_protocol.ClassificationPacket | None = None
+    classification: udp_protocol.ClassificationPacket | None = None
+
+    # Header 9
+    lobby_cache: int = 0
+    lobby: udp_protocol.LobbyPacket | None = None
+
+    # Header 10
+    prev_damage: udp_arrays.DamageArray | None = None
+    damage: udp_arrays.DamageArray | None = None
+
+    # Header 11
+    player_histories: int = 0
+    history: list[dict | None] = field(default_factory=_per_car)
+
+    # Header 12
+    tyres: list[dict | None] = field(default_factory=_per_car)
+    tyre_inventory: TyreInventory = field(default_factory=TyreInventory)
+
+    # Header 13
+    prev_exmotion: udp_protocol.ExMotion | None = None
+    exmotion: udp_protocol.ExMotion | None = None
+
+    # Header 14
+    prev_timetrial: udp_protocol.TimeTrialPacket | None = None
+    timetrial: udp_protocol.TimeTrialPacket | None = None
+
+    # Header 15
+    position_history: udp_protocol.LapPositionPacket | None = None
+
+    # Recent motion, telemetry, status and damage for trends, kept when a front end
+    # is started with --channel-history. Shared by snapshots rather than copied,
+    # it's the one thing here that's big
+    channel_history: ChannelHistory | None = None
+
+    def __post_init__(self):
+        # Starting values aren't changes
+        self.version = 0
+        self.versions.clear()
+
+    def __setattr__(self, name: str, value):
+        object.__setattr__(self, name, value)
+        if name in VERSIONED:
+            self.changed(name)
+
+    def changed(self, name: str):
+        """Bump name's version and tell its subscribers"""
+        self.version += 1
+        self.versions[name] = self.version
+        for callback in self.subscribers.get(name, ()):
+            callback(self, name)
+
+    def set_item(self, name: str, index: int, value):
+        """Set one car's entry in a per car list like `history`, as a change to it"""
+        getattr(self, name)[index] = value
+        self.changed(name)
+
+    def changed_since(self, name: str, version: int) -> bool:
+        return self.versions[name] > version
+
+    def subscribe(self, callback: Callable, *names: str):
+        """Call `callback(state, name)` whenever one of names changes"""
+        for name in names:
+            if name not in VERSIONED:
+                raise KeyError(f"State has no field {name}")
+            self.subscribers[name].append(callback)
+
+    def unsubscribe(self, callback: Callable, *names: str):
+        for name in names:
+            self.subscribers[name].remove(callback)
+
+    def snapshot(self) -> "State":
+        """A copy with the same versions and no subscribers. The decoded packets are
+        shared rather than copied, nothing changes them once they're stored. What's
+        worked out from them and updated in place as packets arrive is copied"""
+        snapshot = State(**{name: getattr(self, name) for name in VERSIONED})
+        snapshot.history = list(self.history)
+        snapshot.tyres = list(self.tyres)
+        # Its own record of the tyre sets applied, or it'd skip ones it never saw
+        snapshot.tyre_inventory = self.tyre_inventory.copy()
+        # Small, two finished laps and the one being driven
+        snapshot.lap_delta = copy.deepcopy(self.lap_delta)
+        # Every car's checkpoint crossings, a few laps of floats each
+        snapshot.gaps = copy.deepcopy(self.gaps)
+        snapshot.version = self.version
+        snapshot.versions = self.versions.copy()
+        return snapshot
+
+
+VERSIONED = frozenset(f.name for f in fields(State) if f.init)
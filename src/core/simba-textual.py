@@ -0,0 +1,51 @@
+#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+
+import argparse
+from multiprocessing import Process
+
+from loguru import logger  ## imports main one set up in udp_receiver
+
+from config.state import State
+from models import track_geometry
+from models.textual_layout import RaceApp
+from utils import state_table, udp_processor, udp_receiver
+from utils.channel_history import ChannelHistory
+from utils.state_table import StateTable
+
+
+def main(channel_history: bool = False):
+    receiver = Process(target=udp_receiver.udp_receiver, daemon=True)
+    receiver.start()
+
+    producer = Process(target=udp_processor.process_named_shared_memory, daemon=True)
+    producer.start()
+
+    table = StateTable.attach("simba_state", state_table.TUI_READER)
+    logger.info(f"Loaded learned geometry of {track_geometry.load_learned()} tracks")
+
+    state = State(channel_history=ChannelHistory() if channel_history else None)
+    app = RaceApp(table, state)
+    try:
+        app.run()
+    finally:
+        logger.info(
+            f"Applied {app.packets} packets, skipped {table.conflated.total()}"
+            f" superseded packets {dict(table.conflated)}, lost {table.lost} events"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Live race dashboard in the terminal, drawn with Textual"
+    )
+    parser.add_argument(
+        "--channel-history",
+        action="store_true",
+        help="keep the last minute of per car channels for trends, about 13 MB",
+    )
+    args = parser.parse_args()
+
+    main(channel_history=args.channel_history)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Declarative packet layouts, and the decoders generated from them at import.
+
+A protocol class lists in `LAYOUT` how each of its fields sits on the wire, in
+field order. An entry is either a struct code ("B", "f", "32s"), a record class
+for a single nested record, or a `Repeat` of either. `@decoder` turns that into
+the class's `STRUCT` and a `decode` classmethod which unpacks the whole packet
+in one go and builds every field from fixed indexes, with no loops or slicing
+arithmetic left to get wrong, and an `encode` method doing the reverse. Packets also declare their `PACKET_SIZE`, which is
+checked against the generated struct when the module is imported.
+
+Layouts of older game years reuse the same classes through `generate`, with the
+records that changed swapped for their old layout and `Default` standing in for
+fields the old format didn't send"""
+
+import linecache
+import re
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass, fields
+
+# Every packet body starts after the header
+HEADER_SIZE = 29
+
+
+@dataclass(frozen=True, slots=True)
+class Repeat:
+    """`count` back to back copies of `item`, a struct code, record class or another
+    Repeat, decoded into a list. Lazy repeats of records are left as LazyRecords"""
+
+    item: "str | type | Repeat"
+    count: int
+    lazy: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Default:
+    """A field missing from the wire, always decoded as `value`"""
+
+    value: object
+
+
+def codes(fmt: str) -> tuple[str, ...]:
+    """One struct code per value, "B32sH" -> ("B", "32s", "H")"""
+    return tuple(
+        code
+        for count, char in re.findall(r"(\d*)([a-zA-Z])", fmt)
+        for code in ([count + char] if char == "s" else [char] * int(count or 1))
+    )
+
+
+class LazyRecords(Sequence):
+    """The per car records of a packet, left as raw bytes until a car is indexed.
+    Most consumers only look at the player's car, so the other 21 are never built.
+    Each record is decoded once and cached"""
+
+    __slots__ = ("cache", "layout", "mem", "offset", "record")
+
+    def __init__(self, mem: memoryview, offset: int, record: type, count: int = 22):
+        self.mem = mem
+        self.offset = offset
+        self.layout = record.STRUCT
+        self.record = record
+        self.cache = [None] * count
+
+    @property
+    def end(self) -> int:
+        """Offset of whatever follows the records in the packet"""
+        return self.offset + self.layout.size * len(self.cache)
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self.cache)))]
+
+        record = self.cache[idx]
+        if record is None:
+            idx %= len(self.cache)
+            record = self.record(
+                *self.layout.unpack_from(self.mem, self.offset + idx * self.layout.size)
+            )
+            self.cache[idx] = record
+        return record
+
+    def __iter__(self):
+        if None in self.cache:
+            # Walking every car, one iter_unpack beats looking them up one at a time
+            self.cache = [
+                record or self.record(*values)
+                for record, values in zip(
+                    self.cache,
+                    self.layout.iter_unpack(self.mem[self.offset : self.end]),
+                )
+            ]
+        return iter(self.cache)
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __reduce__(self):
+        # The memoryview can't be pickled, the records it holds can
+        return (list, (list(self),))
+
+
+class _Generator:
+    """Walks a layout, building the struct formats and one expression per field.
+    `full` has every value for STRUCT, `eager` skips lazy records with pad bytes
+    so the decoder only unpacks what it builds straight away. `overrides` swaps
+    the layout of any record class for another"""
+
+    def __init__(self, overrides: dict[type, tuple] | None = None):
+        self.full = ""
+        self.eager = ""
+        self.values = 0
+        self.names = {}
+        self.lazy = False
+        self.overrides = overrides or {}
+
+    def layout(self, record: type) -> tuple:
+        layout = self.overrides.get(record, record.LAYOUT)
+        if len(layout) != len(fields(record)):
+            raise ValueError(
+                f"{record.__name__} LAYOUT has {len(layout)} entries for {len(fields(record))} fields"
+            )
+        return layout
+
+    def name(self, record: type) -> str:
+        self.names[record.__name__] = record
+        return record.__name__
+
+    def entry(self, entry) -> str:
+        if isinstance(entry, str):
+            self.full += entry
+            self.eager += entry
+            self.values += 1
+            return f"v[{self.values - 1}]"
+
+        if isinstance(entry, Default):
+            return repr(entry.value)
+
+        if isinstance(entry, type):
+            return self.record(entry)
+
+        # An overridden record no longer matches its STRUCT, so it is built eagerly
+        if entry.lazy and entry.item not in self.overrides:
+            if not isinstance(entry.item, type):
+                raise TypeError("Only repeats of records can be lazy")
+            self.lazy = True
+            offset = struct.calcsize("<" + self.eager)
+            size = entry.item.STRUCT.size * entry.count
+            self.full += entry.item.STRUCT.format.lstrip("<") * entry.count
+            self.eager += f"{size}x"
+            return f"LazyRecords(mem, offset + {offset}, {self.name(entry.item)}, {entry.count})"
+
+        if isinstance(entry.item, str):
+            start = self.values
+            for _ in range(entry.count):
+                self.entry(entry.item)
+            return f"list(v[{start}:{self.values}])"
+
+        return "[" + ", ".join(self.entry(entry.item) for _ in range(entry.count)) + "]"
+
+    def record(self, record: type) -> str:
+        layout = self.layout(record)
+        if all(isinstance(entry, str) for entry in layout):
+            start = self.values
+            for entry in layout:
+                self.entry(entry)
+            return f"{self.name(record)}(*v[{start}:{self.values}])"
+        return f"{self.name(record)}({', '.join(map(self.entry, layout))})"
+
+
+def generate(
+    cls: type, overrides: dict[type, tuple] | None = None, label: str = ""
+) -> tuple[struct.Struct, classmethod]:
+    """The full struct of cls and a decode classmethod built from its layout,
+    with any record in overrides (cls included) read through its layout there"""
+    generator = _Generator(overrides)
+    layout = generator.layout(cls)
+    names = [field.name for field in fields(cls)]
+    arguments = [generator.entry(entry) for entry in layout]
+    eager = struct.Struct("<" + generator.eager)
+
+    # Packets start after the header, records and the header itself at 0
+    offset = HEADER_SIZE if hasattr(cls, "PACKET_ID") else 0
+
+    lines = [f"def decode(cls, packet, offset={offset}):"]
+    if generator.lazy:
+        lines.append("    mem = memoryview(packet)")
+    lines.append("    v = EAGER.unpack_from(packet, offset)")
+    if all(isinstance(entry, str) for entry in layout):
+        # One value per field, nothing to pick apart
+        lines.append("    return cls(*v)")
+    else:
+        lines.append("    return cls(")
+        lines.extend(
+            f"        {argument},  # {name}" for argument, name in zip(arguments, names)
+        )
+        lines.append("    )")
+    source = "\n".join(lines) + "\n"
+
+    # Registered with linecache so tracebacks and inspect show the generated code
+    filename = f"<decode {cls.__module__}.{cls.__qualname__}{label and ' ' + label}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace = {"EAGER": eager, "LazyRecords": LazyRecords, **generator.names}
+    # Source is built from the class layouts above, never from packet data
+    exec(compile(source, filename, "exec"), namespace)  # noqa: S102
+
+    return struct.Struct("<" + generator.full), classmethod(namespace["decode"])
+
+
+def _flatten(entry, expr: str, depth: int = 0) -> list[str]:
+    """Arguments to STRUCT.pack for the field at expr, starred where it spreads"""
+    if isinstance(entry, str):
+        return [expr]
+
+    if isinstance(entry, Default):
+        return []
+
+    if isinstance(entry, type):
+        return [
+            argument
+            for item, field in zip(entry.LAYOUT, fields(entry))
+            for argument in _flatten(item, f"{expr}.{field.name}", depth)
+        ]
+
+    if isinstance(entry.item, str):
+        return [f"*{expr}"]
+
+    item = f"_{depth}"
+    inner = ", ".join(_flatten(entry.item, item, depth + 1))
+    return [f"*[v for {item} in {expr} for v in ({inner},)]"]
+
+
+def encoder(cls: type):
+    """A generated encode method packing an instance of cls back into its wire layout,
+    the packet body for packets, which go after a separately encoded Header"""
+    lines = ["def encode(self):", "    return STRUCT.pack("]
+    for entry, field in zip(cls.LAYOUT, fields(cls)):
+        arguments = _flatten(entry, f"self.{field.name}")
+        lines.extend(f"        {argument},  # {field.name}" for argument in arguments)
+    lines.append("    )")
+    source = "\n".join(lines) + "\n"
+
+    filename = f"<encode {cls.__module__}.{cls.__qualname__}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    namespace = {"STRUCT": cls.STRUCT}
+    exec(compile(source, filename, "exec"), namespace)  # noqa: S102
+    return namespace["encode"]
+
+
+def decoder(cls: type) -> type:
+    """Class decorator, applied over @dataclass, adding STRUCT, a generated decode
+    and its matching encode"""
+    cls.STRUCT, cls.decode = generate(cls)
+    cls.encode = encoder(cls)
+
+    if hasattr(cls, "PACKET_SIZE") and HEADER_SIZE + cls.STRUCT.size != cls.PACKET_SIZE:
+        raise ValueError(
+            f"{cls.__name__} layout is {HEADER_SIZE + cls.STRUCT.size} bytes,"
+            f" the packet is {cls.PACKET_SIZE}"
+        )
+    return cls
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Every decoder this build knows, keyed on what the packet header says it is:
+(packet_format, packet_id, packet_version). Older formats decode through their own
+layouts onto the current packet classes, anything else is turned away rather than
+read through the wrong layout"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from models import udp_protocol, udp_protocol_2024
+from models.packet_schema import HEADER_SIZE, generate
+
+# The game has only ever sent version 1 of each packet
+PACKET_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class Entry:
+    """The class a packet decodes into, its whole datagram length and the decoder"""
+
+    packet: type
+    size: int
+    decode: Callable
+
+
+# (packet_format, packet_id, packet_version) -> Entry
+REGISTRY: dict[tuple[int, int, int], Entry] = {}
+
+
+def register(
+    packet_format: int,
+    packet: type,
+    size: int,
+    decode: Callable,
+    packet_version: int = PACKET_VERSION,
+):
+    key = (packet_format, packet.PACKET_ID, packet_version)
+    if key in REGISTRY:
+        raise ValueError(
+            f"Packet format {key[0]} id {key[1]} v{key[2]} is already registered"
+        )
+    REGISTRY[key] = Entry(packet, size, decode)
+
+
+def register_compat(
+    packet_format: int, overrides: dict[type, tuple], missing: set[type]
+):
+    """Register an older format, every current packet but those missing from it,
+    read through the changed layouts in overrides"""
+    for packet in udp_protocol.PACKET_CLASSES.values():
+        if packet in missing:
+            continue
+        if not hasattr(packet, "LAYOUT"):
+            # Events dispatch on their code rather than a layout
+            register(packet_format, packet, packet.PACKET_SIZE, packet.decode)
+            continue
+        layout, decode = generate(packet, overrides, label=str(packet_format))
+        register(
+            packet_format,
+            packet,
+            HEADER_SIZE + layout.size,
+            decode.__get__(None, packet),
+        )
+
+
+for cls in udp_protocol.PACKET_CLASSES.values():
+    register(udp_protocol.PACKET_FORMAT, cls, cls.PACKET_SIZE, cls.decode)
+
+register_compat(
+    udp_protocol_2024.PACKET_FORMAT,
+    udp_protocol_2024.OVERRIDES,
+    udp_protocol_2024.MISSING,
+)
@@ -31,7 +31,9 @@ def create_race_layout():
         Layout(name="position"), Layout(name="track"), Layout(name="lap")
     )
 
-    layout["body"].split_row(Layout(name="left"), Layout(name="right"))
+    layout["body"].split_row(
+        Layout(name="leaderboard"), Layout(name="left"), Layout(name="right")
+    )
     layout["body"]["left"].split_column(
         Layout(name="driver_ahead"), Layout(name="driver_behind")
     )
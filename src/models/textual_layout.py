@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""The race layout as a Textual app, an alternative to the Rich Live front end.
+
+Every region is a widget with a reactive `text`, so setting it to what it already
+shows does nothing, and changing it only marks that widget for repainting. Textual
+then redraws just the screen regions those widgets cover. The same updaters drive
+both front ends, through a registry keyed on the same paths as the Rich layout"""
+
+from textual.app import App, ComposeResult
+from textual.containers import Horizontal, Vertical
+from textual.reactive import reactive
+from textual.widget import Widget
+from textual.widgets import Static
+from textual.worker import get_current_worker
+
+from config.state import State
+from utils import layout_updaters
+from utils.layout_updaters import process_packet
+
+
+class Region(Static):
+    """One leaf of the layout, a bordered box of text"""
+
+    DEFAULT_CSS = """
+    Region {
+        width: 1fr;
+        height: 1fr;
+        border: round $foreground 60%;
+        text-align: center;
+        overflow: hidden;
+    }
+    Region.heading {
+        border: heavy $foreground;
+        text-style: bold;
+    }
+    """
+
+    text = reactive("", layout=False)
+
+    def __init__(self, text: str = "", **kwargs):
+        super().__init__(text, **kwargs)
+        self.set_reactive(Region.text, text)
+
+    def watch_text(self, text: str):
+        self.update(text)
+
+
+def _sized(widget: Widget, width: int = 1, height: int = 1) -> Widget:
+    """widget taking width and height shares of its parent, like a Layout's ratio"""
+    widget.styles.width = f"{width}fr"
+    widget.styles.height = f"{height}fr"
+    return widget
+
+
+def _corners(name: str) -> Horizontal:
+    """Front and rear axles, each split left and right, as the tyre boxes are"""
+    return Horizontal(
+        Vertical(Region(name="left"), Region(name="right"), name="front"),
+        Vertical(Region(name="left"), Region(name="right"), name="rear"),
+        name=name,
+    )
+
+
+def _path(widget: Widget) -> tuple[str, ...]:
+    names = []
+    while isinstance(widget, Widget) and widget.name:
+        names.append(widget.name)
+        widget = widget.parent
+    return tuple(reversed(names))
+
+
+class WidgetRegistry:
+    """Every Region in an app, keyed on the path of names to it, in the shape
+    `layout_updaters` expects of a PanelRegistry"""
+
+    def __init__(self, app: App):
+        self.regions = {_path(region): region for region in app.query(Region)}
+        self.justified = {}
+
+    def show(self, path: tuple[str, ...], string: str, justify: str = "center") -> bool:
+        """Show string in the region at path, False if it already was"""
+        region = self.regions[path]
+        if self.justified.get(path) != justify:
+            region.styles.text_align = justify
+            self.justified[path] = justify
+        if region.text == string:
+            return False
+        region.text = string
+        return True
+
+
+class RaceApp(App):
+    """The race layout, fed from a StateTable by a worker thread. With no table it
+    just shows the layout, for driving it some other way like the tests do"""
+
+    TITLE = "simba"
+
+    def __init__(self, table=None, state: State | None = None):
+        super().__init__()
+        self.table = table
+        self.state = State() if state is None else state
+        self.packets = 0
+
+    def compose(self) -> ComposeResult:
+        yield _sized(
+            Horizontal(
+                Region("POSITION", name="position", classes="heading"),
+                _sized(Region(name="track", classes="heading"), width=2),
+                Region("LAP", name="lap", classes="heading"),
+                name="header_upper",
+            ),
+            height=1,
+        )
+        yield _sized(
+            Horizontal(
+                Region(name="position"),
+                _sized(Region(name="track"), width=2),
+                Horizontal(
+                    Region(name="completed_laps"),
+                    Region(name="total_laps"),
+                    name="lap",
+                ),
+                name="header_lower",
+            ),
+            height=2,
+        )
+        yield _sized(
+            Horizontal(
+                Region(name="leaderboard"),
+                Vertical(
+                    Region(name="driver_ahead"),
+                    Region(name="driver_behind"),
+                    name="left",
+                ),
+                Vertical(
+                    Region(name="current_lap"),
+                    Region(name="my_best_lap"),
+                    Region(name="session_best"),
+                    name="right",
+                ),
+                name="body",
+            ),
+            height=8,
+        )
+        yield _sized(
+            Horizontal(
+                Region(name="pit_info"),
+                Horizontal(
+                    Vertical(Region(name="soft"), Region(name="hard"), name="r1"),
+                    Vertical(Region(name="medium"), Region(name="inter"), name="r2"),
+                    name="available_tyres",
+                ),
+                _corners("tyre_temp"),
+                _corners("tyre_deg"),
+                name="footer",
+            ),
+            height=3,
+        )
+
+    def on_mount(self):
+        self.regions = WidgetRegistry(self)
+        layout_updaters.use_panels(self, self.regions)
+        if self.table is not None:
+            self.run_worker(self.follow, thread=True, exclusive=True)
+
+    def apply(self, packets: list):
+        """Decode and apply packets, repainting once for the lot"""
+        with self.batch_update():
+            for packet in packets:
+                process_packet(packet, self, self.state)
+        self.packets += len(packets)
+
+    def follow(self):
+        """Hands the newest packets to the app thread as they're published. The
+        call blocks until they're applied, so a slow screen conflates in the table
+        rather than queueing here"""
+        worker = get_current_worker()
+        while not worker.is_cancelled:
+            if self.table.wait(timeout=0.5):
+                packets = self.table.changes()
+                if packets:
+                    self.call_from_thread(self.apply, packets)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Where things are round each track, keyed on the `tract_dict` ids. Sector starts
+come from the session packet, DRS detection points and corners from the tables
+here, and DRS zones, braking zones and the centreline from geometry files learned
+from recordings by `utils.track_builder`. Positions are sorted distances into the
+lap so finding what's at a distance is a bisect. A track's geometry is put
+together the first time a session on it asks.
+
+A geometry file is a GEOMETRY_HEADER_STRUCT then float32 arrays: the centreline,
+the mean (x, y, z) of every `resolution_m` metres, then the (start, end) of each
+DRS zone, then of each braking zone. They're memory mapped rather than read"""
+
+import math
+import struct
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+
+from models import decode_dictionaries as dc
+
+# track id -> what's been measured of it, distances in metres into the lap
+TRACKS = {
+    track_id: {"drs_detection": points}
+    for track_id, points in dc.drs_detection_zones_dict.items()
+}
+
+GEOMETRY_MAGIC = b"SGEO"
+GEOMETRY_VERSION = 1
+# magic, version, track id, track length, resolution, centreline points, DRS
+# zones, braking zones
+GEOMETRY_HEADER_STRUCT = struct.Struct("<4sHHffIII")
+
+# Where the live app looks for geometry files, `<track id>.geom`
+TRACKS_DIR = Path(__file__).parent / "tracks"
+
+
+@dataclass(frozen=True, slots=True)
+class LearnedTrack:
+    """The arrays of one geometry file, views of its memory map"""
+
+    track_id: int
+    length_m: float
+    resolution_m: float
+    centreline: np.ndarray
+    drs_zones: np.ndarray
+    braking_zones: np.ndarray
+
+
+def write_learned(path: Path, track: LearnedTrack):
+    arrays = [
+        np.ascontiguousarray(array, "<f4").reshape(-1, width)
+        for array, width in (
+            (track.centreline, 3),
+            (track.drs_zones, 2),
+            (track.braking_zones, 2),
+        )
+    ]
+    header = GEOMETRY_HEADER_STRUCT.pack(
+        GEOMETRY_MAGIC,
+        GEOMETRY_VERSION,
+        track.track_id,
+        track.length_m,
+        track.resolution_m,
+        *(len(array) for array in arrays),
+    )
+    with Path(path).open("wb") as f:
+        f.write(header)
+        f.writelines(array.tobytes() for array in arrays)
+
+
+def read_learned(path: Path) -> LearnedTrack:
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    magic, version, track_id, length_m, resolution_m, *counts = (
+        GEOMETRY_HEADER_STRUCT.unpack_from(data)
+    )
+    if magic != GEOMETRY_MAGIC or version != GEOMETRY_VERSION:
+        raise ValueError(f"{path} is not a version {GEOMETRY_VERSION} geometry file")
+
+    arrays = []
+    offset = GEOMETRY_HEADER_STRUCT.size
+    for count, width in zip(counts, (3, 2, 2)):
+        arrays.append(
+            np.frombuffer(data, "<f4", count * width, offset).reshape(count, width)
+        )
+        offset += count * width * 4
+    return LearnedTrack(track_id, length_m, resolution_m, *arrays)
+
+
+# track id -> LearnedTrack, filled in by load_learned
+LEARNED = {}
+
+
+def load_learned(directory: Path = TRACKS_DIR) -> int:
+    """Map every geometry file in directory, at startup. Returns how many"""
+    for path in sorted(Path(directory).glob("*.geom")):
+        track = read_learned(path)
+        LEARNED[track.track_id] = track
+    _geometry.cache_clear()
+    return len(LEARNED)
+
+
+@dataclass(frozen=True, slots=True)
+class TrackGeometry:
+    """Everything sorted by distance into the lap. Corner `i` runs from
+    `corner_starts[i]` to `corner_ends[i]`, likewise DRS zones from their
+    activation point and braking zones. Tracks nobody has measured just have
+    their sectors"""
+
+    track_id: int
+    length_m: float
+    sector_starts: tuple[float, ...]
+    drs_detection: tuple[float, ...] = ()
+    drs_activation: tuple[float, ...] = ()
+    corner_starts: tuple[float, ...] = ()
+    corner_ends: tuple[float, ...] = ()
+    drs_ends: tuple[float, ...] = ()
+    braking_starts: tuple[float, ...] = ()
+    braking_ends: tuple[float, ...] = ()
+    # (x, y, z) of every centreline_resolution_m metres, if it's been learned
+    centreline: np.ndarray | None = field(default=None, compare=False, repr=False)
+    centreline_resolution_m: float = 0.0
+
+    def sector_at(self, distance: float) -> int:
+        """0, 1 or 2"""
+        return max(bisect_right(self.sector_starts, distance) - 1, 0)
+
+    def _ahead(self, points: tuple[float, ...], distance: float) -> float | None:
+        """Metres to the next of points, round past the line if need be"""
+        if not points:
+            return None
+        i = bisect_left(points, distance)
+        if i < len(points):
+            return points[i] - distance
+        return points[0] + self.length_m - distance
+
+    def to_drs_detection(self, distance: float) -> float | None:
+        """Metres to the next DRS detection point, None if none are known"""
+        return self._ahead(self.drs_detection, distance)
+
+    def to_drs_activation(self, distance: float) -> float | None:
+        return self._ahead(self.drs_activation, distance)
+
+    @staticmethod
+    def _within(starts: tuple, ends: tuple, distance: float) -> int | None:
+        i = bisect_right(starts, distance) - 1
+        if i >= 0 and distance <= ends[i]:
+            return i
+        return None
+
+    def corner_at(self, distance: float) -> int | None:
+        """Index of the corner distance is in, None on a straight"""
+        return self._within(self.corner_starts, self.corner_ends, distance)
+
+    def drs_zone_at(self, distance: float) -> int | None:
+        return self._within(self.drs_activation, self.drs_ends, distance)
+
+    def braking_zone_at(self, distance: float) -> int | None:
+        return self._within(self.braking_starts, self.braking_ends, distance)
+
+    def point_at(self, distance: float) -> np.ndarray | None:
+        """World (x, y, z) of the centreline at distance, None if it's not known"""
+        if self.centreline is None:
+            return None
+        # Each point is the middle of its stretch of track
+        position = distance / self.centreline_resolution_m - 0.5
+        i = math.floor(position)
+        before = self.centreline[i % len(self.centreline)]
+        after = self.centreline[(i + 1) % len(self.centreline)]
+        return before + (after - before) * (position - i)
+
+
+@cache
+def _geometry(track_id: int, length_m: float, sector_starts: tuple) -> TrackGeometry:
+    known = TRACKS.get(track_id, {})
+    corners = sorted(known.get("corners", ()))
+    learned = LEARNED.get(track_id)
+    if learned is None:
+        drs_zones = sorted(known.get("drs_zones", ()))
+        braking_zones = ()
+        centreline, resolution_m = None, 0.0
+    else:
+        drs_zones = learned.drs_zones.tolist()
+        braking_zones = learned.braking_zones.tolist()
+        centreline, resolution_m = learned.centreline, learned.resolution_m
+
+    return TrackGeometry(
+        track_id,
+        length_m,
+        sector_starts,
+        drs_detection=tuple(sorted(known.get("drs_detection", ()))),
+        drs_activation=tuple(start for start, _ in drs_zones),
+        corner_starts=tuple(start for start, _ in corners),
+        corner_ends=tuple(end for _, end in corners),
+        drs_ends=tuple(end for _, end in drs_zones),
+        braking_starts=tuple(start for start, _ in braking_zones),
+        braking_ends=tuple(end for _, end in braking_zones),
+        centreline=centreline,
+        centreline_resolution_m=resolution_m,
+    )
+
+
+def for_session(session) -> TrackGeometry:
+    """Geometry of the session's track, the same object for every packet of it"""
+    return _geometry(
+        session.track_id,
+        float(session.track_length_m),
+        (
+            0.0,
+            float(session.sector_2_start_distance_m),
+            float(session.sector_3_start_distance_m),
+        ),
+    )
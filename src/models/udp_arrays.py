@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""NumPy decoders for the packets carrying a record per car. Rather than unpacking
+a tuple of several hundred values and building 22 dataclasses, the packet is mapped
+onto a structured dtype with `np.frombuffer`, which copies nothing and gives
+columns straight away, eg `telemetry["speed"][car_idx]`.
+
+The dtypes are derived from the structs and dataclasses in `udp_protocol`, so the
+two can't drift apart, and the dataclass attributes (`telemetry.statuses[idx].speed`)
+still work, they're just built the first time something asks for them"""
+
+import re
+import struct
+from dataclasses import fields
+from typing import ClassVar
+
+import numpy as np
+
+from models import udp_protocol
+
+MAX_CARS = 22
+
+# struct format character -> little endian NumPy type
+NUMPY_CODES = {
+    "b": "i1",
+    "B": "u1",
+    "h": "<i2",
+    "H": "<u2",
+    "i": "<i4",
+    "I": "<u4",
+    "q": "<i8",
+    "Q": "<u8",
+    "f": "<f4",
+    "d": "<f8",
+    "s": "S",
+}
+
+
+def numpy_codes(layout: struct.Struct) -> list[str]:
+    """One NumPy type per value the struct unpacks to"""
+    codes = []
+    for count, char in re.findall(r"(\d*)([a-zA-Z])", layout.format):
+        if char == "s":
+            codes.append(f"S{count or 1}")
+        else:
+            codes.extend([NUMPY_CODES[char]] * int(count or 1))
+    return codes
+
+
+def packet_dtype(packet: type, record: type, layout: struct.Struct) -> np.dtype:
+    """[records:22][trailing fields], named after the dataclasses' own fields"""
+    codes = numpy_codes(layout)
+    cars, *trailer = (field.name for field in fields(packet))
+    names = [field.name for field in fields(record)]
+
+    record_dtype = np.dtype(list(zip(names, codes[: len(names)])))
+    dtype = np.dtype(
+        [(cars, record_dtype, (MAX_CARS,))]
+        + list(zip(trailer, codes[len(names) * MAX_CARS :]))
+    )
+    if dtype.itemsize != layout.size:
+        raise ValueError(
+            f"{packet.__name__} dtype is {dtype.itemsize} bytes, the packet is {layout.size}"
+        )
+    return dtype
+
+
+class ArrayPacket:
+    """Zero copy view of a packet. `packet[name]` is the column of that field for
+    every car, `packet.records` the whole per car array, and the dataclass packet's
+    attributes are decoded on first access and cached"""
+
+    PACKET: ClassVar[type]
+    RECORD: ClassVar[type]
+    DTYPE: ClassVar[np.dtype]
+    CARS: ClassVar[str]
+    TRAILER: ClassVar[tuple[str, ...]]
+
+    def __init_subclass__(cls, packet: type, record: type, layout: struct.Struct):
+        cls.PACKET = packet
+        cls.PACKET_ID = packet.PACKET_ID
+        cls.RECORD = record
+        cls.DTYPE = packet_dtype(packet, record, layout)
+        cls.CARS, *trailer = cls.DTYPE.names
+        cls.TRAILER = tuple(trailer)
+
+    def __init__(self, array: np.ndarray, packet: bytes, offset: int):
+        self.array = array
+        self.records = array[self.CARS][0]
+        self.packet = packet
+        self.offset = offset
+
+    @classmethod
+    def decode(cls, packet: bytes, offset: int = 29):
+        return cls(
+            np.frombuffer(packet, cls.DTYPE, count=1, offset=offset), packet, offset
+        )
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.records[name]
+
+    def __getattr__(self, name: str):
+        # Only reached the first time a dataclass attribute is asked for
+        if name == self.CARS:
+            # Lazy records from the dataclass decoder, only the cars indexed get built
+            value = getattr(self.to_packet(), name)
+        elif name in self.TRAILER:
+            value = self.array[name][0].item()
+        else:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        setattr(self, name, value)
+        return value
+
+    def to_packet(self):
+        """The fully decoded dataclass packet"""
+        return self.PACKET.decode(self.packet, self.offset)
+
+    def __reduce__(self):
+        # Pickled as the bytes it views, the packet may be a memoryview
+        return (type(self).decode, (bytes(self.packet), self.offset))
+
+
+class MotionArray(
+    ArrayPacket,
+    packet=udp_protocol.MotionPacket,
+    record=udp_protocol.Motion,
+    layout=udp_protocol.MOTION_STRUCT,
+):
+    pass
+
+
+class LapdataArray(
+    ArrayPacket,
+    packet=udp_protocol.LapdataPacket,
+    record=udp_protocol.Carlap,
+    layout=udp_protocol.LAPDATA_STRUCT,
+):
+    pass
+
+
+class SetupArray(
+    ArrayPacket,
+    packet=udp_protocol.SetupPacket,
+    record=udp_protocol.Setup,
+    layout=udp_protocol.CARSETUP_STRUCT,
+):
+    pass
+
+
+class TelemetryArray(
+    ArrayPacket,
+    packet=udp_protocol.TelemetryPacket,
+    record=udp_protocol.Telemetry,
+    layout=udp_protocol.CARTELEMETRY_STRUCT,
+):
+    pass
+
+
+class StatusArray(
+    ArrayPacket,
+    packet=udp_protocol.StatusPacket,
+    record=udp_protocol.Status,
+    layout=udp_protocol.CARSTATUS_STRUCT,
+):
+    pass
+
+
+class DamageArray(
+    ArrayPacket,
+    packet=udp_protocol.DamagePacket,
+    record=udp_protocol.Damage,
+    layout=udp_protocol.CARDAMAGE_STRUCT,
+):
+    pass
+
+
+ARRAY_CLASSES = {
+    (udp_protocol.PACKET_FORMAT, cls.PACKET_ID): cls
+    for cls in ArrayPacket.__subclasses__()
+}
@@ -6,19 +6,26 @@
 """
 
 import struct
-from dataclasses import dataclass
-from itertools import batched, islice
+from dataclasses import dataclass, fields
 from typing import ClassVar
 
+from models.packet_schema import (
+    LazyRecords,  # noqa: F401 re-exported
+    Repeat,
+    codes,
+    decoder,
+)
+
 ## --------------------- ##
 ## ------ HEADER ------- ##
 ## --------------------- ##
-# 29 bytes
-HEADER_STRUCT = struct.Struct("<HBBBBBQfIIBB")
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Header:
+    LAYOUT: ClassVar[tuple] = codes("HBBBBBQfIIBB")
+
     packet_format: int
     game_year: int
     game_major_version: int
@@ -32,23 +39,21 @@ class Header:
     player_car_index: int
     player2_car_index: int
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 0):
-        mem = memoryview(packet)
-        values = HEADER_STRUCT.unpack(mem[:29])
-        return cls(*values)
+
+HEADER_STRUCT = Header.STRUCT
 
 
 ## --------------------- ##
 ## ------ MOTION ------- ##
 ## --------------------- ##
 # Header 0
-# 1349 bytes
-MOTION_STRUCT = struct.Struct("<" + ("ffffffhhhhhhffffff" * 22))
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Motion:
+    LAYOUT: ClassVar[tuple] = codes("ffffffhhhhhhffffff")
+
     world_position_x: float
     world_position_y: float
     world_position_z: float
@@ -69,49 +74,39 @@ class Motion:
     roll_radians: float
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class MotionPacket:
+    PACKET_ID: ClassVar[int] = 0
+    PACKET_SIZE: ClassVar[int] = 1349
+    LAYOUT: ClassVar[tuple] = (Repeat(Motion, 22, lazy=True),)
+
     cars: list[Motion]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = MOTION_STRUCT.unpack_from(mem, offset)
-        length_of_data = 18
-        number_of_repeats = 22
-        decoded = [
-            Motion(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        return cls(decoded)
+
+MOTION_STRUCT = MotionPacket.STRUCT
 
 
 ## ---------------------- ##
 ## ------ SESSION ------- ##
 ## ---------------------- ##
 # Header 1
-# 753 bytes
-SESSION_STRUCT = struct.Struct(
-    "<BbbBHBbBHHBBBBBB"
-    + "fb" * 21
-    + "BBB"
-    + "BBBbbbbB" * 64
-    + "BBIII"
-    + "B" * 18
-    + "I"
-    + "B" * 41
-    + "ff"
-)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Marshalzone:
+    LAYOUT: ClassVar[tuple] = codes("fb")
+
     zone_start_at_lap_percentage: float
     zone_flag_type: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Weather:
+    LAYOUT: ClassVar[tuple] = codes("BBBbbbbB")
+
     session_type: int
     time_offset: int
     weather: int
@@ -122,8 +117,21 @@ class Weather:
     rain_percentage: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class SessionPacket:
+    PACKET_ID: ClassVar[int] = 1
+    PACKET_SIZE: ClassVar[int] = 753
+    LAYOUT: ClassVar[tuple] = (
+        *codes("BbbBHBbBHHBBBBBB"),
+        Repeat(Marshalzone, 21),
+        *codes("BBB"),
+        Repeat(Weather, 64),
+        *codes("BBIII" + "B" * 18 + "I" + "B" * 29),
+        Repeat("B", 12),
+        *codes("ff"),
+    )
+
     weather: int
     track_temp_c: int
     air_temp_c: int
@@ -202,53 +210,21 @@ class SessionPacket:
     sector_2_start_distance_m: float
     sector_3_start_distance_m: float
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = SESSION_STRUCT.unpack_from(mem, offset)
-
-        decoded = []
-
-        for idx, item in enumerate(range(16)):
-            item = values[idx]
-            decoded.append(item)
-
-        list_of_marshal_zones = [
-            Marshalzone(*chunk) for chunk in islice(batched(values[16:], 2), 21)
-        ]
-        decoded.append(list_of_marshal_zones)
-
-        for idx, item in enumerate(range(3)):
-            item = values[idx + 16 + 42]
-            decoded.append(item)
-
-        list_of_weather = [
-            Weather(*chunk) for chunk in islice(batched(values[61:], 8), 64)
-        ]
-        decoded.append(list_of_weather)
-
-        for idx, item in enumerate(range(53)):
-            item = values[idx + 16 + 42 + 3 + 512]
-            decoded.append(item)
 
-        weekend_structure = [values[idx + 16 + 42 + 3 + 512 + 53] for idx in range(12)]
-        decoded.append(weekend_structure)
-        decoded.append(values[-2])
-        decoded.append(values[-1])
-
-        return cls(*decoded)
+SESSION_STRUCT = SessionPacket.STRUCT
 
 
 ## ---------------------- ##
 ## ------ LAPDATA ------- ##
 ## ---------------------- ##
 # Header 2
-# 1285 bytes
-LAPDATA_STRUCT = struct.Struct("<" + ("IIHBHBHBHBfffBBBBBBBBBBBBBBBHHBfB" * 22) + "BB")
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Carlap:
+    LAYOUT: ClassVar[tuple] = codes("IIHBHBHBHBfffBBBBBBBBBBBBBBBHHBfB")
+
     last_lap_time_ms: int
     current_lap_time_ms: int
     sector1_time_ms_component: int
@@ -284,46 +260,39 @@ class Carlap:
     fastest_speed_trap_lap: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class LapdataPacket:
+    PACKET_ID: ClassVar[int] = 2
+    PACKET_SIZE: ClassVar[int] = 1285
+    LAYOUT: ClassVar[tuple] = (Repeat(Carlap, 22, lazy=True), *codes("BB"))
+
     cars: list[Carlap]
     time_trial_pb_car_idx: int
     rival_car_idx: int
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = LAPDATA_STRUCT.unpack_from(mem, offset)
-        length_of_data = 33
-        number_of_repeats = 22
-        decoded = []
-        laps = [
-            Carlap(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        decoded.append(laps)
-        # zero indexed
-        decoded.append(values[(33 * 22) + 0])
-        decoded.append(values[(33 * 22) + 1])
-
-        return cls(*decoded)
+
+LAPDATA_STRUCT = LapdataPacket.STRUCT
 
 
 ## -------------------- ##
 ## ------ EVENT ------- ##
 ## -------------------- ##
 # Header 3
-# 45 bytes
 EVENT_STRUCT = struct.Struct("<4s12s")
 
 
-@dataclass
+@dataclass(slots=True)
 class EventPacket:
+    PACKET_ID: ClassVar[int] = 3
+    PACKET_SIZE: ClassVar[int] = HEADER_STRUCT.size + EVENT_STRUCT.size
+
     event_code: str
     _registry: ClassVar[dict[str, type]] = {}
 
     def __init_subclass__(cls, **kwargs):
-        super().__init_subclass__(**kwargs)
+        # Named explicitly, slots=True rebuilds the class so the bare super() cell is stale
+        super(EventPacket, cls).__init_subclass__(**kwargs)
         # Auto-register any subclass that defines an event_code
         if hasattr(cls, "event_code"):
             EventPacket._registry[cls.event_code] = cls
@@ -342,13 +311,20 @@ class EventPacket:
         # Simple events with no payload (SSTA, SEND, etc.)
         return cls(code)
 
+    def encode(self) -> bytes:
+        # The code, then any subclass fields, padded out to the fixed event size
+        payload = b""
+        if hasattr(self, "STRUCT"):
+            payload = self.STRUCT.pack(*(getattr(self, f.name) for f in fields(self)))
+        return EVENT_STRUCT.pack(self.event_code.encode("ASCII"), payload)
+
     @classmethod
     def _decode_payload(mem: memoryview, offset: int):
         # for subclasses that only have data
         raise NotImplementedError
 
 
-@dataclass
+@dataclass(slots=True)
 class FastestLap(EventPacket):
     event_code: ClassVar[str] = "FTLP"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B f")  # carIdx, lapTime
@@ -362,7 +338,7 @@ class FastestLap(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class Retirement(EventPacket):
     event_code: ClassVar[str] = "RTMT"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B B")  # carIdx, reason
@@ -376,7 +352,7 @@ class Retirement(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class DrsDisabled(EventPacket):
     event_code: ClassVar[str] = "DRSD"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B")
@@ -389,7 +365,7 @@ class DrsDisabled(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Teammateinpit(EventPacket):
     event_code: ClassVar[str] = "TMPT"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B")
@@ -402,7 +378,7 @@ class Teammateinpit(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Racewinner(EventPacket):
     event_code: ClassVar[str] = "RCWN"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B")
@@ -415,7 +391,7 @@ class Racewinner(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Penalty(EventPacket):
     event_code: ClassVar[str] = "PENA"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B B B B B B B")
@@ -434,7 +410,7 @@ class Penalty(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class Speedtrap(EventPacket):
     event_code: ClassVar[str] = "SPTP"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B f B B B f")
@@ -452,7 +428,7 @@ class Speedtrap(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class Startlights(EventPacket):
     event_code: ClassVar[str] = "STLG"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B")
@@ -465,7 +441,7 @@ class Startlights(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Drivethroughpenalty(EventPacket):
     event_code: ClassVar[str] = "DTSV"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B")
@@ -478,7 +454,7 @@ class Drivethroughpenalty(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Stopgopenalty(EventPacket):
     event_code: ClassVar[str] = "SGSV"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B")
@@ -491,7 +467,7 @@ class Stopgopenalty(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Flashback(EventPacket):
     event_code: ClassVar[str] = "FLBK"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<I f")
@@ -505,7 +481,7 @@ class Flashback(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class Buttonpressed(EventPacket):
     event_code: ClassVar[str] = "BUTN"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<I")
@@ -518,7 +494,7 @@ class Buttonpressed(EventPacket):
         return cls(val)
 
 
-@dataclass
+@dataclass(slots=True)
 class Overtake(EventPacket):
     event_code: ClassVar[str] = "OVTK"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B B")
@@ -532,7 +508,7 @@ class Overtake(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class Collision(EventPacket):
     event_code: ClassVar[str] = "COLL"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B B")
@@ -546,7 +522,7 @@ class Collision(EventPacket):
         return cls(*values)
 
 
-@dataclass
+@dataclass(slots=True)
 class Safetycar(EventPacket):
     event_code: ClassVar[str] = "SCAR"
     STRUCT: ClassVar[struct.Struct] = struct.Struct("<B B")
@@ -564,12 +540,13 @@ class Safetycar(EventPacket):
 ## ------ PARTICIPANTS ------- ##
 ## --------------------------- ##
 # Header 4
-# 1284 bytes
-PARTICIPANTS_STRUCT = struct.Struct("<B" + "BBBBBBB32sBBHBBBBBBBBBBBBBB" * 22)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Participant:
+    LAYOUT: ClassVar[tuple] = codes("BBBBBBB32sBBHBBBBBBBBBBBBBB")
+
     is_ai_controlled_flag: int
     driver_id: int
     network_id: int
@@ -597,37 +574,31 @@ class Participant:
     livery_blue_4: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class ParticipantsPacket:
+    PACKET_ID: ClassVar[int] = 4
+    PACKET_SIZE: ClassVar[int] = 1284
+    LAYOUT: ClassVar[tuple] = ("B", Repeat(Participant, 22, lazy=True))
+
     number_of_active_cars: int
     cars: list[Participant]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = PARTICIPANTS_STRUCT.unpack_from(mem, offset)
-        decoded = [values[0]]
-        length_of_data = 25
-        number_of_repeats = 22
-        participants = [
-            Participant(*chunk)
-            for chunk in islice(batched(values[1:], length_of_data), number_of_repeats)
-        ]
-        decoded.append(participants)
 
-        return cls(*decoded)
+PARTICIPANTS_STRUCT = ParticipantsPacket.STRUCT
 
 
 ## ------------------------ ##
 ## ------ CAR SETUP ------- ##
 ## ------------------------ ##
 # Header 5
-# 1133 bytes
-CARSETUP_STRUCT = struct.Struct("<" + "BBBBffffBBBBBBBBBffffBf" * 22 + "f")
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Setup:
+    LAYOUT: ClassVar[tuple] = codes("BBBBffffBBBBBBBBBffffBf")
+
     front_wing: int
     rear_wing: int
     on_throttle: int
@@ -653,40 +624,31 @@ class Setup:
     fuel_load: float
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class SetupPacket:
+    PACKET_ID: ClassVar[int] = 5
+    PACKET_SIZE: ClassVar[int] = 1133
+    LAYOUT: ClassVar[tuple] = (Repeat(Setup, 22, lazy=True), "f")
+
     setups: list[Setup]
     player_next_front_wing_value: float
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = CARSETUP_STRUCT.unpack_from(mem, offset)
-        decoded = []
-        length_of_data = 23
-        number_of_repeats = 22
-        setups = [
-            Setup(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        decoded.append(setups)
-        decoded.append(values[-1])
 
-        return cls(*decoded)
+CARSETUP_STRUCT = SetupPacket.STRUCT
 
 
 ## ---------------------------- ##
 ## ------ CAR TELEMETRY ------- ##
 ## ---------------------------- ##
 # Header 6
-# 1352 bytes
-CARTELEMETRY_STRUCT = struct.Struct(
-    "<" + "HfffBbHBBHHHHHBBBBBBBBHffffBBBB" * 22 + "BBb"
-)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Telemetry:
+    LAYOUT: ClassVar[tuple] = codes("HfffBbHBBHHHHHBBBBBBBBHffffBBBB")
+
     speed: int
     throttle: float
     steer: float
@@ -720,42 +682,33 @@ class Telemetry:
     surface_fr_type: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class TelemetryPacket:
+    PACKET_ID: ClassVar[int] = 6
+    PACKET_SIZE: ClassVar[int] = 1352
+    LAYOUT: ClassVar[tuple] = (Repeat(Telemetry, 22, lazy=True), *codes("BBb"))
+
     statuses: list[Telemetry]
     mfd_panel_index: int
     mfd_panel_index_secondary_player: int
     suggested_gear: int
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = CARTELEMETRY_STRUCT.unpack_from(mem, offset)
-        decoded = []
-        length_of_data = 31
-        number_of_repeats = 22
-        setups = [
-            Telemetry(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        decoded.append(setups)
-        decoded.append(values[-3])
-        decoded.append(values[-2])
-        decoded.append(values[-1])
-
-        return cls(*decoded)
+
+CARTELEMETRY_STRUCT = TelemetryPacket.STRUCT
 
 
 ## ------------------------- ##
 ## ------ CAR STATUS ------- ##
 ## ------------------------- ##
 # Header 7
-# 1239 bytes
-CARSTATUS_STRUCT = struct.Struct("<" + "BBBBBfffHHBBHBBBbfffBfffB" * 22)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Status:
+    LAYOUT: ClassVar[tuple] = codes("BBBBBfffHHBBHBBBbfffBfffB")
+
     traction_control: int
     anti_lock_brakes: int
     fuel_mix: int
@@ -783,36 +736,30 @@ class Status:
     network_paused: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class StatusPacket:
+    PACKET_ID: ClassVar[int] = 7
+    PACKET_SIZE: ClassVar[int] = 1239
+    LAYOUT: ClassVar[tuple] = (Repeat(Status, 22, lazy=True),)
+
     statuses: list[Status]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = CARSTATUS_STRUCT.unpack_from(mem, offset)
-        decoded = []
-        length_of_data = 25
-        number_of_repeats = 22
-        setups = [
-            Status(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        decoded.append(setups)
 
-        return cls(*decoded)
+CARSTATUS_STRUCT = StatusPacket.STRUCT
 
 
 ## ----------------------------------- ##
 ## ------ FINAL CLASSIFICATION ------- ##
 ## ----------------------------------- ##
 # Header 8
-# 1042 bytes
-FINALCLASSIFICATION_STRUCT = struct.Struct("<" + "B" + ("BBBBBBBId" + "B" * 27) * 22)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Classification:
+    LAYOUT: ClassVar[tuple] = codes("BBBBBBBId" + "B" * 27)
+
     position: int
     num_laps: int
     grid_position: int
@@ -851,37 +798,31 @@ class Classification:
     tyre_stint_8_end_lap: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class ClassificationPacket:
+    PACKET_ID: ClassVar[int] = 8
+    PACKET_SIZE: ClassVar[int] = 1042
+    LAYOUT: ClassVar[tuple] = ("B", Repeat(Classification, 22, lazy=True))
+
     number_of_cars: int
     classification: list[Classification]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = FINALCLASSIFICATION_STRUCT.unpack_from(mem, offset)
-        decoded = [values[0]]
-        length_of_data = 36
-        number_of_repeats = 22
-        cars = [
-            Classification(*chunk)
-            for chunk in islice(batched(values[1:], length_of_data), number_of_repeats)
-        ]
-        decoded.append(cars)
 
-        return cls(*decoded)
+FINALCLASSIFICATION_STRUCT = ClassificationPacket.STRUCT
 
 
 ## ------------------------- ##
 ## ------ LOBBY INFO ------- ##
 ## ------------------------- ##
 # Header 9
-# 954 bytes
-LOBBYINFO_STRUCT = struct.Struct("<B" + "BBBB32sBBBHB" * 22)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Lobby:
+    LAYOUT: ClassVar[tuple] = codes("BBBB32sBBBHB")
+
     ai_controlled: int
     team_id: int
     nationality: int
@@ -894,37 +835,31 @@ class Lobby:
     ready_status: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class LobbyPacket:
+    PACKET_ID: ClassVar[int] = 9
+    PACKET_SIZE: ClassVar[int] = 954
+    LAYOUT: ClassVar[tuple] = ("B", Repeat(Lobby, 22, lazy=True))
+
     number_of_players: int
     statuses: list[Lobby]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = LOBBYINFO_STRUCT.unpack_from(mem, offset)
-        decoded = [values[0]]
-        length_of_data = 43
-        number_of_repeats = 22
-        setups = [
-            Lobby(*chunk)
-            for chunk in islice(batched(values[1:], length_of_data), number_of_repeats)
-        ]
-        decoded.append(setups)
 
-        return cls(decoded)
+LOBBYINFO_STRUCT = LobbyPacket.STRUCT
 
 
 ## ------------------------- ##
 ## ------ CAR DAMAGE ------- ##
 ## ------------------------- ##
 # Header 10
-# 1041 bytes
-CARDAMAGE_STRUCT = struct.Struct("<" + "ffffBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB" * 22)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class Damage:
+    LAYOUT: ClassVar[tuple] = codes("ffffBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB")
+
     tyre_rl_wear_percentage: float
     tyre_rr_wear_percentage: float
     tyre_fl_wear_percentage: float
@@ -961,36 +896,30 @@ class Damage:
     engine_seized: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class DamagePacket:
+    PACKET_ID: ClassVar[int] = 10
+    PACKET_SIZE: ClassVar[int] = 1041
+    LAYOUT: ClassVar[tuple] = (Repeat(Damage, 22, lazy=True),)
+
     statuses: list[Damage]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = CARDAMAGE_STRUCT.unpack_from(mem, offset)
-        decoded = []
-        length_of_data = 34
-        number_of_repeats = 22
-        setups = [
-            Damage(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        decoded.append(setups)
 
-        return cls(*decoded)
+CARDAMAGE_STRUCT = DamagePacket.STRUCT
 
 
 ## ------------------------------ ##
 ## ------ SESSION HISTORY ------- ##
 ## ------------------------------ ##
 # Header 11
-# 1460 bytes
-SESSIONHISTORY_STRUCT = struct.Struct("<BBBBBBB" + "IHBHBHBB" * 100 + "BBB" * 8)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class LapHistory:
+    LAYOUT: ClassVar[tuple] = codes("IHBHBHBB")
+
     lap_time_ms: int
     sector1_time_ms_component: int
     sector1_time_minutes_component: int
@@ -1001,15 +930,27 @@ class LapHistory:
     lap_valid_bit_flags: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class TyreHistory:
+    LAYOUT: ClassVar[tuple] = codes("BBB")
+
     tyre_replaced_lap: int
     tyre_actual_compound: int
     tyre_visual_compound: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class SessionHistoryPacket:
+    PACKET_ID: ClassVar[int] = 11
+    PACKET_SIZE: ClassVar[int] = 1460
+    LAYOUT: ClassVar[tuple] = (
+        *codes("BBBBBBB"),
+        Repeat(LapHistory, 100),
+        Repeat(TyreHistory, 8),
+    )
+
     relevant_car_id: int
     number_of_laps_in_data: int
     number_of_tyre_stints: int
@@ -1020,39 +961,21 @@ class SessionHistoryPacket:
     lap_history_data: list[LapHistory]
     tyre_history_data: list[TyreHistory]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = SESSIONHISTORY_STRUCT.unpack_from(mem, offset)
-        decoded = [values[idx] for idx in range(7)]
-        length_of_laps = 8
-        number_of_laps = 100
-        laps = [
-            LapHistory(*chunk)
-            for chunk in islice(batched(values[7:], length_of_laps), number_of_laps)
-        ]
-        decoded.append(laps)
-
-        length_of_tyres = 3
-        number_of_tyres = 8
-        tyres = [
-            TyreHistory(*chunk)
-            for chunk in islice(batched(values[807:], length_of_tyres), number_of_tyres)
-        ]
-        decoded.append(tyres)
-        return cls(*decoded)
+
+SESSIONHISTORY_STRUCT = SessionHistoryPacket.STRUCT
 
 
 ## ------------------------ ##
 ## ------ TYRE SETS ------- ##
 ## ------------------------ ##
 # Header 12
-# 231 bytes
-TYRESETS_STRUCT = struct.Struct("<B" + "BBBBBBBhB" * 20 + "B")
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class TyreSets:
+    LAYOUT: ClassVar[tuple] = codes("BBBBBBBhB")
+
     actual_tyre_compound: int
     visual_tyre_compound: int
     wear: int
@@ -1064,39 +987,34 @@ class TyreSets:
     fitted: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class TyreSetsPacket:
+    PACKET_ID: ClassVar[int] = 12
+    PACKET_SIZE: ClassVar[int] = 231
+    LAYOUT: ClassVar[tuple] = ("B", Repeat(TyreSets, 20), "B")
+
     car_idx: int
     tyre_set_data: list[TyreSets]
     fitted_idx: int
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = TYRESETS_STRUCT.unpack_from(mem, offset)
-        decoded = [values[0]]
-        length_of_data = 9
-        number_of_repeats = 20
-        setups = [
-            TyreSets(*chunk)
-            for chunk in islice(batched(values[1:], length_of_data), number_of_repeats)
-        ]
-        decoded.append(setups)
-        decoded.append(values[-1])
 
-        return cls(*decoded)
+TYRESETS_STRUCT = TyreSetsPacket.STRUCT
 
 
 ## ------------------------------ ##
 ## ------ EXTENDED MOTION ------- ##
 ## ------------------------------ ##
 # Header 13
-# 273 bytes
-EXTENDEDMOTION_STRUCT = struct.Struct("<" + "f" * 61)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class ExMotion:
+    PACKET_ID: ClassVar[int] = 13
+    PACKET_SIZE: ClassVar[int] = 273
+    LAYOUT: ClassVar[tuple] = codes("f" * 61)
+
     suspension_rl_position: float
     suspension_rr_position: float
     suspension_fl_position: float
@@ -1159,23 +1077,21 @@ class ExMotion:
     wheel_fl_camber_gain: float
     wheel_fr_camber_gain: float
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = EXTENDEDMOTION_STRUCT.unpack_from(mem, offset)
-        return cls(*values)
+
+EXTENDEDMOTION_STRUCT = ExMotion.STRUCT
 
 
 ## ------------------------- ##
 ## ------ TIME TRIAL ------- ##
 ## ------------------------- ##
 # Header 14
-# 101 bytes
-TIMETRIAL_STRUCT = struct.Struct("<" + "BBIIIIBBBBBB" * 3)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class TimeTrial:
+    LAYOUT: ClassVar[tuple] = codes("BBIIIIBBBBBB")
+
     car_idx: int
     team_id: int
     lap_time_in_ms: int
@@ -1190,51 +1106,67 @@ class TimeTrial:
     valid: int
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class TimeTrialPacket:
+    PACKET_ID: ClassVar[int] = 14
+    PACKET_SIZE: ClassVar[int] = 101
+    LAYOUT: ClassVar[tuple] = (TimeTrial, TimeTrial, TimeTrial)
+
     player_session_best_data_set: TimeTrial
     personal_best_data_set: TimeTrial
     rival_data_set: TimeTrial
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = TIMETRIAL_STRUCT.unpack_from(mem, offset)
-        length_of_data = 12
-        number_of_repeats = 3
-        setups = [
-            TimeTrial(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
 
-        return cls(*setups)
+TIMETRIAL_STRUCT = TimeTrialPacket.STRUCT
 
 
 ## ------------------------------- ##
 ## ------ POSITION HISTORY ------- ##
 ## ------------------------------- ##
 # Header 15
-# 1131 bytes
-LAPPOSITION_STRUCT = struct.Struct("<BB" + "B" * 1100)
 
 
-@dataclass
+@decoder
+@dataclass(slots=True)
 class LapPositionPacket:
+    PACKET_ID: ClassVar[int] = 15
+    PACKET_SIZE: ClassVar[int] = 1131
+    LAYOUT: ClassVar[tuple] = (*codes("BB"), Repeat(Repeat("B", 22), 50))
+
     laps_in_data: int
     lap_where_data_starts: int
     position_for_vehicle_idx: list[list[int]]
 
-    @classmethod
-    def decode(cls, packet: bytes, offset: int = 29):
-        mem = memoryview(packet)
-        values = LAPPOSITION_STRUCT.unpack_from(mem, offset)
-        decoded = []
-        length_of_data = 50
-        number_of_repeats = 22
-        cars = [
-            list(*chunk)
-            for chunk in islice(batched(values, length_of_data), number_of_repeats)
-        ]
-        decoded.append(cars)
-
-        return cls(decoded)
+
+LAPPOSITION_STRUCT = LapPositionPacket.STRUCT
+
+
+PACKET_FORMAT = 2025
+
+# (packet_format, packet_id) -> packet class, for every class that declares a PACKET_ID
+PACKET_CLASSES = {
+    (PACKET_FORMAT, obj.PACKET_ID): obj
+    for obj in list(vars().values())
+    if isinstance(obj, type) and "PACKET_ID" in vars(obj)
+}
+
+# Largest datagram the game sends (SessionHistoryPacket), used to size shared memory slots
+MAX_PACKET_SIZE = HEADER_STRUCT.size + max(
+    MOTION_STRUCT.size,
+    SESSION_STRUCT.size,
+    LAPDATA_STRUCT.size,
+    EVENT_STRUCT.size,
+    PARTICIPANTS_STRUCT.size,
+    CARSETUP_STRUCT.size,
+    CARTELEMETRY_STRUCT.size,
+    CARSTATUS_STRUCT.size,
+    FINALCLASSIFICATION_STRUCT.size,
+    LOBBYINFO_STRUCT.size,
+    CARDAMAGE_STRUCT.size,
+    SESSIONHISTORY_STRUCT.size,
+    TYRESETS_STRUCT.size,
+    EXTENDEDMOTION_STRUCT.size,
+    TIMETRIAL_STRUCT.size,
+    LAPPOSITION_STRUCT.size,
+)
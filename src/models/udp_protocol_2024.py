@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""F1 24 (packet format 2024) layouts of the records that changed for F1 25,
+decoded onto the current classes so nothing downstream needs to know which game
+sent a packet. Fields F1 24 doesn't send come out as zero"""
+
+from models import udp_protocol
+from models.packet_schema import Default, codes
+
+PACKET_FORMAT = 2024
+
+# 48 byte names, no livery colours
+PARTICIPANT_LAYOUT = (*codes("BBBBBBB48sBBHB"), *[Default(0)] * 13)
+
+# 48 byte names
+LOBBY_LAYOUT = codes("BBBB48sBBBHB")
+
+# No tyre blisters
+DAMAGE_LAYOUT = (*codes("ffff" + "B" * 8), *[Default(0)] * 4, *codes("B" * 18))
+
+# No result reason
+CLASSIFICATION_LAYOUT = (*codes("BBBBBB"), Default(0), *codes("Id" + "B" * 27))
+
+# Stops at chassis yaw, no chassis pitch or camber
+EXMOTION_LAYOUT = (*codes("f" * 52), *[Default(0.0)] * 9)
+
+# Record or packet class -> its F1 24 layout, everything else is unchanged
+OVERRIDES = {
+    udp_protocol.Participant: PARTICIPANT_LAYOUT,
+    udp_protocol.Lobby: LOBBY_LAYOUT,
+    udp_protocol.Damage: DAMAGE_LAYOUT,
+    udp_protocol.Classification: CLASSIFICATION_LAYOUT,
+    udp_protocol.ExMotion: EXMOTION_LAYOUT,
+}
+
+# New in F1 25
+MISSING = {udp_protocol.LapPositionPacket}
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Raw packets for tests, so the header layout is only spelled out here"""
+
+from models import udp_protocol
+
+
+def make_packet(
+    packet_id: int,
+    body: bytes = b"",
+    packet_format: int = udp_protocol.PACKET_FORMAT,
+    packet_version: int = 1,
+    frame_id: int = 0,
+    player_car_index: int = 0,
+) -> bytes:
+    """body behind a header of packet_id, timed frame_id frames into the session"""
+    header = udp_protocol.Header(
+        packet_format, 25, 1, 0, packet_version, packet_id, 0, frame_id / 60,
+        frame_id, frame_id, player_car_index, 255,
+    )  # fmt: skip
+    return header.encode() + body
+
+
+def packet_id(datagram: bytes) -> int:
+    return udp_protocol.HEADER_STRUCT.unpack_from(datagram)[5]
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import numpy as np
+import pytest
+
+from config.state import State
+from models import rich_layout, udp_arrays, udp_protocol_2024
+from tests.helpers import packet_id
+from utils import synthetic_feed, udp_processor
+from utils.channel_history import ChannelHistory, ChannelRing
+from utils.layout_updaters import process_data, process_packet
+
+TELEMETRY = udp_arrays.TelemetryArray.PACKET_ID
+
+
+def fill(ring: ChannelRing, samples: int):
+    """speed = 10 * time + car, a sample a second"""
+    for t in range(samples):
+        ring.append(float(t), {"speed": 10 * t + np.arange(22)})
+
+
+def test_windows_survive_wrapping():
+    ring = ChannelRing(("speed",), capacity=8)
+    fill(ring, 13)
+
+    times, values = ring.window("speed")
+    assert list(times) == list(range(5, 13))
+    assert list(values[3]) == [10 * t + 3 for t in range(5, 13)]
+    # A view, not a copy
+    assert values.base is ring.values
+
+    times, values = ring.window("speed", seconds=2)
+    assert list(times) == [10, 11, 12]
+    assert list(ring.window("speed", samples=2)[0]) == [11, 12]
+
+
+def test_window_queries():
+    ring = ChannelRing(("speed",), capacity=8)
+    fill(ring, 13)
+
+    assert ring.mean("speed", seconds=2)[0] == pytest.approx(110)
+    low, high = ring.minmax("speed", seconds=2)
+    assert (low[4], high[4]) == (104, 124)
+    assert ring.slope("speed") == pytest.approx(np.full(22, 10))
+    assert np.isnan(ChannelRing(("speed",), capacity=8).mean("speed")).all()
+
+
+def test_time_going_back_starts_again():
+    ring = ChannelRing(("speed",), capacity=8)
+    fill(ring, 5)
+    ring.append(1.0, {"speed": np.zeros(22)})
+    assert len(ring) == 1
+
+
+def test_fed_by_process_data():
+    layout = rich_layout.create_race_layout()
+    state = State(channel_history=ChannelHistory())
+    race = synthetic_feed.Race(rate=60)
+    for _ in range(120):
+        # In packet id order, as the state table hands them over
+        for datagram in sorted(race.frame(), key=packet_id):
+            header, values = udp_processor.decode_udp(datagram, len(datagram))
+            process_data(header, values, layout, state)
+
+    ring = state.channel_history[TELEMETRY]
+    assert len(ring) == 120
+    assert state.changed_since("channel_history", state.versions["telemetry"] - 1)
+    times, speeds = ring.window("speed", seconds=1)
+    assert times[-1] - times[0] <= 1
+    assert list(speeds[:, -1]) == list(state.telemetry["speed"])
+
+
+def test_fed_f1_24_packets():
+    """Older formats decode to dataclasses rather than arrays"""
+    layout = rich_layout.create_race_layout()
+    state = State(channel_history=ChannelHistory())
+    race = synthetic_feed.Race(rate=60)
+    for _ in range(3):
+        for datagram in sorted(race.frame(), key=packet_id):
+            # These didn't change for F1 25
+            if packet_id(datagram) in (0, 5, 6, 7):
+                datagram = (
+                    udp_protocol_2024.PACKET_FORMAT.to_bytes(2, "little") + datagram[2:]
+                )
+                process_packet(datagram, layout, state)
+
+    assert not isinstance(state.telemetry, udp_arrays.ArrayPacket)
+    ring = state.channel_history[TELEMETRY]
+    assert len(ring) == 3
+    _, speeds = ring.window("speed", samples=1)
+    assert list(speeds[:, -1]) == [car.speed for car in state.telemetry.statuses]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+from utils.frame_budget import FrameBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def test_renders_once_per_interval():
+    clock = FakeClock()
+    budget = FrameBudget(fps=10, clock=clock)
+    drawn = []
+
+    # 60 updates a second for one second
+    for _ in range(60):
+        budget.apply(lambda: None)
+        if budget.due():
+            budget.render(lambda: drawn.append(clock.now))
+        clock.advance(1 / 60)
+
+    assert len(drawn) == 10
+    # The first frame drew straight away, the last few updates wait for the next
+    assert budget.updates + budget.pending == 60
+    assert budget.pending < 6
+
+
+def test_overruns_are_counted_and_dropped():
+    clock = FakeClock()
+    budget = FrameBudget(fps=10, clock=clock)
+
+    budget.apply(clock.advance, 0.05)
+    budget.render(lambda: clock.advance(0.2))
+
+    stats = budget.stats()
+    assert stats["overruns"] == 1
+    assert stats["worst_work_ms"] == 250.0
+    # The frames missed meanwhile aren't owed, the next is due straight away
+    assert budget.due()
+    budget.render(lambda: None)
+    assert not budget.due()
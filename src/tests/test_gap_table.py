@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import math
+from types import SimpleNamespace
+
+import pytest
+
+from config.state import State
+from utils import prettyfy
+from utils.gap_table import GapTable
+from utils.position_index import PositionIndex
+
+TRACK_LENGTH = 1000.0
+
+
+def lapdata(distances: list[float]):
+    """Cars at distances, placed in that order, the rest not running"""
+    cars = [
+        SimpleNamespace(session_distance_travelled_m=-1.0, car_position=0)
+        for _ in range(22)
+    ]
+    for place, distance in enumerate(distances):
+        cars[place].session_distance_travelled_m = distance
+        cars[place].car_position = place + 1
+    return SimpleNamespace(cars=cars)
+
+
+def drive(table: GapTable, seconds: float, speeds: list[float], starts: list[float]):
+    """Cars at constant speeds, a packet every 1/60s"""
+    for tick in range(int(seconds * 60) + 1):
+        now = tick / 60
+        packet = lapdata([start + speed * now for start, speed in zip(starts, speeds)])
+        table.update(now, packet, PositionIndex.of(packet))
+
+
+def test_intervals_and_gaps():
+    table = GapTable(TRACK_LENGTH)
+    # 1s and then 0.5s apart at 50m/s
+    drive(table, 10, speeds=[50, 50, 50], starts=[100, 50, 25])
+
+    assert math.isnan(table.interval_ms[0]) and math.isnan(table.gap_ms[0])
+    assert table.interval_ms[1] == pytest.approx(1000, abs=1)
+    assert table.interval_ms[2] == pytest.approx(500, abs=1)
+    assert table.gap_ms[2] == pytest.approx(1500, abs=1)
+    # Not running
+    assert math.isnan(table.gap_ms[3])
+
+
+def test_lapped_cars_count_laps():
+    table = GapTable(TRACK_LENGTH)
+    drive(table, 50, speeds=[50, 20], starts=[0, 0])
+
+    assert table.gap_laps[1] == 1
+    assert table.interval_laps[1] == 1
+    assert table.gap_laps[0] == 0
+
+
+def test_only_changes_when_someone_passes_a_checkpoint():
+    table = GapTable(TRACK_LENGTH)
+    packet = lapdata([120.0, 60.0])
+    assert table.update(1.0, packet, PositionIndex.of(packet))
+    packet = lapdata([121.0, 61.0])
+    assert not table.update(1.02, packet, PositionIndex.of(packet))
+
+
+def test_flashback_starts_again():
+    table = GapTable(TRACK_LENGTH)
+    drive(table, 5, speeds=[50, 50], starts=[100, 50])
+    packet = lapdata([150.0, 100.0])
+    table.update(1.0, packet, PositionIndex.of(packet))
+
+    assert math.isnan(table.interval_ms[1])
+    assert table.latest.tolist()[:2] == [3, 2]
+
+
+def test_gap_text():
+    assert prettyfy.gap_text(math.nan, 0) == ""
+    assert prettyfy.gap_text(1234.0, 0) == "+1.2"
+    assert prettyfy.gap_text(math.nan, 2) == "+2 L"
+
+
+def test_snapshot_keeps_its_gaps():
+    state = State()
+    state.gaps = GapTable(TRACK_LENGTH)
+    drive(state.gaps, 10, speeds=[50, 50], starts=[100, 50])
+    snapshot = state.snapshot()
+
+    # The car behind closing in, after the snapshot
+    for tick in range(1, 5 * 60):
+        now = 10 + tick / 60
+        packet = lapdata([600 + 50 * (now - 10), 550 + 60 * (now - 10)])
+        state.gaps.update(now, packet, PositionIndex.of(packet))
+
+    assert snapshot.gaps is not state.gaps
+    assert snapshot.gaps.interval_ms[1] == pytest.approx(1000, abs=1)
+    assert state.gaps.interval_ms[1] < 900
+    assert snapshot.gaps.session_time == 10
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from config.state import State
+from utils.lap_delta import LapDelta, LapTrace
+
+TRACK_LENGTH = 1000.0
+
+
+def carlap(lap, distance, time_ms, last_lap_ms=0, invalid=0):
+    return SimpleNamespace(
+        current_lap_number=lap,
+        lap_distance_travelled_m=distance,
+        current_lap_time_ms=time_ms,
+        last_lap_time_ms=last_lap_ms,
+        current_lap_invalid=invalid,
+    )
+
+
+def drive(delta: LapDelta, lap: int, speed: float, last_lap_ms=0, invalid=0):
+    """A lap at speed m/s, a reading every 7.3m so they never land on a sample"""
+    distance = 0.0
+    while distance < TRACK_LENGTH:
+        delta.update(
+            carlap(lap, distance, distance / speed * 1000, last_lap_ms, invalid)
+        )
+        distance += 7.3
+    return TRACK_LENGTH / speed * 1000
+
+
+def test_trace_interpolates_between_readings():
+    trace = LapTrace(TRACK_LENGTH)
+    for distance in (0.0, 7.3, 14.6, 21.9):
+        trace.record(distance, distance * 20)
+
+    assert trace.time_at(10.0) == pytest.approx(200)
+    assert trace.time_at(3.3) == pytest.approx(66)
+    assert trace.time_at(50.0) is None
+
+
+def test_flashback_drops_what_was_past_it():
+    trace = LapTrace(TRACK_LENGTH)
+    trace.record(100.0, 2000)
+    trace.record(40.0, 800)
+    assert trace.time_at(60.0) is None
+    trace.record(100.0, 1400)
+    assert trace.time_at(70.0) == pytest.approx(1100)
+
+
+def test_delta_to_previous_and_best():
+    delta = LapDelta(TRACK_LENGTH)
+    # Joined part way round, no use as a reference
+    delta.update(carlap(1, 600.0, 12000))
+    slow = drive(delta, 2, speed=50)
+    assert delta.previous is None
+
+    quick = drive(delta, 3, speed=55, last_lap_ms=slow)
+    assert delta.best is delta.previous
+    assert delta.best_time_ms == slow
+
+    # Invalid laps are a previous lap but never the best
+    drive(delta, 4, speed=60, last_lap_ms=quick, invalid=1)
+    delta.update(carlap(5, 0.0, 0, last_lap_ms=TRACK_LENGTH / 60 * 1000))
+    assert delta.best_time_ms == quick
+    assert delta.previous is not delta.best
+
+    # Half way round at 50m/s, against a lap at 55m/s and one at 60m/s
+    assert delta.delta(delta.best, 500.0, 10000) == pytest.approx(
+        10000 - 500 / 55 * 1000
+    )
+    assert delta.delta(delta.previous, 500.0, 10000) == pytest.approx(
+        10000 - 500 / 60 * 1000
+    )
+    assert delta.delta(None, 500.0, 10000) is None
+
+
+def test_snapshot_keeps_its_deltas():
+    state = State()
+    state.lap_delta = LapDelta(TRACK_LENGTH)
+    drive(state.lap_delta, 1, speed=50)
+    slow = drive(state.lap_delta, 2, speed=50)
+    snapshot = state.snapshot()
+
+    drive(state.lap_delta, 3, speed=55, last_lap_ms=slow)
+
+    assert snapshot.lap_delta is not state.lap_delta
+    assert snapshot.lap_delta.lap_number == 2
+    assert snapshot.lap_delta.best_time_ms is None
+    assert snapshot.lap_delta.current.time_at(500.0) == pytest.approx(10000)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import io
+
+import rich
+from rich.console import Console
+from rich.panel import Panel
+
+from config.state import State
+from models import rich_layout
+from utils import layout_updaters, synthetic_feed
+
+TYRE = ("footer", "tyre_temp", "front", "left")
+
+
+def render(layout) -> str:
+    console = Console(file=io.StringIO(), width=120, height=40)
+    console.print(layout)
+    return console.file.getvalue()
+
+
+def test_unchanged_strings_are_left_alone():
+    layout = rich_layout.create_race_layout()
+    regions = layout_updaters.panels(layout)
+
+    assert regions.show(TYRE, "95")
+    text = regions.regions[TYRE].text
+    assert regions.take_dirty() == {TYRE}
+
+    assert not regions.show(TYRE, "95")
+    assert regions.take_dirty() == set()
+
+    assert regions.show(TYRE, "96")
+    assert regions.regions[TYRE].text is text
+    assert text.plain == "96"
+
+
+def test_only_changed_regions_render_again():
+    layout = rich_layout.create_race_layout()
+    regions = layout_updaters.panels(layout)
+    regions.show(TYRE, "95")
+    regions.show(("footer", "pit_info"), "80kmph", justify="left")
+    render(layout)
+
+    lines = {path: region.lines for path, region in regions.regions.items()}
+    regions.show(TYRE, "96")
+    render(layout)
+
+    assert regions.regions[TYRE].lines is not lines[TYRE]
+    assert all(
+        region.lines is lines[path]
+        for path, region in regions.regions.items()
+        if path != TYRE
+    )
+
+
+def test_renders_like_fresh_panels():
+    cached = rich_layout.create_race_layout()
+    layout_updaters.panels(cached).show(TYRE, "95\n23.0psi")
+    render(cached)
+    layout_updaters.panels(cached).show(TYRE, "97\n23.1psi")
+
+    fresh = rich_layout.create_race_layout()
+    fresh["footer"]["tyre_temp"]["front"]["left"].update(
+        Panel(rich.text.Text("97\n23.1psi", justify="center"))
+    )
+
+    assert render(cached) == render(fresh)
+
+
+def test_telemetry_before_any_setup():
+    layout = rich_layout.create_race_layout()
+    regions = layout_updaters.panels(layout)
+    state = State()
+    race = synthetic_feed.Race(rate=60)
+
+    # In the order they're sent, telemetry every frame goes ahead of the first setup
+    early = 0
+    for datagram in race.frame():
+        layout_updaters.process_packet(datagram, layout, state)
+        if state.telemetry is not None and state.setup is None:
+            early += 1
+    assert early
+
+    for datagram in race.frame():
+        layout_updaters.process_packet(datagram, layout, state)
+    assert "pressure" in regions.regions[TYRE].text.plain
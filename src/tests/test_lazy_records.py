@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import os
+from dataclasses import fields
+from itertools import batched
+
+import pytest
+
+from models import udp_protocol
+
+# packet, whole packet struct, bytes ahead of the records
+LAZY_PACKETS = [
+    (udp_protocol.MotionPacket, udp_protocol.MOTION_STRUCT, 0),
+    (udp_protocol.LapdataPacket, udp_protocol.LAPDATA_STRUCT, 0),
+    (udp_protocol.ParticipantsPacket, udp_protocol.PARTICIPANTS_STRUCT, 1),
+    (udp_protocol.SetupPacket, udp_protocol.CARSETUP_STRUCT, 0),
+    (udp_protocol.TelemetryPacket, udp_protocol.CARTELEMETRY_STRUCT, 0),
+    (udp_protocol.StatusPacket, udp_protocol.CARSTATUS_STRUCT, 0),
+    (udp_protocol.ClassificationPacket, udp_protocol.FINALCLASSIFICATION_STRUCT, 1),
+    (udp_protocol.LobbyPacket, udp_protocol.LOBBYINFO_STRUCT, 1),
+    (udp_protocol.DamagePacket, udp_protocol.CARDAMAGE_STRUCT, 0),
+]
+
+
+def records(packet) -> udp_protocol.LazyRecords:
+    return next(
+        getattr(packet, field.name)
+        for field in fields(packet)
+        if isinstance(getattr(packet, field.name), udp_protocol.LazyRecords)
+    )
+
+
+@pytest.mark.parametrize(
+    "cls,layout,leading", LAZY_PACKETS, ids=lambda value: getattr(value, "__name__", "")
+)
+def test_records_match_whole_packet_unpack(cls, layout, leading):
+    packet = bytes(29) + os.urandom(layout.size)
+    lazy = records(cls.decode(packet))
+
+    values = layout.unpack_from(packet, 29)[leading:]
+    width = len(fields(lazy.record))
+    eager = [lazy.record(*chunk) for chunk in batched(values[: width * 22], width)]
+
+    # repr so random NaNs still compare equal
+    assert repr(lazy[7]) == repr(eager[7])
+    assert repr(lazy[-1]) == repr(eager[21])
+    assert repr(list(lazy)) == repr(eager)
+    assert lazy.end == 29 + leading + lazy.layout.size * 22
+
+
+def test_only_indexed_cars_are_decoded():
+    packet = bytes(29) + os.urandom(udp_protocol.CARTELEMETRY_STRUCT.size)
+    telemetry = udp_protocol.TelemetryPacket.decode(packet)
+
+    player = telemetry.statuses[4]
+    assert telemetry.statuses.cache.count(None) == 21
+    assert telemetry.statuses[4] is player
+
+    assert len(telemetry.statuses[2:6]) == 4
+    assert telemetry.statuses.cache.count(None) == 18
+    assert telemetry.statuses.cache[4] is player
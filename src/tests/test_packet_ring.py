@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import os
+import socket
+
+import pytest
+
+from models import udp_protocol
+from utils import packet_ring, udp_receiver
+from utils.packet_ring import PacketRing
+
+
+@pytest.fixture
+def ring():
+    ring = PacketRing.create(slot_count=128, overflow_count=2)
+    yield ring
+    ring.close()
+    ring.unlink()
+
+
+@pytest.fixture
+def sockets():
+    rx = udp_receiver.open_socket("127.0.0.1", 0)
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    yield rx, tx
+    rx.close()
+    tx.close()
+
+
+def write(ring, payload: bytes):
+    ring.write_payload[: len(payload)] = payload
+    ring.publish(len(payload))
+
+
+def test_slots_fit_largest_packet():
+    assert udp_protocol.MAX_PACKET_SIZE == 1460
+    assert packet_ring.DEFAULT_SLOT_SIZE % packet_ring.CACHE_LINE == 0
+    assert packet_ring.DEFAULT_SLOT_SIZE >= udp_protocol.MAX_PACKET_SIZE
+
+
+def test_reader_takes_geometry_from_header(ring):
+    reader = PacketRing.attach(ring.shm.name, reader=0)
+    try:
+        assert reader.slot_size == ring.slot_size
+        assert reader.slot_count == 128
+        assert reader.overflow_count == 2
+    finally:
+        reader.close()
+
+
+@pytest.mark.parametrize(
+    "receive", [udp_receiver.receive_into, udp_receiver.receive_copy]
+)
+def test_round_trip_including_oversize(ring, sockets, receive):
+    rx, tx = sockets
+    reader = PacketRing.attach(ring.shm.name, reader=0)
+    datagrams = [os.urandom(size) for size in (45, 1460, 3000, 60000)]
+    for datagram in datagrams:
+        tx.sendto(datagram, rx.getsockname())
+
+    received = 0
+    while received < len(datagrams):
+        received += receive(rx, ring, 64)
+
+    assert [reader.read() for _ in datagrams] == datagrams
+    assert reader.read() is None
+    assert ring.stats()["oversize"] == 2
+    reader.close()
+
+
+def test_counters_visible_to_other_processes(ring):
+    reader = PacketRing.attach(ring.shm.name, reader=3, reader_name="tui")
+    observer = PacketRing.attach(ring.shm.name)
+    try:
+        for seq in range(5):
+            write(ring, bytes([seq]) * 100)
+        assert reader.read() == bytes([0]) * 100
+        assert reader.read() == bytes([1]) * 100
+
+        assert observer.stats() == {
+            "produced": 5,
+            "oversize": 0,
+            "readers": {
+                3: {
+                    "name": "tui",
+                    "pid": os.getpid(),
+                    "consumed": 2,
+                    "overwritten": 0,
+                    "backlog": 3,
+                    "last_overrun_seq": 0,
+                }
+            },
+        }
+    finally:
+        reader.close()
+        observer.close()
+
+
+def test_lapped_reader_skips_and_counts():
+    ring = PacketRing.create(slot_size=8192, slot_count=32, overflow_count=1)
+    try:
+        # A 64 KiB datagram can spill over 8 slots, leaving a window of 24
+        assert ring.window == 24
+        reader = PacketRing.attach(ring.shm.name, reader=0)
+        for seq in range(40):
+            write(ring, seq.to_bytes(4))
+
+        assert reader.read() == (40 - 24).to_bytes(4)
+        stats = reader.stats()["readers"][0]
+        assert stats["overwritten"] == 16
+        assert stats["last_overrun_seq"] == 15
+        assert stats["consumed"] == 1
+        assert 40 == stats["consumed"] + stats["overwritten"] + stats["backlog"]
+        reader.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_overflow_slot_reuse_is_detected():
+    ring = PacketRing.create(slot_size=8192, slot_count=32, overflow_count=1)
+    try:
+        reader = PacketRing.attach(ring.shm.name, reader=0)
+        write(ring, b"a" * 10000)
+        write(ring, b"b" * 10000)
+        # The first oversize datagram's overflow slot now holds the second one
+        assert reader.read() == b"b" * 10000
+        assert reader.stats()["readers"][0]["overwritten"] == 1
+        reader.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+
+def test_readers_keep_independent_cursors():
+    ring = PacketRing.create(slot_size=8192, slot_count=32, overflow_count=1)
+    fast = PacketRing.attach(ring.shm.name, reader=0, reader_name="processor")
+    slow = PacketRing.attach(ring.shm.name, reader=1, reader_name="recorder")
+    try:
+        for seq in range(10):
+            write(ring, seq.to_bytes(4))
+            assert fast.read() == seq.to_bytes(4)
+
+        # Nothing the fast reader did is visible to the slow one
+        assert slow.read() == (0).to_bytes(4)
+
+        # The writer runs on regardless, and only the slow reader pays for it
+        for seq in range(10, 60):
+            write(ring, seq.to_bytes(4))
+            assert fast.read() == seq.to_bytes(4)
+        assert slow.read() == (60 - 24).to_bytes(4)
+
+        readers = ring.stats()["readers"]
+        assert readers[0]["consumed"] == 60
+        assert readers[0]["overwritten"] == 0
+        assert readers[1]["consumed"] == 2
+        assert readers[1]["overwritten"] == 60 - 24 - 1
+    finally:
+        fast.close()
+        slow.close()
+        ring.close()
+        ring.unlink()
+
+
+def test_reader_id_cannot_be_shared(ring):
+    reader = PacketRing.attach(ring.shm.name, reader=0)
+    try:
+        with pytest.raises(RuntimeError):
+            PacketRing.attach(ring.shm.name, reader=0)
+    finally:
+        reader.close()
+
+    # Closing frees the id again
+    PacketRing.attach(ring.shm.name, reader=0).close()
+
+
+def test_reader_is_woken_by_writer(ring):
+    reader = PacketRing.attach(ring.shm.name, reader=0)
+    try:
+        assert reader.read() is None
+        assert not reader.wait(timeout=0.01)
+
+        write(ring, b"data")
+        ring.notify()
+        assert reader.wait(timeout=1.0)
+        assert reader.read() == b"data"
+    finally:
+        reader.close()
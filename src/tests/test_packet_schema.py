@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import inspect
+import struct
+from dataclasses import dataclass
+from typing import ClassVar
+
+import pytest
+
+from models import udp_protocol
+from models.packet_schema import (
+    HEADER_SIZE,
+    Default,
+    LazyRecords,
+    Repeat,
+    codes,
+    decoder,
+    generate,
+)
+
+
+@decoder
+@dataclass(slots=True)
+class Point:
+    LAYOUT: ClassVar[tuple] = codes("hh")
+
+    x: int
+    y: int
+
+
+@decoder
+@dataclass(slots=True)
+class Shape:
+    LAYOUT: ClassVar[tuple] = ("4s", Point, Repeat(Point, 2), Repeat(Repeat("B", 2), 2))
+
+    name: bytes
+    origin: Point
+    corners: list[Point]
+    grid: list[list[int]]
+
+
+def test_codes_split_per_value():
+    assert codes("BB32sH2f") == ("B", "B", "32s", "H", "f", "f")
+
+
+def test_nested_layout_decodes():
+    packet = struct.pack("<4s6h4B", b"tri!", 1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+
+    assert Shape.STRUCT.size == len(packet)
+    assert Shape.decode(packet) == Shape(
+        b"tri!", Point(1, 2), [Point(3, 4), Point(5, 6)], [[7, 8], [9, 10]]
+    )
+
+
+def test_lazy_repeat_skips_unpacking():
+    @decoder
+    @dataclass(slots=True)
+    class Cars:
+        LAYOUT: ClassVar[tuple] = ("B", Repeat(Point, 3, lazy=True), "B")
+
+        count: int
+        points: list[Point]
+        trailer: int
+
+    cars = Cars.decode(struct.pack("<B6hB", 3, 1, 2, 3, 4, 5, 6, 9))
+    assert isinstance(cars.points, LazyRecords)
+    assert cars.points[2] == Point(5, 6)
+    assert cars.trailer == 9
+
+
+def test_override_reads_an_old_layout():
+    # An older Point with a wider x and no y
+    layout, decode = generate(Shape, {Point: ("i", Default(0))}, label="old")
+    packet = struct.pack("<4s3i4B", b"old!", 1, 2, 3, 7, 8, 9, 10)
+
+    assert layout.size == len(packet)
+    assert decode.__get__(None, Shape)(packet) == Shape(
+        b"old!", Point(1, 0), [Point(2, 0), Point(3, 0)], [[7, 8], [9, 10]]
+    )
+    # The class itself keeps its own layout
+    assert Shape.STRUCT.format == "<4shhhhhhBBBB"
+
+
+def test_generated_source_is_inspectable():
+    source = inspect.getsource(udp_protocol.TimeTrialPacket.decode)
+    assert "TimeTrial(*v[24:36]),  # rival_data_set" in source
+
+
+def test_layout_must_cover_every_field():
+    with pytest.raises(ValueError, match="2 entries for 3 fields"):
+
+        @decoder
+        @dataclass(slots=True)
+        class Short:
+            LAYOUT: ClassVar[tuple] = ("B", "B")
+
+            a: int
+            b: int
+            c: int
+
+
+def test_packet_size_is_checked():
+    with pytest.raises(ValueError, match="layout is 30 bytes, the packet is 31"):
+
+        @decoder
+        @dataclass(slots=True)
+        class Wrong:
+            PACKET_ID: ClassVar[int] = 99
+            PACKET_SIZE: ClassVar[int] = 31
+            LAYOUT: ClassVar[tuple] = ("B",)
+
+            a: int
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [cls for cls in udp_protocol.PACKET_CLASSES.values() if hasattr(cls, "LAYOUT")],
+    ids=lambda cls: cls.__name__,
+)
+def test_every_packet_fills_its_datagram(cls):
+    assert HEADER_SIZE + cls.STRUCT.size == cls.PACKET_SIZE
+    assert cls.decode(bytes(cls.PACKET_SIZE)) is not None
+
+
+@pytest.mark.parametrize(
+    "packet",
+    [cls for cls in udp_protocol.PACKET_CLASSES.values() if hasattr(cls, "LAYOUT")],
+)
+def test_encode_round_trips(packet: type):
+    # Kept below 0x40 so no float comes out as a NaN, which needn't pack back the same
+    raw = bytes(idx * 7 % 64 for idx in range(packet.PACKET_SIZE))
+
+    assert packet.decode(raw).encode() == raw[HEADER_SIZE:]
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        udp_protocol.EventPacket("SSTA"),
+        udp_protocol.FastestLap(3, 81.5),
+        udp_protocol.Penalty(1, 2, 3, 4, 5, 6, 7),
+    ],
+)
+def test_event_encode_round_trips(event):
+    encoded = event.encode()
+
+    assert len(encoded) == udp_protocol.EVENT_STRUCT.size
+    assert udp_protocol.EventPacket.decode(bytes(HEADER_SIZE) + encoded) == event
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+from config.state import State
+from models import rich_layout, udp_arrays, udp_protocol
+from tests.helpers import make_packet, packet_id
+from utils import synthetic_feed, udp_processor
+from utils.layout_updaters import process_data
+from utils.position_index import PositionIndex
+
+
+def lapdata(positions: list[int]) -> udp_protocol.LapdataPacket:
+    packet = synthetic_feed.blank(udp_protocol.LapdataPacket)
+    for carlap, position in zip(packet.cars, positions):
+        carlap.car_position = position
+    return packet
+
+
+def test_lookups_both_ways():
+    # Car 21 isn't running
+    positions = [(idx * 5) % 21 + 1 for idx in range(21)] + [0]
+    index = PositionIndex.of(lapdata(positions))
+
+    for car_idx, position in enumerate(positions[:21]):
+        assert index.car(position) == car_idx
+        assert index.positions[car_idx] == position
+    leader, second = positions.index(1), positions.index(2)
+    last = positions.index(21)
+    assert index.ahead(leader) is None
+    assert index.behind(leader) == second
+    assert index.ahead(second) == leader
+    assert index.behind(last) is None
+    assert index.car(0) is None and index.car(22) is None
+    assert index.order() == [positions.index(p) for p in range(1, 22)]
+
+
+def test_array_and_dataclass_agree():
+    packet = lapdata([22 - idx for idx in range(22)])
+    array = udp_arrays.LapdataArray.decode(make_packet(2, packet.encode()))
+
+    assert PositionIndex.of(array) == PositionIndex.of(packet)
+
+
+def test_previous_index_is_kept_not_rebuilt():
+    layout = rich_layout.create_race_layout()
+    state = State()
+    race = synthetic_feed.Race(rate=60)
+    indices = []
+    for _ in range(3):
+        for datagram in sorted(race.frame(), key=packet_id):
+            header, values = udp_processor.decode_udp(datagram, len(datagram))
+            process_data(header, values, layout, state)
+        indices.append(state.positions)
+
+    assert state.prev_positions is indices[1]
+    assert state.positions == PositionIndex.of(state.lapdata)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import struct
+from multiprocessing import shared_memory
+
+import pytest
+
+from utils import shared_segment
+
+HEADER = struct.Struct("<4sI")
+
+
+def test_attach_waits_for_the_magic():
+    shm = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        # Header written but not the magic yet
+        HEADER.pack_into(shm.buf, 0, b"\0" * 4, 7)
+        with pytest.raises(TimeoutError):
+            shared_segment.attach(shm.name, b"TEST", 0.05, "Test segment")
+
+        shm.buf[:4] = b"TEST"
+        attached = shared_segment.attach(shm.name, b"TEST", 0.05, "Test segment")
+        assert HEADER.unpack_from(attached.buf) == (b"TEST", 7)
+        attached.close()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_create_writes_the_header():
+    shm = shared_segment.create(None, 64, HEADER, b"TEST", 7)
+    try:
+        assert HEADER.unpack_from(shm.buf) == (b"TEST", 7)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def test_reader_ids_are_claimed_once():
+    bells = shared_segment.bells("test_claims", 2)
+    first = shared_segment.claim_reader(bells, 1)
+    try:
+        with pytest.raises(RuntimeError):
+            shared_segment.claim_reader(bells, 1)
+        with pytest.raises(ValueError):
+            shared_segment.claim_reader(bells, 2)
+    finally:
+        first.close()
+    # Free again once closed
+    shared_segment.claim_reader(bells, 1).close()
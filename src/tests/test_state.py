@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import pytest
+
+from config.state import State
+
+
+def test_versions_count_changes():
+    state = State()
+    assert state.version == 0
+    seen = state.version
+
+    state.lapdata = "lap 1"
+    state.set_item("tyres", 3, {"fitted_idx": 0})
+
+    assert state.changed_since("lapdata", seen)
+    assert state.changed_since("tyres", seen)
+    assert not state.changed_since("session", seen)
+    assert not state.changed_since("lapdata", state.versions["lapdata"])
+    assert state.version == 2
+
+
+def test_subscribers_hear_their_fields():
+    state = State()
+    heard = []
+
+    def listen(changed, name):
+        heard.append((name, getattr(changed, name)))
+
+    state.subscribe(listen, "lapdata", "tyres")
+    state.session = "session"
+    state.lapdata = "lap 1"
+    state.set_item("tyres", 0, "softs")
+    state.unsubscribe(listen, "lapdata")
+    state.lapdata = "lap 2"
+
+    assert heard == [("lapdata", "lap 1"), ("tyres", ["softs"] + [None] * 21)]
+    with pytest.raises(KeyError):
+        state.subscribe(listen, "laptime")
+
+
+def test_snapshot_is_independent():
+    state = State()
+    state.lapdata = "lap 1"
+    state.set_item("history", 5, {"best_lap_number": 1})
+    state.subscribe(lambda *_: pytest.fail("snapshot kept a subscriber"), "lapdata")
+
+    snapshot = state.snapshot()
+    snapshot.lapdata = "lap 2"
+    snapshot.set_item("history", 5, None)
+
+    assert state.lapdata == "lap 1"
+    assert state.history[5] == {"best_lap_number": 1}
+    assert snapshot.versions["lapdata"] > state.versions["lapdata"]
+    assert state.snapshot().version == state.version
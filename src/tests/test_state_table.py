@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import pytest
+
+from models import udp_protocol
+from tests.helpers import make_packet
+from utils import state_table, udp_processor
+from utils.shared_segment import COUNTER_STRUCT
+from utils.state_table import StateTable
+
+
+@pytest.fixture
+def table():
+    table = StateTable.create()
+    yield table
+    table.close()
+    table.unlink()
+
+
+def test_latest_packet_wins(table):
+    reader = StateTable.attach(table.shm.name, reader=0)
+    try:
+        assert reader.read(6) is None
+        for lap in range(3):
+            table.publish(6, make_packet(6, bytes([lap]) * 1323))
+
+        assert reader.read(6) == make_packet(6, bytes([2]) * 1323)
+        assert reader.changes() == [make_packet(6, bytes([2]) * 1323)]
+        assert reader.changes() == []
+    finally:
+        reader.close()
+
+
+def test_per_car_packets_get_an_entry_each(table):
+    reader = StateTable.attach(table.shm.name, reader=0)
+    try:
+        for car in (0, 7, 21):
+            table.publish(12, make_packet(12, bytes([car]) * 202))
+        # Out of range car indexes have nowhere to go
+        assert not table.publish(12, make_packet(12, bytes([22]) * 202))
+
+        assert reader.read(12, 7) == make_packet(12, bytes([7]) * 202)
+        assert reader.read(12, 8) is None
+        assert len(reader.changes()) == 3
+    finally:
+        reader.close()
+
+
+def test_events_are_not_conflated(table):
+    reader = StateTable.attach(table.shm.name, reader=0)
+    try:
+        events = [make_packet(3, b"BUTN" + bytes([n]) * 12) for n in range(10)]
+        for event in events:
+            table.publish(3, event)
+        assert reader.changes() == events
+
+        # Falling more than a history behind loses the oldest, and says so
+        for n in range(state_table.EVENT_DEPTH + 5):
+            table.publish(3, make_packet(3, b"BUTN" + n.to_bytes(12)))
+        assert len(reader.changes()) == state_table.EVENT_DEPTH
+        assert reader.lost == 5
+    finally:
+        reader.close()
+
+
+def test_conflated_packets_are_counted(table):
+    reader = StateTable.attach(table.shm.name, reader=0)
+    try:
+        for frame in range(5):
+            table.publish(6, make_packet(6, bytes([frame]) * 1323))
+            table.publish(3, make_packet(3, b"BUTN" + bytes([frame]) * 12))
+
+        changes = reader.changes()
+        assert changes[-1] == make_packet(6, bytes([4]) * 1323)
+        assert len(changes) == 6
+        assert reader.conflated == {6: 4}
+
+        table.publish(6, make_packet(6, bytes(1323)))
+        reader.changes()
+        assert reader.conflated == {6: 4}
+    finally:
+        reader.close()
+
+
+def test_slot_being_written_is_not_read(table):
+    table.publish(1, make_packet(1, bytes(724)))
+    offset, depth = table.entries[(1, None)]
+    slot = offset + state_table.CACHE_LINE
+
+    # Writer part way through the next packet
+    COUNTER_STRUCT.pack_into(table.buf, slot, 3)
+    assert table._copy(offset, depth, 0) is None
+    COUNTER_STRUCT.pack_into(table.buf, slot, 2)
+    assert table._copy(offset, depth, 0) == make_packet(1, bytes(724))
+
+
+def test_processor_publishes_known_packets(table):
+    reader = StateTable.attach(table.shm.name, reader=0)
+    try:
+        assert udp_processor.publish_udp(table, make_packet(2, bytes(1256)))
+        assert not udp_processor.publish_udp(table, make_packet(2, bytes(1256), 2019))
+        # Too short for a header, rather than killing the processor
+        assert not udp_processor.publish_udp(table, bytes(10))
+
+        table.notify()
+        assert reader.wait(timeout=1.0)
+        (packet,) = reader.changes()
+        header, values = udp_processor.decode_udp(packet, len(packet))
+        assert values.PACKET_ID == udp_protocol.LapdataPacket.PACKET_ID
+    finally:
+        reader.close()
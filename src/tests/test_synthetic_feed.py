@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+from collections import Counter
+
+import pytest
+
+from models import udp_protocol
+from utils import synthetic_feed, udp_processor
+
+
+def test_every_datagram_decodes():
+    udp_processor.unknown_packets.clear()
+    udp_processor.malformed_packets.clear()
+    race = synthetic_feed.Race(rate=60)
+    sent = Counter()
+
+    # Everything goes out on the first frame, then at its own rate
+    for _ in range(60 * 6):
+        for datagram in race.frame():
+            header, values = udp_processor.decode_udp(datagram, len(datagram))
+            assert values is not None
+            sent[header.packet_id] += 1
+
+    assert not udp_processor.unknown_packets
+    assert not udp_processor.malformed_packets
+    assert sent[udp_protocol.MotionPacket.PACKET_ID] == 360
+    assert sent[udp_protocol.SessionPacket.PACKET_ID] == 12
+    assert sent[udp_protocol.ParticipantsPacket.PACKET_ID] == 2
+    assert sent[udp_protocol.EventPacket.PACKET_ID] >= 2
+
+
+def test_positions_stay_a_grid():
+    race = synthetic_feed.Race(rate=600)
+    for _ in range(600 * 5):
+        race.frame()
+
+    lapdata = race.packets[udp_protocol.LapdataPacket]
+    assert sorted(car.car_position for car in lapdata.cars) == list(range(1, 23))
+    leader = race.positions[0]
+    assert lapdata.cars[leader].delta_to_leader_ms_component == 0
+
+
+def test_rate_is_capped():
+    with pytest.raises(ValueError, match="at most 600Hz"):
+        synthetic_feed.Race(rate=6000)
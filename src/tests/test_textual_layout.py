@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import asyncio
+
+from models import rich_layout
+from models.textual_layout import RaceApp, Region
+from tests.helpers import packet_id
+from utils import layout_updaters, synthetic_feed
+
+TYRE = ("footer", "tyre_temp", "front", "left")
+
+
+def run(test):
+    async def run_app():
+        app = RaceApp()
+        async with app.run_test(size=(160, 48)) as pilot:
+            await test(app, pilot)
+
+    asyncio.run(run_app())
+
+
+def test_paths_match_the_rich_layout():
+    async def test(app, pilot):
+        layout = rich_layout.create_race_layout()
+        assert set(app.regions.regions) == set(layout_updaters.panels(layout).regions)
+
+    run(test)
+
+
+def test_only_changed_regions_update(monkeypatch):
+    updated = []
+    update = Region.update
+
+    def record(self, content=""):
+        updated.append(self)
+        return update(self, content)
+
+    async def test(app, pilot):
+        regions = layout_updaters.panels(app)
+        assert regions is app.regions
+
+        monkeypatch.setattr(Region, "update", record)
+        assert regions.show(TYRE, "95")
+        assert not regions.show(TYRE, "95")
+        assert regions.show(("footer", "pit_info"), "80kmph", justify="left")
+        await pilot.pause()
+
+        assert updated == [
+            regions.regions[TYRE],
+            regions.regions[("footer", "pit_info")],
+        ]
+        assert regions.regions[TYRE].text == "95"
+        assert str(regions.regions[("footer", "pit_info")].styles.text_align) == "left"
+
+    run(test)
+
+
+def test_shows_what_the_live_layout_does():
+    async def test(app, pilot):
+        race = synthetic_feed.Race(rate=60)
+        for _ in range(30):
+            # In packet id order, as the state table hands them over
+            app.apply(sorted(race.frame(), key=packet_id))
+        await pilot.pause()
+
+        layout = rich_layout.create_race_layout()
+        layout_updaters.update_using_telemetry(layout, app.state)
+        layout_updaters.update_using_damage(layout, app.state)
+        for path, string in layout_updaters.panels(layout).strings.items():
+            assert app.regions.regions[path].text == string
+
+    run(test)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import math
+from dataclasses import replace
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from models import track_geometry, udp_protocol
+from models.packet_schema import HEADER_SIZE
+from utils import synthetic_feed, track_builder
+
+LENGTH = synthetic_feed.TRACK_LENGTH
+
+
+def record(capture, rewind: int | None = None):
+    """A lap and a bit of the synthetic race, recorded as the recorder would. With
+    rewind, frame_id goes back to 0 every rewind frames as after a flashback"""
+    race = synthetic_feed.Race(rate=20)
+    with capture.open("w") as f:
+        for _ in range(20 * 90):
+            for datagram in race.frame():
+                if rewind is not None:
+                    header = udp_protocol.Header.decode(datagram)
+                    header = replace(header, frame_id=header.frame_id % rewind)
+                    datagram = header.encode() + datagram[HEADER_SIZE:]
+                f.write(f"{(len(datagram), datagram)!r}\n")
+    return capture
+
+
+@pytest.fixture(scope="module")
+def learned(tmp_path_factory):
+    capture = record(tmp_path_factory.mktemp("captures") / "race.log")
+    return track_builder.build([capture])
+
+
+def test_zones(learned):
+    track = learned[synthetic_feed.TRACK_ID]
+    assert track.length_m == LENGTH
+
+    # The synthetic cars brake through every other eighth of the lap
+    expected = [(n * LENGTH / 8, (n + 1) * LENGTH / 8) for n in (1, 3, 5, 7)]
+    assert np.allclose(track.braking_zones, expected, atol=10)
+    # and some open DRS down the first
+    assert np.allclose(track.drs_zones, [(0, LENGTH / 8)], atol=10)
+
+
+def test_centreline(learned):
+    track = learned[synthetic_feed.TRACK_ID]
+    assert len(track.centreline) == math.ceil(LENGTH / track_builder.RESOLUTION_M)
+    # A circle round the origin
+    radius = np.hypot(track.centreline[:, 0], track.centreline[:, 2])
+    assert np.allclose(radius, LENGTH / (2 * math.pi), rtol=1e-3)
+
+
+def test_joined_on_overall_frame(learned, tmp_path):
+    """frame_id repeats after a flashback, overall_frame keeps counting"""
+    rewound = track_builder.build([record(tmp_path / "race.log", rewind=700)])
+    track, again = learned[synthetic_feed.TRACK_ID], rewound[synthetic_feed.TRACK_ID]
+
+    assert np.array_equal(again.centreline, track.centreline)
+    assert np.array_equal(again.drs_zones, track.drs_zones)
+    assert np.array_equal(again.braking_zones, track.braking_zones)
+
+
+def test_round_trip(learned, tmp_path):
+    track = learned[synthetic_feed.TRACK_ID]
+    track_geometry.write_learned(tmp_path / "0.geom", track)
+    read = track_geometry.read_learned(tmp_path / "0.geom")
+
+    assert (read.track_id, read.length_m) == (track.track_id, track.length_m)
+    assert np.allclose(read.centreline, track.centreline, atol=1e-3)
+    assert np.allclose(read.drs_zones, track.drs_zones)
+    assert np.allclose(read.braking_zones, track.braking_zones)
+
+
+def test_loaded_for_sessions(learned, tmp_path, monkeypatch):
+    monkeypatch.setattr(track_geometry, "LEARNED", {})
+    track_geometry.write_learned(tmp_path / "0.geom", learned[0])
+    assert track_geometry.load_learned(tmp_path) == 1
+
+    session = SimpleNamespace(
+        track_id=0,
+        track_length_m=LENGTH,
+        sector_2_start_distance_m=LENGTH / 3,
+        sector_3_start_distance_m=2 * LENGTH / 3,
+    )
+    geometry = track_geometry.for_session(session)
+    assert geometry.braking_zone_at(LENGTH * 3 / 16) == 0
+    assert geometry.braking_zone_at(LENGTH / 16) is None
+    assert geometry.drs_zone_at(LENGTH / 16) == 0
+    assert geometry.to_drs_activation(LENGTH / 2) == pytest.approx(LENGTH / 2, abs=10)
+    assert np.allclose(
+        geometry.point_at(LENGTH / 4), (0, 0, LENGTH / (2 * math.pi)), atol=1
+    )
+    # Detection points are still the hand made ones
+    assert geometry.drs_detection == tuple(
+        sorted(track_geometry.TRACKS[0]["drs_detection"])
+    )
+
+    monkeypatch.undo()
+    track_geometry._geometry.cache_clear()
+
+
+@pytest.mark.parametrize("data", [b"\x00\\'\"\n\r\t\xff ", b"'", b'"', b"", b"a b "])
+def test_parse_line(data):
+    line = f"{(len(data), data)!r}\n"
+    assert track_builder.parse_line(line) == (len(data), data)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from models import track_geometry
+from models.track_geometry import TrackGeometry
+from utils import prettyfy
+
+
+def session(track_id: int, length: int = 5278):
+    return SimpleNamespace(
+        track_id=track_id,
+        track_length_m=length,
+        sector_2_start_distance_m=length / 3,
+        sector_3_start_distance_m=length * 2 / 3,
+    )
+
+
+def test_loaded_once_per_track():
+    melbourne = track_geometry.for_session(session(0))
+    assert track_geometry.for_session(session(0)) is melbourne
+    assert melbourne.drs_detection == (1959, 4555)
+    assert track_geometry.for_session(session(3)).drs_detection == ()
+
+
+def test_lookups():
+    geometry = TrackGeometry(
+        0,
+        3000.0,
+        (0.0, 1000.0, 2000.0),
+        drs_detection=(500.0, 2500.0),
+        corner_starts=(100.0, 900.0),
+        corner_ends=(200.0, 1100.0),
+    )
+
+    assert [geometry.sector_at(d) for d in (0, 999, 1000, 2999)] == [0, 0, 1, 2]
+    assert geometry.to_drs_detection(400) == 100
+    assert geometry.to_drs_detection(1000) == 1500
+    # Past the last one, so the next is the first one next lap
+    assert geometry.to_drs_detection(2600) == 900
+    assert geometry.to_drs_activation(2600) is None
+    assert [geometry.corner_at(d) for d in (50, 150, 500, 1100)] == [None, 0, None, 1]
+
+
+@pytest.mark.parametrize("track_id", [0, 5])
+def test_drs_status_on_any_track(track_id):
+    shared = SimpleNamespace(
+        status=object(),
+        telemetry=object(),
+        track=track_geometry.for_session(session(track_id)),
+    )
+    # Beyond Melbourne's last detection point, and a track with none measured
+    player = SimpleNamespace(lap_distance_travelled_m=5000.0)
+
+    drs_player, front, behind = prettyfy.calculate_drs_status(player, 255, 255, shared)
+    assert drs_player == (2237 if track_id == 0 else "")
+    assert (front, behind) == ("", "")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+from dataclasses import replace
+
+from config.state import State
+from models import rich_layout, udp_protocol
+from tests.helpers import make_packet
+from utils import layout_updaters, prettyfy, udp_processor
+from utils.tyre_inventory import TyreInventory, aggregate
+
+SOFT, MEDIUM, HARD, INTER = 16, 17, 18, 7
+
+
+def tyre(compound: int, wear: int = 0, available: int = 1, fitted: int = 0):
+    return udp_protocol.TyreSets(
+        compound, compound, wear, available, 0, 30, 20 - wear, 500 + wear, fitted
+    )
+
+
+SETS = [
+    tyre(SOFT),
+    tyre(SOFT, wear=12),
+    tyre(SOFT, wear=4),
+    tyre(SOFT, fitted=1),
+    tyre(SOFT, available=0),
+    tyre(MEDIUM, wear=8),
+    tyre(HARD),
+    tyre(HARD),
+    tyre(INTER, wear=3),
+    tyre(8),
+]
+
+
+def packet(car_idx: int, sets: list, frame_id: int = 0) -> bytes:
+    padded = sets + [tyre(0, available=0)] * (20 - len(sets))
+    body = udp_protocol.TyreSetsPacket(car_idx, padded, 0).encode()
+    return make_packet(udp_protocol.TyreSetsPacket.PACKET_ID, body, frame_id=frame_id)
+
+
+def test_aggregate():
+    stock = aggregate(SETS)
+
+    assert (stock[SOFT].new, stock[SOFT].used) == (1, 2)
+    assert stock[SOFT].best is SETS[0]
+    assert (stock[MEDIUM].new, stock[MEDIUM].used) == (0, 1)
+    # The first of equally worn sets, as min() would
+    assert stock[HARD].best is SETS[6]
+    assert stock[INTER].best.wear == 3
+    # Wets aren't shown
+    assert 8 not in stock
+
+
+def test_resends_are_skipped():
+    inventory = TyreInventory()
+    first = packet(3, SETS, frame_id=1)
+
+    assert not inventory.resent(first)
+    # Only the header differs
+    assert inventory.resent(packet(3, SETS, frame_id=2))
+    # Another car, or the same car's sets changing
+    assert not inventory.resent(packet(4, SETS))
+    assert not inventory.resent(packet(3, SETS[1:]))
+    assert not inventory.resent(first)
+    # Anything else goes through
+    other = replace(udp_protocol.Header.decode(first), packet_id=11).encode()
+    assert not inventory.resent(other + first[len(other) :])
+
+
+def test_resends_are_not_decoded(monkeypatch):
+    layout = rich_layout.create_race_layout()
+    state = State()
+    decoded = []
+    decode_udp = udp_processor.decode_udp
+
+    def counting(data, length):
+        decoded.append(data)
+        return decode_udp(data, length)
+
+    monkeypatch.setattr(udp_processor, "decode_udp", counting)
+    for frame_id in range(5):
+        layout_updaters.process_packet(packet(0, SETS, frame_id), layout, state)
+
+    assert len(decoded) == 1
+    assert state.tyres[0]["stock"][SOFT].used == 2
+    assert prettyfy.prettyfy_tyres(state)[0] == (
+        f"Softs: 1 new, 2 used\n       {prettyfy.humanise(500)} secs\n20"
+    )
+
+
+def test_snapshots_apply_their_own_tyre_sets():
+    layout = rich_layout.create_race_layout()
+    state = State()
+    layout_updaters.process_packet(packet(0, SETS), layout, state)
+    snapshot = state.snapshot()
+
+    changed = SETS[1:]
+    layout_updaters.process_packet(packet(0, changed, frame_id=1), layout, state)
+    # Replayed into the snapshot, which hasn't seen it
+    layout_updaters.process_packet(packet(0, changed, frame_id=1), layout, snapshot)
+
+    assert snapshot.tyre_inventory is not state.tyre_inventory
+    assert snapshot.tyres[0]["stock"][SOFT].new == 0
+    assert state.tyres[0]["stock"][SOFT].new == 0
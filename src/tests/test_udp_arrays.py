@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from models import udp_arrays, udp_protocol
+from tests.helpers import make_packet
+from utils import udp_processor
+
+ARRAY_CLASSES = list(udp_arrays.ARRAY_CLASSES.values())
+
+
+def random_packet(cls) -> bytes:
+    return make_packet(cls.PACKET_ID, os.urandom(cls.DTYPE.itemsize))
+
+
+@pytest.mark.parametrize("cls", ARRAY_CLASSES, ids=lambda cls: cls.__name__)
+def test_facade_matches_dataclass_decode(cls):
+    packet = random_packet(cls)
+    array = cls.decode(packet)
+
+    # repr so random NaNs still compare equal
+    assert repr(array.to_packet()) == repr(cls.PACKET.decode(packet))
+    for name in cls.DTYPE.names:
+        assert repr(getattr(array, name)) == repr(
+            getattr(cls.PACKET.decode(packet), name)
+        )
+
+
+def test_columns_are_views_of_the_packet():
+    packet = random_packet(udp_arrays.TelemetryArray)
+    telemetry = udp_arrays.TelemetryArray.decode(packet)
+
+    # speed is the first field of each 60 byte record
+    (speed,) = struct.unpack_from("<H", packet, 29 + 60 * 3)
+    assert telemetry["speed"][3] == speed
+    assert telemetry["speed"].shape == (22,)
+    assert np.shares_memory(telemetry["speed"], np.frombuffer(packet, np.uint8))
+
+
+def test_processor_decodes_car_packets_to_arrays():
+    packet = random_packet(udp_arrays.StatusArray)
+    header, values = udp_processor.decode_udp(packet, len(packet))
+
+    assert isinstance(values, udp_arrays.StatusArray)
+    assert repr(values.statuses[5]) == repr(
+        udp_protocol.StatusPacket.decode(packet).statuses[5]
+    )
+
+
+def test_dtype_size_is_checked():
+    with pytest.raises(ValueError):
+        udp_arrays.packet_dtype(
+            udp_protocol.StatusPacket, udp_protocol.Status, struct.Struct("<B")
+        )
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+import struct
+
+import pytest
+
+from models import protocol_registry, udp_protocol
+from models.packet_schema import HEADER_SIZE
+from tests.helpers import make_packet
+from utils import udp_processor
+
+BODY_SIZES = {
+    0: 1349,
+    1: 753,
+    2: 1285,
+    3: 45,
+    4: 1284,
+    5: 1133,
+    6: 1352,
+    7: 1239,
+    8: 1042,
+    9: 954,
+    10: 1041,
+    11: 1460,
+    12: 231,
+    13: 273,
+    14: 101,
+    15: 1131,
+}
+
+
+def sized(packet_id: int, length: int, **header) -> bytes:
+    """A packet of length bytes, the player in car 3"""
+    body = b"SSTA".ljust(length - HEADER_SIZE, b"\0")
+    return make_packet(packet_id, body, player_car_index=3, **header)
+
+
+@pytest.mark.parametrize("packet_id,length", BODY_SIZES.items())
+def test_dispatch_on_packet_id(packet_id: int, length: int):
+    header, values = udp_processor.decode_udp(sized(packet_id, length), length)
+
+    assert header.packet_id == packet_id
+    assert header.player_car_index == 3
+    assert type(values).PACKET_ID == packet_id
+
+
+def test_lap_positions_no_longer_decoded_as_time_trial():
+    # 1131 bytes used to be matched to TimeTrialPacket by length
+    header, values = udp_processor.decode_udp(sized(15, 1131), 1131)
+
+    assert isinstance(values, udp_protocol.LapPositionPacket)
+    assert len(values.position_for_vehicle_idx) == 50
+    assert len(values.position_for_vehicle_idx[0]) == 22
+
+
+def test_unknown_packets_are_counted():
+    udp_processor.unknown_packets.clear()
+    packet = sized(3, 45, packet_format=2019)
+
+    assert udp_processor.decode_udp(packet, 45)[1] is None
+    assert udp_processor.decode_udp(packet, 45)[1] is None
+    assert udp_processor.unknown_packets[(2019, 3, 1)] == 2
+
+
+def test_other_packet_versions_are_unknown():
+    udp_processor.unknown_packets.clear()
+
+    assert udp_processor.decode_udp(sized(2, 1285, packet_version=2), 1285)[1] is None
+    assert udp_processor.unknown_packets[(2025, 2, 2)] == 1
+
+
+def test_wrong_length_is_rejected():
+    udp_processor.malformed_packets.clear()
+    # An F1 24 participants packet claiming to be F1 25
+    packet = sized(4, 1350)
+
+    assert udp_processor.decode_udp(packet, len(packet))[1] is None
+    assert udp_processor.malformed_packets[(2025, 4, 1)] == 1
+
+
+@pytest.mark.parametrize("length", [0, 1, HEADER_SIZE - 1])
+def test_runts_are_rejected(length: int):
+    udp_processor.malformed_packets.clear()
+    packet = sized(4, 1350)[:length]
+
+    assert udp_processor.decode_udp(packet, len(packet)) == (None, None)
+    assert udp_processor.malformed_packets[udp_processor.RUNT] == 1
+
+
+def test_f1_24_participants_decode_onto_current_records():
+    car = struct.pack(
+        "<BBBBBBB48sBBHB", 1, 7, 2, 3, 0, 44, 10, b"HAMILTON", 1, 1, 500, 6
+    )
+    header = make_packet(4, packet_format=2024)
+    packet = header + bytes([22]) + car * 22
+    assert len(packet) == protocol_registry.REGISTRY[(2024, 4, 1)].size
+
+    _, values = udp_processor.decode_udp(packet, len(packet))
+
+    assert isinstance(values, udp_protocol.ParticipantsPacket)
+    assert values.number_of_active_cars == 22
+    assert values.cars[21].race_number == 44
+    assert values.cars[21].f1_world_tech_level == 500
+    assert values.cars[21].platform == 6
+    assert values.cars[21].number_of_colours == 0
+    assert values.cars[21].livery_blue_4 == 0
+
+
+def test_f1_24_has_no_lap_positions():
+    assert (2024, 15, 1) not in protocol_registry.REGISTRY
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""The last minute or so of chosen per car channels, for trends like tyre temperature,
+speed or ERS over the last N seconds.
+
+Each packet type gets a ring of `capacity` samples of every car, allocated up front
+and never grown. Every sample is written twice, at its slot and a capacity further
+on, so the newest n samples are always one contiguous slice and a window is a view
+rather than a copy. Queries work on a window of every car at once"""
+
+import numpy as np
+
+from models import udp_arrays
+from models.udp_arrays import MAX_CARS, ArrayPacket
+
+# Packet id -> what's kept of it
+CHANNELS = {
+    udp_arrays.MotionArray.PACKET_ID: (
+        "world_position_x",
+        "world_position_z",
+        "g_force_lateral",
+        "g_force_longitudinal",
+    ),
+    udp_arrays.TelemetryArray.PACKET_ID: (
+        "speed",
+        "throttle",
+        "brake",
+        "engine_rpm",
+        "tyres_rl_surface_temperature",
+        "tyres_rr_surface_temperature",
+        "tyres_fl_surface_temperature",
+        "tyres_fr_surface_temperature",
+        "tyres_rl_inner_temperature",
+        "tyres_rr_inner_temperature",
+        "tyres_fl_inner_temperature",
+        "tyres_fr_inner_temperature",
+    ),
+    udp_arrays.StatusArray.PACKET_ID: (
+        "current_fuel_in_tank_kg",
+        "ers_store_energy",
+        "ers_deployed_this_lap",
+        "ers_harvested_mguk",
+    ),
+    udp_arrays.DamageArray.PACKET_ID: (
+        "tyre_rl_wear_percentage",
+        "tyre_rr_wear_percentage",
+        "tyre_fl_wear_percentage",
+        "tyre_fr_wear_percentage",
+    ),
+}
+
+# Packet id -> samples kept, a minute at the rate the game sends it at 60Hz. About
+# 13MB all told, fewer packets reaching the TUI just stretch the minute further
+CAPACITY = {
+    udp_arrays.MotionArray.PACKET_ID: 60 * 60,
+    udp_arrays.TelemetryArray.PACKET_ID: 60 * 60,
+    udp_arrays.StatusArray.PACKET_ID: 60 * 60,
+    udp_arrays.DamageArray.PACKET_ID: 10 * 60,
+}
+
+
+class ChannelRing:
+    """capacity samples of some channels of one packet type, for every car. Values
+    are stored as float32 whatever the packet has them as"""
+
+    def __init__(self, channels: tuple[str, ...], capacity: int):
+        self.channels = {name: i for i, name in enumerate(channels)}
+        self.capacity = capacity
+        self.count = 0
+        self.times = np.zeros(2 * capacity, np.float64)
+        # [channel, car, sample], so one car's window of a channel is contiguous
+        self.values = np.zeros((len(channels), MAX_CARS, 2 * capacity), np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.times.nbytes + self.values.nbytes
+
+    def append(self, session_time: float, packet):
+        """Add a sample of every car from an ArrayPacket. Time going backwards is a
+        new session or a flashback, and what's held is dropped to keep times sorted"""
+        if self.count and session_time < self.times[self._span(None, 1).start]:
+            self.count = 0
+        slot = self.count % self.capacity
+        mirror = slot + self.capacity
+        self.times[slot] = self.times[mirror] = session_time
+        for name, i in self.channels.items():
+            column = packet[name]
+            self.values[i, :, slot] = column
+            self.values[i, :, mirror] = column
+        self.count += 1
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _span(self, seconds: float | None, samples: int | None) -> slice:
+        """Where the newest samples sit, oldest first"""
+        end = (self.count - 1) % self.capacity + self.capacity + 1 if self.count else 0
+        held = len(self)
+        if samples is not None:
+            held = min(held, samples)
+        start = end - held
+        if seconds is not None and held:
+            since = self.times[end - 1] - seconds
+            start += int(np.searchsorted(self.times[start:end], since, side="left"))
+        return slice(start, end)
+
+    def window(
+        self,
+        channel: str,
+        seconds: float | None = None,
+        samples: int | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Times, and [car, sample] values of channel, for the last seconds or
+        samples, or everything held. Both are views into the ring, only good until
+        the next append overwrites them"""
+        span = self._span(seconds, samples)
+        return self.times[span], self.values[self.channels[channel], :, span]
+
+    def mean(self, channel: str, seconds: float | None = None) -> np.ndarray:
+        """Per car, nan with nothing in the window"""
+        _, values = self.window(channel, seconds)
+        if not values.shape[1]:
+            return np.full(MAX_CARS, np.nan)
+        return values.mean(axis=1)
+
+    def minmax(self, channel: str, seconds: float | None = None):
+        """Per car lows and highs, nan with nothing in the window"""
+        _, values = self.window(channel, seconds)
+        if not values.shape[1]:
+            return np.full(MAX_CARS, np.nan), np.full(MAX_CARS, np.nan)
+        return values.min(axis=1), values.max(axis=1)
+
+    def slope(self, channel: str, seconds: float | None = None) -> np.ndarray:
+        """Per car least squares change per second, nan with under two distinct times"""
+        times, values = self.window(channel, seconds)
+        dt = times - times.mean() if len(times) else times
+        spread = np.dot(dt, dt)
+        if not spread:
+            return np.full(MAX_CARS, np.nan)
+        return (values @ dt) / spread
+
+
+class ChannelHistory:
+    """A ChannelRing per packet type in CHANNELS, with its memory all allocated here"""
+
+    def __init__(self, channels: dict = CHANNELS, capacity: dict = CAPACITY):
+        self.rings = {
+            packet_id: ChannelRing(names, capacity[packet_id])
+            for packet_id, names in channels.items()
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ring.nbytes for ring in self.rings.values())
+
+    def append(self, header, packet) -> bool:
+        """Add packet if its type is kept, False if it isn't"""
+        ring = self.rings.get(header.packet_id)
+        if ring is None:
+            return False
+        if not isinstance(packet, ArrayPacket):
+            # Older formats decode to dataclasses, read into columns here
+            records = packet.cars if hasattr(packet, "cars") else packet.statuses
+            packet = {
+                name: [getattr(record, name) for record in records]
+                for name in ring.channels
+            }
+        ring.append(header.session_time, packet)
+        return True
+
+    def __getitem__(self, packet_id: int) -> ChannelRing:
+        return self.rings[packet_id]
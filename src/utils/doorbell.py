@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Cross process wakeups so consumers can block until data arrives instead of
+sleep polling. A listener binds a unix datagram socket in the abstract namespace
+under a well known name, and ringing it sends a single byte. The byte sits in the
+socket until the listener drains it, so a ring that lands before the listener
+starts waiting is never lost"""
+
+import select
+import socket
+
+_SENDER = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+_SENDER.setblocking(False)
+
+
+def address(name: str) -> bytes:
+    # Leading NUL puts the socket in Linux's abstract namespace, nothing on disk to clean up
+    return b"\0simba/" + name.encode()
+
+
+def ring(name: str) -> bool:
+    """Wake whoever is listening on name, returns False if nobody is"""
+    try:
+        _SENDER.sendto(b"\0", address(name))
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False
+    except BlockingIOError:
+        # Listener already has plenty of unread rings, one more changes nothing
+        pass
+    return True
+
+
+class Doorbell:
+    def __init__(self, name: str):
+        self.name = name
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(address(name))
+        self.sock.setblocking(False)
+        self.poller = select.poll()
+        self.poller.register(self.sock, select.POLLIN)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until rung or timeout, returns False on timeout"""
+        if not self.poller.poll(None if timeout is None else timeout * 1000):
+            return False
+
+        # Several rings may have piled up, one wakeup covers them all
+        try:
+            while True:
+                self.sock.recv(64)
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        self.sock.close()
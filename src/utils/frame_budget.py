@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Paces the TUI's rendering. Updates are applied as soon as they arrive, but the
+screen is only redrawn once per frame interval, and the time spent applying and
+drawing each frame is scored against that interval"""
+
+import time
+from collections.abc import Callable
+
+
+class FrameBudget:
+    """Says when a frame is due and keeps the stats: frames drawn, how many went
+    over budget, how many updates each frame took in, and the frame work times.
+    `clock` is swappable for tests"""
+
+    def __init__(self, fps: float = 10, clock: Callable[[], float] = time.perf_counter):
+        self.interval = 1 / fps
+        self.clock = clock
+        self.next_frame = clock()
+
+        self.frames = 0
+        self.overruns = 0
+        self.updates = 0
+        self.pending = 0
+        self.work = 0.0
+        self.total_work = 0.0
+        self.worst_work = 0.0
+
+    def due(self) -> bool:
+        return self.clock() >= self.next_frame
+
+    def timeout(self) -> float:
+        """Seconds until the next frame is due, for waiting on new data meanwhile"""
+        return max(0.0, self.next_frame - self.clock())
+
+    def apply(self, update: Callable, *args):
+        """Run one state update, timed as part of the coming frame's work"""
+        start = self.clock()
+        update(*args)
+        self.work += self.clock() - start
+        self.pending += 1
+
+    def render(self, draw: Callable):
+        """Draw the frame, then book it against the budget"""
+        start = self.clock()
+        draw()
+        now = self.clock()
+        work = self.work + now - start
+
+        self.frames += 1
+        self.updates += self.pending
+        self.total_work += work
+        self.worst_work = max(self.worst_work, work)
+        if work > self.interval:
+            self.overruns += 1
+        self.work = 0.0
+        self.pending = 0
+
+        # Frames missed while over budget are dropped rather than drawn back to back
+        self.next_frame = max(self.next_frame + self.interval, now)
+
+    def stats(self) -> dict:
+        frames = self.frames or 1
+        return {
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "budget_ms": self.interval * 1000,
+            "mean_work_ms": self.total_work / frames * 1000,
+            "worst_work_ms": self.worst_work * 1000,
+            "updates_per_frame": self.updates / frames,
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Intervals and gaps to the leader for the whole field, timed the way the TV
+graphics do it: every car's session time is noted as it passes checkpoints every
+CHECKPOINT_M metres, and a gap is how much later one car passed the checkpoint
+another passed first. Each lap data packet only adds the checkpoints passed since
+the one before, a car or so a packet, so an update is O(cars)"""
+
+import math
+
+import numpy as np
+
+from models.udp_arrays import MAX_CARS, ArrayPacket
+
+CHECKPOINT_M = 50.0
+# Crossing times kept per car, enough for a car this many laps down to be timed
+LAPS_KEPT = 3
+
+CARS = np.arange(MAX_CARS)
+
+
+class GapTable:
+    """Crossing times of the last LAPS_KEPT laps of checkpoints for every car. The
+    checkpoints count on from the start of the session, so they're the same spot
+    on track a lap apart. `interval_ms` and `gap_ms` are per car, nan where they
+    can't be timed, and `interval_laps`/`gap_laps` are how many laps down it is"""
+
+    def __init__(self, track_length_m: float, session_uuid: int = 0):
+        self.track_length_m = track_length_m
+        self.session_uuid = session_uuid
+        self.ring = math.ceil(track_length_m / CHECKPOINT_M) * LAPS_KEPT
+        self.reset()
+
+    def reset(self):
+        self.times = np.full((MAX_CARS, self.ring), np.nan)
+        self.numbers = np.full((MAX_CARS, self.ring), -1, np.int64)
+        # Newest checkpoint each car has passed, and where it was last packet
+        self.latest = np.full(MAX_CARS, -1, np.int64)
+        self.distances = np.full(MAX_CARS, np.nan)
+        self.session_time = None
+        self.order = None
+
+        self.interval_ms = np.full(MAX_CARS, np.nan)
+        self.gap_ms = np.full(MAX_CARS, np.nan)
+        self.interval_laps = np.zeros(MAX_CARS, np.int64)
+        self.gap_laps = np.zeros(MAX_CARS, np.int64)
+
+    def update(self, session_time: float, lapdata, positions) -> bool:
+        """Add the checkpoints passed since the last packet, then work out the gaps
+        in the order positions has the cars. False if they can't have changed"""
+        if isinstance(lapdata, ArrayPacket):
+            distances = lapdata["session_distance_travelled_m"].astype(np.float64)
+        else:
+            distances = np.array(
+                [car.session_distance_travelled_m for car in lapdata.cars]
+            )
+        if self.session_time is not None and session_time < self.session_time:
+            # A flashback, the crossings after it never happened
+            self.reset()
+
+        checkpoints = np.where(distances >= 0, distances // CHECKPOINT_M, -1).astype(
+            np.int64
+        )
+        crossed = np.flatnonzero(checkpoints > self.latest).tolist()
+        for car in crossed:
+            self._cross(car, int(checkpoints[car]), distances[car], session_time)
+        self.distances = distances
+        self.session_time = session_time
+
+        # Gaps only move when someone passes a checkpoint or places change
+        if not crossed and positions.cars == self.order:
+            return False
+        self.order = positions.cars
+        self._gaps(positions)
+        return True
+
+    def _cross(self, car: int, checkpoint: int, distance: float, session_time: float):
+        """Note when car passed each checkpoint up to this one, interpolated between
+        this packet and the last. A car seen for the first time gets just this one"""
+        first = self.latest[car] + 1 if self.latest[car] >= 0 else checkpoint
+        first = max(first, checkpoint - self.ring + 1)
+        was = self.distances[car]
+        moved = distance - was
+        for number in range(first, checkpoint + 1):
+            if self.session_time is None or not moved > 0:
+                time = session_time
+            else:
+                through = (number * CHECKPOINT_M - was) / moved
+                time = self.session_time + through * (session_time - self.session_time)
+            slot = number % self.ring
+            self.times[car, slot] = time
+            self.numbers[car, slot] = number
+        self.latest[car] = checkpoint
+
+    def _gaps(self, positions):
+        order = positions.order()
+        if not order:
+            return
+        leader = order[0]
+        # Each car timed against the one a place up, the leader against itself
+        ahead = CARS.copy()
+        ahead[order[1:]] = order[:-1]
+
+        self.interval_ms, self.interval_laps = self._behind(ahead)
+        self.gap_ms, self.gap_laps = self._behind(np.full(MAX_CARS, leader))
+        self.interval_ms[leader] = self.gap_ms[leader] = np.nan
+
+    def _behind(self, other: np.ndarray):
+        """How long after other each car passed its newest checkpoint, and how many
+        whole laps behind it it is"""
+        slots = self.latest % self.ring
+        passed = (self.latest >= 0) & (self.numbers[other, slots] == self.latest)
+        ms = np.where(
+            passed, (self.times[CARS, slots] - self.times[other, slots]) * 1000, np.nan
+        )
+        laps = (self.distances[other] - self.distances) // self.track_length_m
+        return ms, np.where(np.isnan(laps), 0, laps).astype(np.int64)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Live delta timing against the player's previous and best laps.
+
+Each lap is recorded as the elapsed lap time every RESOLUTION_M metres of the lap,
+so the time a reference lap took to reach any distance is an index and one linear
+interpolation away, whatever the track. Lap data readings in between samples are
+interpolated onto them as they arrive"""
+
+import numpy as np
+
+RESOLUTION_M = 2.0
+
+
+class LapTrace:
+    """Elapsed lap time in ms at every RESOLUTION_M metres round one lap, filled in
+    as the lap is driven. `whole` is False for a lap that was joined part way"""
+
+    def __init__(self, track_length_m: float, whole: bool = True):
+        self.times = np.full(int(track_length_m // RESOLUTION_M) + 2, np.nan)
+        self.whole = whole
+        # Samples below filled hold times, last is the latest (distance, time)
+        self.filled = 0
+        self.last = (0.0, 0.0)
+        if whole:
+            # Crossing the line
+            self.times[0] = 0.0
+            self.filled = 1
+
+    def record(self, distance: float, time_ms: float):
+        """Add a reading. Going backwards, after a flashback, drops what's past it"""
+        if distance < 0:
+            # Still short of the line at the start of a session
+            return
+        if distance < self.last[0]:
+            self.filled = min(self.filled, int(distance // RESOLUTION_M) + 1)
+
+        end = min(int(distance // RESOLUTION_M) + 1, len(self.times))
+        if end > self.filled:
+            if self.filled:
+                last_distance, last_ms = self.last
+                rate = (time_ms - last_ms) / (distance - last_distance)
+                if end - self.filled < 16:
+                    # Usually one sample or none a reading, too few to vectorise
+                    for index in range(self.filled, end):
+                        self.times[index] = (
+                            last_ms + (index * RESOLUTION_M - last_distance) * rate
+                        )
+                else:
+                    marks = np.arange(self.filled, end) * RESOLUTION_M
+                    self.times[self.filled : end] = (
+                        last_ms + (marks - last_distance) * rate
+                    )
+            else:
+                # Nothing to interpolate from, only the sample at this distance
+                self.times[end - 1] = time_ms
+            self.filled = end
+        self.last = (distance, time_ms)
+
+    def finish(self, lap_time_ms: float):
+        """Fill in up to the line with the lap's final time"""
+        self.record((len(self.times) - 1) * RESOLUTION_M, lap_time_ms)
+
+    def time_at(self, distance: float) -> float | None:
+        """Time this lap took to reach distance, None if it never got that far"""
+        position = distance / RESOLUTION_M
+        index = int(position)
+        if distance < 0 or index + 1 >= self.filled:
+            return None
+        before = self.times[index]
+        return before + (self.times[index + 1] - before) * (position - index)
+
+
+class LapDelta:
+    """The player's lap being driven, and their previous and best whole laps in one
+    session. Fed one lap data record of the player's car at a time"""
+
+    def __init__(self, track_length_m: float, session_uuid: int = 0):
+        self.track_length_m = track_length_m
+        self.session_uuid = session_uuid
+        self.lap_number = None
+        self.invalid = False
+        self.current = LapTrace(track_length_m, whole=False)
+        self.previous = None
+        self.best = None
+        self.best_time_ms = None
+
+    def update(self, carlap):
+        lap_number = carlap.current_lap_number
+        if lap_number != self.lap_number:
+            # Only a lap seen from the line to the line is any use as a reference
+            crossed_line = (
+                self.lap_number is not None and lap_number == self.lap_number + 1
+            )
+            if crossed_line and self.current.whole:
+                self.finish(carlap.last_lap_time_ms)
+            self.current = LapTrace(self.track_length_m, whole=crossed_line)
+            self.lap_number = lap_number
+            self.invalid = False
+
+        self.invalid = self.invalid or bool(carlap.current_lap_invalid)
+        self.current.record(carlap.lap_distance_travelled_m, carlap.current_lap_time_ms)
+
+    def finish(self, lap_time_ms: int):
+        trace = self.current
+        trace.finish(lap_time_ms)
+        self.previous = trace
+        if not self.invalid and (self.best is None or lap_time_ms < self.best_time_ms):
+            self.best = trace
+            self.best_time_ms = lap_time_ms
+
+    @staticmethod
+    def delta(reference: LapTrace | None, distance: float, time_ms: float):
+        """ms behind reference at distance, negative when ahead, None without one"""
+        if reference is None:
+            return None
+        reference_ms = reference.time_at(distance)
+        if reference_ms is None:
+            return None
+        return time_ms - reference_ms
@@ -5,12 +5,130 @@
 ## Check `skeletons/tools/py` for a list of currently preferred tools
 """
 
+"""Turns decoded game state into the strings shown in each region of the layout.
+
+Regions are updated through `panels(layout)`, which keeps one Panel per region and
+only touches it when its string actually changes. A changed region is marked dirty
+and re-rendered on the next refresh, an unchanged one hands back the lines it
+rendered last time, so redrawing costs what changed rather than the whole screen"""
+
+from weakref import WeakKeyDictionary, ref
+
 import rich
 from rich.panel import Panel
+from rich.segment import Segment
+
+from config.state import State
+from models import decode_dictionaries, track_geometry
+from utils import prettyfy, tyre_inventory, udp_processor
+from utils.gap_table import GapTable
+from utils.lap_delta import LapDelta
+from utils.position_index import PositionIndex
+
+
+class CachedRegion:
+    """Whatever one layout region shows, with the lines it rendered to kept until
+    it's invalidated or the region is resized. Each cached line is merged down to
+    as few segments as its styles allow, so handing it back costs next to nothing"""
+
+    def __init__(self, renderable):
+        self.renderable = renderable
+        self.size = None
+        self.lines = None
+
+    def invalidate(self):
+        self.lines = None
+
+    def __rich_console__(self, console, options):
+        size = (options.max_width, options.height)
+        if self.lines is None or size != self.size:
+            self.lines = [
+                list(Segment.simplify(line))
+                for line in console.render_lines(self.renderable, options)
+            ]
+            self.size = size
+
+        new_line = Segment.line()
+        for line in self.lines:
+            yield from line
+            yield new_line
+
+
+class RegionPanel(CachedRegion):
+    """A Panel of one Text, updated in place rather than rebuilt"""
+
+    def __init__(self, string: str, justify: str):
+        self.text = rich.text.Text(string, justify=justify)
+        super().__init__(Panel(self.text))
+
+    def update(self, string: str):
+        self.text.plain = string
+        self.invalidate()
+
+
+class PanelRegistry:
+    """A CachedRegion in every leaf of a layout, keyed on the path of names to it.
+    Leaves the updaters never write to, like the fixed headings, are cached as
+    they are. `dirty` holds the paths changed since the last `take_dirty()`"""
+
+    def __init__(self, layout):
+        # Weak, the registry lives in a WeakKeyDictionary keyed on the layout
+        self.layout = ref(layout)
+        self.regions = {}
+        self.strings = {}
+        self.dirty = set()
+
+        leaves = [((), layout)]
+        while leaves:
+            path, node = leaves.pop()
+            if node.children:
+                leaves.extend((path + (child.name,), child) for child in node.children)
+            else:
+                self.regions[path] = CachedRegion(node.renderable)
+                node.update(self.regions[path])
+
+    def node(self, path: tuple[str, ...]):
+        node = self.layout()
+        for name in path:
+            node = node[name]
+        return node
+
+    def show(self, path: tuple[str, ...], string: str, justify: str = "center") -> bool:
+        """Show string in the region at path, False if it already was"""
+        if self.strings.get(path) == string:
+            return False
+        self.strings[path] = string
+
+        region = self.regions.get(path)
+        if isinstance(region, RegionPanel):
+            region.update(string)
+        else:
+            region = self.regions[path] = RegionPanel(string, justify)
+            self.node(path).update(region)
+
+        self.dirty.add(path)
+        return True
+
+    def take_dirty(self) -> set[tuple[str, ...]]:
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+
+_registries = WeakKeyDictionary()
 
-from config import shared_variables
-from models import decode_dictionaries
-from utils import prettyfy
+
+def use_panels(layout, registry):
+    """Have the updaters write to registry rather than a PanelRegistry, for front
+    ends that aren't a Rich Layout. It needs `show(path, string, justify)`"""
+    _registries[layout] = registry
+
+
+def panels(layout) -> PanelRegistry:
+    """The registry for layout, made the first time it's asked for"""
+    registry = _registries.get(layout)
+    if registry is None:
+        registry = _registries[layout] = PanelRegistry(layout)
+    return registry
 
 
 def update_using_motion(layout, shared):
@@ -23,31 +141,12 @@ def update_using_session(layout, shared):
 
     total_laps_string, track_string, pit_string = prettyfy.prettyfy_session(shared)
 
-    layout["header_upper"]["track"].update(
-        Panel(
-            rich.text.Text(
-                track_string,
-                justify="center",
-            )
-        )
-    )
-
-    layout["header_lower"]["lap"]["total_laps"].update(
-        Panel(
-            rich.text.Text(
-                total_laps_string,
-                justify="left",
-            )
-        )
-    )
-    layout["footer"]["pit_info"].update(
-        Panel(
-            rich.text.Text(
-                pit_string,
-                justify="left",
-            )
-        )
+    regions = panels(layout)
+    regions.show(("header_upper", "track"), track_string)
+    regions.show(
+        ("header_lower", "lap", "total_laps"), total_laps_string, justify="left"
     )
+    regions.show(("footer", "pit_info"), pit_string, justify="left")
 
 
 def update_using_lapdata(layout, shared):
@@ -63,79 +162,29 @@ def update_using_lapdata(layout, shared):
         track_position,
     ) = prettyfy.prettyfy_lapdata(shared)
 
-    layout["header_lower"]["position"].update(
-        Panel(
-            rich.text.Text(
-                position_string,
-                justify="center",
-            )
-        )
-    )
-
-    layout["header_lower"]["lap"]["completed_laps"].update(
-        Panel(
-            rich.text.Text(
-                laps_string,
-                justify="right",
-            )
-        )
-    )
-
-    layout["header_lower"]["track"].update(
-        Panel(
-            rich.text.Text(
-                track_position,
-                justify="center",
-            )
-        )
+    regions = panels(layout)
+    regions.show(("header_lower", "position"), position_string)
+    regions.show(
+        ("header_lower", "lap", "completed_laps"), laps_string, justify="right"
     )
+    regions.show(("header_lower", "track"), track_position)
 
     # comment out to get drs positions
     """
-    layout["body"]["driver_ahead"].update(
-        Panel(
-            rich.text.Text(
-                infront_string,
-                justify="center",
-            )
-        )
-    )
-
-    layout["body"]["driver_behind"].update(
-        Panel(
-            rich.text.Text(
-                behind_string,
-                justify="center",
-            )
-        )
-    )
+    regions.show(("body", "driver_ahead"), infront_string)
+    regions.show(("body", "driver_behind"), behind_string)
     """
 
-    layout["body"]["right"]["current_lap"].update(
-        Panel(
-            rich.text.Text(
-                current_lap_time_string,
-                justify="center",
-            )
-        )
-    )
+    regions.show(("body", "right", "current_lap"), current_lap_time_string)
+    regions.show(("body", "right", "my_best_lap"), best_lap_string)
+    regions.show(("body", "right", "session_best"), fastest_lap_string)
 
-    layout["body"]["right"]["my_best_lap"].update(
-        Panel(
-            rich.text.Text(
-                best_lap_string,
-                justify="center",
-            )
-        )
-    )
 
-    layout["body"]["right"]["session_best"].update(
-        Panel(
-            rich.text.Text(
-                fastest_lap_string,
-                justify="center",
-            )
-        )
+def update_using_leaderboard(layout, shared):
+    # Header 2, when the gaps or the order change
+    regions = panels(layout)
+    regions.show(
+        ("body", "leaderboard"), prettyfy.prettyfy_leaderboard(shared), justify="left"
     )
 
 
@@ -159,41 +208,11 @@ def update_using_telemetry(layout, shared):
 
     rl, rr, fl, fr = prettyfy.prettyfy_telemetry(shared)
 
-    layout["footer"]["tyre_temp"]["front"]["left"].update(
-        Panel(
-            rich.text.Text(
-                fl,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["tyre_temp"]["front"]["right"].update(
-        Panel(
-            rich.text.Text(
-                fr,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["tyre_temp"]["rear"]["left"].update(
-        Panel(
-            rich.text.Text(
-                rl,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["tyre_temp"]["rear"]["right"].update(
-        Panel(
-            rich.text.Text(
-                rr,
-                justify="center",
-            )
-        )
-    )
+    regions = panels(layout)
+    regions.show(("footer", "tyre_temp", "front", "left"), fl)
+    regions.show(("footer", "tyre_temp", "front", "right"), fr)
+    regions.show(("footer", "tyre_temp", "rear", "left"), rl)
+    regions.show(("footer", "tyre_temp", "rear", "right"), rr)
 
 
 def update_using_status(layout, shared):
@@ -215,41 +234,11 @@ def update_using_damage(layout, shared):
     # Header 10
     rl, rr, fl, fr = prettyfy.prettyfy_damage(shared)
 
-    layout["footer"]["tyre_deg"]["front"]["left"].update(
-        Panel(
-            rich.text.Text(
-                fl,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["tyre_deg"]["front"]["right"].update(
-        Panel(
-            rich.text.Text(
-                fr,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["tyre_deg"]["rear"]["left"].update(
-        Panel(
-            rich.text.Text(
-                rl,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["tyre_deg"]["rear"]["right"].update(
-        Panel(
-            rich.text.Text(
-                rr,
-                justify="center",
-            )
-        )
-    )
+    regions = panels(layout)
+    regions.show(("footer", "tyre_deg", "front", "left"), fl)
+    regions.show(("footer", "tyre_deg", "front", "right"), fr)
+    regions.show(("footer", "tyre_deg", "rear", "left"), rl)
+    regions.show(("footer", "tyre_deg", "rear", "right"), rr)
 
 
 def update_using_history(layout, shared):
@@ -262,41 +251,11 @@ def update_using_available_tyres(layout, shared):
 
     softs, mediums, hards, inters = prettyfy.prettyfy_tyres(shared)
 
-    layout["footer"]["available_tyres"]["r1"]["soft"].update(
-        Panel(
-            rich.text.Text(
-                softs,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["available_tyres"]["r1"]["hard"].update(
-        Panel(
-            rich.text.Text(
-                hards,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["available_tyres"]["r2"]["medium"].update(
-        Panel(
-            rich.text.Text(
-                mediums,
-                justify="center",
-            )
-        )
-    )
-
-    layout["footer"]["available_tyres"]["r2"]["inter"].update(
-        Panel(
-            rich.text.Text(
-                inters,
-                justify="center",
-            )
-        )
-    )
+    regions = panels(layout)
+    regions.show(("footer", "available_tyres", "r1", "soft"), softs)
+    regions.show(("footer", "available_tyres", "r1", "hard"), hards)
+    regions.show(("footer", "available_tyres", "r2", "medium"), mediums)
+    regions.show(("footer", "available_tyres", "r2", "inter"), inters)
 
 
 def update_using_extended_motion(layout, shared):
@@ -312,3 +271,119 @@ def update_using_time_trial(layout, shared):
 def update_using_position_history(layout, shared):
     # Header 15
     pass
+
+
+def process_packet(packet: bytes, layout, shared: State):
+    """Decode a raw packet and process it, unless it's tyre sets already seen"""
+    if shared.tyre_inventory.resent(packet):
+        return
+    header, values = udp_processor.decode_udp(packet, len(packet))
+    if header is None:
+        return
+    process_data(header, values, layout, shared)
+
+
+def process_data(header, values, layout, shared: State):
+    """Store a decoded packet in the state and update the regions it feeds"""
+    shared.header = header
+    if shared.channel_history is not None and shared.channel_history.append(
+        header, values
+    ):
+        shared.changed("channel_history")
+
+    if header.packet_id == 1:
+        shared.prev_session = shared.session
+        shared.session = values
+        track = track_geometry.for_session(values)
+        if track is not shared.track:
+            shared.track = track
+        update_using_session(layout, shared)
+    if header.packet_id == 2 and shared.participants_cache != 0:
+        # Indexed once here, the previous packet keeps the index it already had
+        positions = PositionIndex.of(values)
+        if shared.prev_lapdata is None:
+            shared.prev_lapdata = values
+            shared.lapdata = values
+            shared.prev_positions = positions
+            shared.positions = positions
+        else:
+            shared.prev_lapdata = shared.lapdata
+            shared.lapdata = values
+            shared.prev_positions = shared.positions
+            shared.positions = positions
+        if shared.session is not None:
+            track_length_m = shared.session.track_length_m
+            if (
+                shared.lap_delta is None
+                or shared.lap_delta.session_uuid != header.session_uuid
+            ):
+                shared.lap_delta = LapDelta(track_length_m, header.session_uuid)
+                shared.gaps = GapTable(track_length_m, header.session_uuid)
+            shared.lap_delta.update(values.cars[header.player_car_index])
+            shared.changed("lap_delta")
+            if shared.gaps.update(header.session_time, values, positions):
+                shared.changed("gaps")
+                update_using_leaderboard(layout, shared)
+        update_using_lapdata(layout, shared)
+    if header.packet_id == 3:
+        shared.event = values
+        update_using_event(layout, shared)
+    if header.packet_id == 4 and shared.participants_cache == 0:
+        shared.participants = values.cars
+        shared.participants_cache += 1
+    if header.packet_id == 5:
+        shared.prev_setup = shared.telemetry
+        shared.setup = values
+    if header.packet_id == 6:
+        shared.prev_telemetry = shared.telemetry
+        shared.telemetry = values
+        update_using_telemetry(layout, shared)
+    if header.packet_id == 7:
+        shared.prev_status = shared.status
+        shared.status = values
+    if header.packet_id == 8:
+        shared.prev_classification = shared.classification
+        shared.classification = values
+    if header.packet_id == 9 and shared.lobby_cache == 0:
+        shared.lobby = values
+        shared.lobby_cache += 1
+    if header.packet_id == 10:
+        shared.prev_damage = shared.damage
+        shared.damage = values
+        update_using_damage(layout, shared)
+    if header.packet_id == 11:
+        if values.relevant_car_id == header.player_car_index:
+            shared.player_histories += 1
+        shared.set_item(
+            "history",
+            values.relevant_car_id,
+            {
+                "number_of_laps_in_data": values.number_of_laps_in_data,
+                "number_of_tyre_stints": values.number_of_tyre_stints,
+                "best_lap_number": values.best_lap_number,
+                "best_s1_lap_number": values.best_s1_lap_number,
+                "best_s2_lap_number": values.best_s2_lap_number,
+                "best_s3_lap_number": values.best_s3_lap_number,
+                "lap_history_data": values.lap_history_data,
+                "tyre_history_data": values.tyre_history_data,
+            },
+        )
+    if header.packet_id == 12:
+        shared.set_item(
+            "tyres",
+            values.car_idx,
+            {
+                "tyre_sets_data": values.tyre_set_data,
+                "fitted_idx": values.fitted_idx,
+                "stock": tyre_inventory.aggregate(values.tyre_set_data),
+            },
+        )
+        update_using_available_tyres(layout, shared)
+    if header.packet_id == 13:
+        shared.prev_exmotion = shared.exmotion
+        shared.exmotion = values
+    if header.packet_id == 14:
+        shared.prev_timetrial = shared.timetrial
+        shared.timetrial = values
+    if header.packet_id == 15:
+        shared.position_history = values
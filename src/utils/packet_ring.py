@@ -0,0 +1,352 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Single producer ring of datagrams in named shared memory, broadcast to any
+number of independent readers. The segment starts with a header describing its
+own geometry and carrying the head sequence number plus every reader's cursor
+and drop counters, so any process can attach and see how far behind each reader
+is and how many packets it lost"""
+
+import os
+import struct
+from multiprocessing import shared_memory
+
+from loguru import logger
+
+from models import udp_protocol
+from utils import doorbell, shared_segment
+from utils.shared_segment import CACHE_LINE, COUNTER_STRUCT, align
+
+RING_MAGIC = b"SMBA"
+RING_VERSION = 3
+
+## [magic:4][version:2][pad:2][slot_size:4][slot_count:4][overflow_size:4][overflow_count:4][max_readers:4]
+RING_HEADER_STRUCT = struct.Struct("<4sH2xIIIII")
+
+## The writer and every reader get a cache line each.
+## writer: [head:8][oversize:8]
+WRITER_OFFSET = 64
+WRITER_STRUCT = struct.Struct("QQ")
+## reader: [pid:8][tail:8][consumed:8][overwritten:8][last_overrun_seq:8][name:16]
+READERS_OFFSET = 128
+READER_STRUCT = struct.Struct("QQQQQ16s")
+
+## [seq + 1:8][length:4][overflow ordinal + 1:4] per slot, kept apart from the payloads
+## so a datagram overrunning its slot can never clobber another slot's descriptor
+DESCRIPTOR_STRUCT = struct.Struct("QII")
+
+MAX_DATAGRAM = 65535
+
+# Every datagram the game sends fits in a slot, with the slot kept cache line aligned
+DEFAULT_SLOT_SIZE = align(udp_protocol.MAX_PACKET_SIZE)
+DEFAULT_SLOT_COUNT = 4096
+DEFAULT_OVERFLOW_COUNT = 4
+DEFAULT_MAX_READERS = 8
+
+# Reader ids used by this project, anything else is free for ad hoc tools
+PROCESSOR_READER = 0
+RECORDER_READER = 1
+
+
+class PacketRing:
+    """Fixed size slots for datagrams up to the largest protocol packet, plus a few
+    64 KiB overflow slots for anything bigger.
+
+    Segment layout: [header][descriptors][payloads][tail][overflows]. The payloads
+    are contiguous and followed by a tail, so every slot can be handed to the kernel
+    as a full 64 KiB buffer. An oversize datagram just runs on into the following,
+    not yet published, payloads before being moved to an overflow slot.
+
+    Packet `seq` lives in slot `seq % slot_count`. The writer publishes a slot by
+    writing its descriptor and then advancing head. Because the datagram being
+    received may spill over the next `guard` slots, a reader only trusts a slot
+    while the writer is less than `slot_count - guard` packets ahead of it, and
+    checks that again after copying, so a torn slot is counted rather than returned.
+
+    Reading never modifies a slot, so the writer never waits on anyone and each
+    reader just keeps its own cursor in the reader table. A reader that falls more
+    than a window behind is skipped forward and its losses are counted"""
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        reader: int | None = None,
+        reader_name: str = "",
+    ):
+        self.shm = shm
+        self.buf = shm.buf
+
+        (
+            magic,
+            version,
+            slot_size,
+            slot_count,
+            overflow_size,
+            overflow_count,
+            max_readers,
+        ) = RING_HEADER_STRUCT.unpack_from(self.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            raise ValueError(
+                f"{shm.name} is not a version {RING_VERSION} packet ring ({magic!r} v{version})"
+            )
+
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        self.overflow_size = overflow_size
+        self.overflow_count = overflow_count
+        self.max_readers = max_readers
+        self.capacity = slot_size
+        self.guard = -(-MAX_DATAGRAM // slot_size)
+        self.window = slot_count - self.guard
+
+        self.descriptor_offset, self.payload_offset, self.overflow_offset = (
+            self.offsets(slot_size, slot_count, max_readers)
+        )
+
+        # Each side keeps its own position locally and mirrors it into the header
+        self.head, self.oversize = WRITER_STRUCT.unpack_from(self.buf, WRITER_OFFSET)
+        self.reader = reader
+        self.bells = shared_segment.bells(shm.name, max_readers)
+        if reader is not None:
+            self._join(reader, reader_name)
+
+        # Sliced once so the hot loops never allocate views
+        self.payloads = [
+            self.buf[offset : offset + MAX_DATAGRAM]
+            for offset in range(
+                self.payload_offset,
+                self.payload_offset + slot_size * slot_count,
+                slot_size,
+            )
+        ]
+        self.overflows = [
+            self.buf[offset : offset + overflow_size]
+            for offset in range(
+                self.overflow_offset,
+                self.overflow_offset + overflow_size * overflow_count,
+                overflow_size,
+            )
+        ]
+
+    @staticmethod
+    def offsets(
+        slot_size: int, slot_count: int, max_readers: int
+    ) -> tuple[int, int, int]:
+        descriptor_offset = READERS_OFFSET + CACHE_LINE * max_readers
+        payload_offset = descriptor_offset + align(DESCRIPTOR_STRUCT.size * slot_count)
+        # The tail lets the last slot take a full datagram too
+        overflow_offset = align(
+            payload_offset + slot_size * (slot_count - 1) + MAX_DATAGRAM
+        )
+        return descriptor_offset, payload_offset, overflow_offset
+
+    @classmethod
+    def segment_size(
+        cls, slot_size: int, slot_count: int, overflow_count: int, max_readers: int
+    ) -> int:
+        _, _, overflow_offset = cls.offsets(slot_size, slot_count, max_readers)
+        return overflow_offset + MAX_DATAGRAM * overflow_count
+
+    @classmethod
+    def create(
+        cls,
+        name: str | None = None,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        slot_count: int = DEFAULT_SLOT_COUNT,
+        overflow_count: int = DEFAULT_OVERFLOW_COUNT,
+        max_readers: int = DEFAULT_MAX_READERS,
+    ):
+        if overflow_count < 1:
+            raise ValueError("At least one overflow slot is needed")
+        if slot_count <= 2 * -(-MAX_DATAGRAM // slot_size):
+            raise ValueError(
+                f"{slot_count} slots of {slot_size} bytes can't hold two full datagrams"
+            )
+
+        shm = shared_segment.create(
+            name,
+            cls.segment_size(slot_size, slot_count, overflow_count, max_readers),
+            RING_HEADER_STRUCT,
+            RING_MAGIC,
+            RING_VERSION,
+            slot_size,
+            slot_count,
+            MAX_DATAGRAM,
+            overflow_count,
+            max_readers,
+        )
+        return cls(shm)
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        reader: int | None = None,
+        reader_name: str = "",
+        timeout: float = 5.0,
+    ):
+        """Attach to a ring created by another process, waiting for it to appear.
+        Pass a reader id to consume from it, or leave it out to only look at stats"""
+        shm = shared_segment.attach(name, RING_MAGIC, timeout, "Packet ring")
+        return cls(shm, reader, reader_name)
+
+    ## ------ WRITER ------- ##
+
+    @property
+    def write_payload(self) -> memoryview:
+        """Buffer the next datagram should be received into"""
+        return self.payloads[self.head % self.slot_count]
+
+    def publish(self, length: int):
+        """Publish the datagram sitting in write_payload"""
+        seq = self.head
+        idx = seq % self.slot_count
+        ordinal = 0
+
+        if length > self.capacity:
+            # Claim the overflow slot before overwriting it, so readers can tell
+            ordinal = self.oversize + 1
+            self.oversize = ordinal
+            COUNTER_STRUCT.pack_into(self.buf, WRITER_OFFSET + 8, ordinal)
+            overflow = self.overflows[(ordinal - 1) % self.overflow_count]
+            overflow[:length] = self.payloads[idx][:length]
+
+        # Descriptor first, head last, so the reader never sees a half written slot
+        DESCRIPTOR_STRUCT.pack_into(
+            self.buf,
+            self.descriptor_offset + idx * DESCRIPTOR_STRUCT.size,
+            seq + 1,
+            length,
+            ordinal,
+        )
+        self.head = seq + 1
+        COUNTER_STRUCT.pack_into(self.buf, WRITER_OFFSET, self.head)
+
+    def notify(self):
+        """Wake every attached reader, called once per published batch"""
+        for reader in range(self.max_readers):
+            if COUNTER_STRUCT.unpack_from(
+                self.buf, READERS_OFFSET + reader * CACHE_LINE
+            )[0]:
+                doorbell.ring(self.bells[reader])
+
+    ## ------ READER ------- ##
+
+    def _join(self, reader: int, reader_name: str):
+        """Take over a cursor in the reader table, starting from the live head"""
+        self.doorbell = shared_segment.claim_reader(self.bells, reader)
+
+        self.reader_offset = READERS_OFFSET + reader * CACHE_LINE
+        self.pid = os.getpid()
+        self.name = reader_name.encode()[:16]
+        self.tail = self.head
+        self.consumed = 0
+        self.overwritten = 0
+        self.last_overrun_seq = 0
+        self._store_reader()
+
+    def read(self) -> bytes | None:
+        """Copy out the oldest unread datagram, or None when caught up.
+        Anything the writer has lapped is skipped and counted as overwritten"""
+        buf = self.buf
+        tail = self.tail
+
+        while True:
+            (head,) = COUNTER_STRUCT.unpack_from(buf, WRITER_OFFSET)
+            if tail >= head:
+                self.tail = tail
+                return None
+
+            if head - tail > self.window:
+                tail = self._overrun(tail, head - self.window)
+
+            idx = tail % self.slot_count
+            seq, length, ordinal = DESCRIPTOR_STRUCT.unpack_from(
+                buf, self.descriptor_offset + idx * DESCRIPTOR_STRUCT.size
+            )
+            if seq == tail + 1:
+                if ordinal:
+                    data = bytes(
+                        self.overflows[(ordinal - 1) % self.overflow_count][:length]
+                    )
+                else:
+                    data = bytes(self.payloads[idx][:length])
+
+                # Still valid only if the writer didn't get near the slot while copying
+                head, oversize = WRITER_STRUCT.unpack_from(buf, WRITER_OFFSET)
+                if head - tail <= self.window and (
+                    not ordinal or oversize - ordinal < self.overflow_count
+                ):
+                    self.tail = tail + 1
+                    self.consumed += 1
+                    self._store_reader()
+                    return data
+
+            tail = self._overrun(tail, tail + 1)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the writer publishes something new, or timeout"""
+        return self.doorbell.wait(timeout)
+
+    def _overrun(self, tail: int, new_tail: int) -> int:
+        logger.warning(
+            f"Packet ring reader {self.reader} lapped, lost packets {tail} to {new_tail - 1}"
+        )
+        self.overwritten += new_tail - tail
+        self.last_overrun_seq = new_tail - 1
+        self.tail = new_tail
+        self._store_reader()
+        return new_tail
+
+    def _store_reader(self):
+        READER_STRUCT.pack_into(
+            self.buf,
+            self.reader_offset,
+            self.pid,
+            self.tail,
+            self.consumed,
+            self.overwritten,
+            self.last_overrun_seq,
+            self.name,
+        )
+
+    ## ------ STATS ------- ##
+
+    def stats(self) -> dict:
+        """Live counters as seen in shared memory, readable from any process"""
+        head, oversize = WRITER_STRUCT.unpack_from(self.buf, WRITER_OFFSET)
+        readers = {}
+        for reader in range(self.max_readers):
+            pid, tail, consumed, overwritten, last_overrun_seq, name = (
+                READER_STRUCT.unpack_from(
+                    self.buf, READERS_OFFSET + reader * CACHE_LINE
+                )
+            )
+            if pid:
+                readers[reader] = {
+                    "name": name.rstrip(b"\0").decode(),
+                    "pid": pid,
+                    "consumed": consumed,
+                    "overwritten": overwritten,
+                    "backlog": head - tail,
+                    "last_overrun_seq": last_overrun_seq,
+                }
+
+        return {"produced": head, "oversize": oversize, "readers": readers}
+
+    def close(self):
+        if self.reader is not None:
+            # Free the cursor so the id can be claimed again
+            COUNTER_STRUCT.pack_into(self.buf, self.reader_offset, 0)
+            self.doorbell.close()
+        for view in self.payloads + self.overflows:
+            view.release()
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Who is where, built once per lap data packet so finding the car ahead or behind,
+or walking the order, is a lookup rather than a scan of every car"""
+
+from dataclasses import dataclass
+
+from models.udp_arrays import MAX_CARS, ArrayPacket
+
+
+@dataclass(slots=True, frozen=True)
+class PositionIndex:
+    """`cars[position]` is the car index in that position and `positions[car_idx]`
+    the position of that car, 0 for cars that aren't running. Positions start at
+    1, `cars[0]` and positions nobody holds are None"""
+
+    cars: tuple[int | None, ...]
+    positions: tuple[int, ...]
+
+    @classmethod
+    def of(cls, lapdata) -> "PositionIndex":
+        """From a LapdataArray, or a LapdataPacket as older formats decode to"""
+        if isinstance(lapdata, ArrayPacket):
+            positions = lapdata["car_position"].tolist()
+        else:
+            positions = [car.car_position for car in lapdata.cars]
+
+        cars = [None] * (MAX_CARS + 1)
+        for car_idx, position in enumerate(positions):
+            if 0 < position <= MAX_CARS:
+                cars[position] = car_idx
+        return cls(tuple(cars), tuple(positions))
+
+    def car(self, position: int) -> int | None:
+        """Car index in position, None if nobody is"""
+        if 0 < position <= MAX_CARS:
+            return self.cars[position]
+        return None
+
+    def ahead(self, car_idx: int) -> int | None:
+        """Car index one place up from car_idx, None if it's leading"""
+        return self.car(self.positions[car_idx] - 1)
+
+    def behind(self, car_idx: int) -> int | None:
+        """Car index one place down from car_idx, None if it's last"""
+        return self.car(self.positions[car_idx] + 1)
+
+    def order(self) -> list[int]:
+        """Car indices from the leader back"""
+        return [car_idx for car_idx in self.cars if car_idx is not None]
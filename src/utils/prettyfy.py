@@ -5,11 +5,12 @@
 ## Check `skeletons/tools/py` for a list of currently preferred tools
 """
 
-from operator import attrgetter
+import math
 
 from loguru import logger
 
 from models import decode_dictionaries as dc
+from utils import tyre_inventory
 
 
 def humanise(milliseconds: int):
@@ -33,17 +34,13 @@ def calculate_drs_status(player, infront_idx, behind_idx, shared):
     if shared.telemetry == None:
         return "", "", ""
 
-    track_id = shared.session.track_id
-    drs_detection_points = dc.drs_detection_zones_dict[track_id]
-
-    drs_detection_distance = next(
-        distance - player.lap_distance_travelled_m
-        if distance > player.lap_distance_travelled_m
-        else 0
-        for distance in drs_detection_points
-    )
+    drs_detection_distance = None
+    if shared.track is not None:
+        drs_detection_distance = shared.track.to_drs_detection(
+            player.lap_distance_travelled_m
+        )
 
-    if drs_detection_distance > 0:
+    if drs_detection_distance:
         drs_player = int(drs_detection_distance)
     else:
         drs_player = ""
@@ -61,6 +58,41 @@ def calculate_drs_status(player, infront_idx, behind_idx, shared):
     return drs_player, drs_front, drs_behind
 
 
+def sector_deltas(player, current_s1_time, current_s2_time, shared):
+    """Each sector's delta to the previous lap, at the same distance round it for
+    the sector being driven. Blank without a whole previous lap to go on"""
+    lap_delta = shared.lap_delta
+    reference = lap_delta.previous if lap_delta is not None else None
+    if reference is None:
+        return "", "", ""
+
+    live = lap_delta.delta(
+        reference, player.lap_distance_travelled_m, player.current_lap_time_ms
+    )
+    if player.sector == 0:
+        deltas = [live, 0, 0]
+    else:
+        # Delta at the end of sector 1, and of sector 2 once it's done
+        at_s2 = lap_delta.delta(
+            reference, shared.session.sector_2_start_distance_m, current_s1_time
+        )
+        if player.sector == 1:
+            deltas = [at_s2, _minus(live, at_s2), 0]
+        else:
+            at_s3 = lap_delta.delta(
+                reference,
+                shared.session.sector_3_start_distance_m,
+                current_s1_time + current_s2_time,
+            )
+            deltas = [at_s2, _minus(at_s3, at_s2), _minus(live, at_s3)]
+
+    return tuple("" if delta is None else humanise(delta) for delta in deltas)
+
+
+def _minus(a, b):
+    return None if a is None or b is None else a - b
+
+
 def prettyfy_motion(shared):
     # Header 0
     pass
@@ -91,44 +123,29 @@ def prettyfy_lapdata(shared):
     header = shared.header
     prev_lapdata = shared.prev_lapdata
     lapdata = shared.lapdata
+    positions = shared.positions
+    prev_positions = shared.prev_positions
     participants = shared.participants
 
     player = lapdata.cars[header.player_car_index]
     player_previous = prev_lapdata.cars[header.player_car_index]
 
-    try:
-        behind_idx, behind_player = next(
-            (idx, car)
-            for (idx, car) in enumerate(lapdata.cars)
-            if car.car_position == player.car_position + 1
-        )
-        # Want to check against player position this lap since thats what matters now
-        behind_idx_previous, behind_player_previous = next(
-            (idx, car)
-            for (idx, car) in enumerate(prev_lapdata.cars)
-            if car.car_position == player.car_position + 1
-        )
-    except StopIteration:
+    # Want to check against player position this lap since thats what matters now
+    behind_idx = positions.car(player.car_position + 1)
+    if behind_idx is None or prev_positions.car(player.car_position + 1) is None:
         # In last place
         behind_idx = 255
         behind_player = "Currently in Last Place"
+    else:
+        behind_player = lapdata.cars[behind_idx]
 
-    try:
-        infront_idx, infront_player = next(
-            (idx, car)
-            for (idx, car) in enumerate(lapdata.cars)
-            if car.car_position == player.car_position - 1
-        )
-        # Want to check against player position this lap since thats what matters now
-        infront_idx_previous, infront_player_previous = next(
-            (idx, car)
-            for (idx, car) in enumerate(prev_lapdata.cars)
-            if car.car_position == player.car_position - 1
-        )
-    except StopIteration:
+    infront_idx = positions.car(player.car_position - 1)
+    if infront_idx is None or prev_positions.car(player.car_position - 1) is None:
         # In first place
         infront_idx = 255
         infront_player = "Currently in P1"
+    else:
+        infront_player = lapdata.cars[infront_idx]
 
     if player.current_lap_number > 1:
         drs_player, drs_front, drs_behind = calculate_drs_status(
@@ -187,78 +204,25 @@ def prettyfy_lapdata(shared):
     )
 
     if player.current_lap_number > 1:
-        # zero index so -1, then want previous lap so -1 again
-        previous_lap_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["number_of_laps_in_data"] - 2
-        ].lap_time_ms
-        previous_s1_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["number_of_laps_in_data"] - 2
-        ].sector1_time_ms_component
-        previous_s2_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["number_of_laps_in_data"] - 2
-        ].sector2_time_ms_component
-        previous_s3_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["number_of_laps_in_data"] - 2
-        ].sector3_time_ms_component
-
-        if player.sector >= 0:
-            s1_delta = min(current_lap_time, current_s1_time) - (
-                (
-                    min(
-                        player.lap_distance_travelled_m,
-                        shared.session.sector_2_start_distance_m,
-                    )
-                )
-                / (shared.session.sector_2_start_distance_m)
-                * previous_s1_time
-            )
-        if player.sector >= 1:
-            s2_delta = min(current_lap_time - current_s1_time, current_s2_time) - (
-                (
-                    min(
-                        player.lap_distance_travelled_m,
-                        shared.session.sector_3_start_distance_m,
-                    )
-                    - shared.session.sector_2_start_distance_m
-                )
-                / (
-                    shared.session.sector_3_start_distance_m
-                    - shared.session.sector_2_start_distance_m
-                )
-                * previous_s2_time
-            )
-        else:
-            s2_delta = 0
-        if player.sector >= 2:
-            s3_delta = (current_lap_time - current_s1_time - current_s2_time) - (
-                (
-                    player.lap_distance_travelled_m
-                    - shared.session.sector_3_start_distance_m
-                )
-                / (
-                    shared.session.track_length_m
-                    - shared.session.sector_3_start_distance_m
-                )
-                * previous_s3_time
-            )
-        else:
-            s3_delta = 0
+        s1_delta, s2_delta, s3_delta = sector_deltas(
+            player, current_s1_time, current_s2_time, shared
+        )
 
         _s1 = humanise(current_lap_time)
         _s2 = humanise(min(current_lap_time, current_s1_time))
-        _s3 = humanise(s1_delta)
+        _s3 = s1_delta
         _s4 = humanise(
             min(current_lap_time - current_s1_time, current_s2_time)
             if player.sector > 0
             else 0
         )
-        _s5 = humanise(s2_delta)
+        _s5 = s2_delta
         _s6 = humanise(
             current_lap_time - current_s1_time - current_s2_time
             if player.sector > 1
             else 0
         )
-        _s7 = humanise(s3_delta)
+        _s7 = s3_delta
         current_lap_time_string = (
             f"{_s1}\n{_s2} ({_s3}) | {_s4} ({_s5}) | {_s6} ({_s7})"
         )
@@ -268,25 +232,24 @@ def prettyfy_lapdata(shared):
 
     if player.current_lap_number > 1:
         # zero indexed
-        best_lap_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["best_lap_number"] - 1
-        ].lap_time_ms
-        best_lap_s1_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["best_lap_number"] - 1
-        ].sector1_time_ms_component
-        best_lap_s2_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["best_lap_number"] - 1
-        ].sector2_time_ms_component
-        best_lap_s3_time = shared.history[header.player_car_index]["lap_history_data"][
-            shared.history[header.player_car_index]["best_lap_number"] - 1
-        ].sector3_time_ms_component
-
-        _s1 = humanise(best_lap_time)
-        _s2 = humanise(best_lap_s1_time)
-        _s3 = humanise(best_lap_s2_time)
-        _s4 = humanise(best_lap_s3_time)
+        history = shared.history[header.player_car_index]
+        best_lap = history["lap_history_data"][history["best_lap_number"] - 1]
+
+        _s1 = humanise(best_lap.lap_time_ms)
+        _s2 = humanise(best_lap.sector1_time_ms_component)
+        _s3 = humanise(best_lap.sector2_time_ms_component)
+        _s4 = humanise(best_lap.sector3_time_ms_component)
         best_lap_string = f"{_s1}\n{_s2} | {_s3} | {_s4}"
         del _s1, _s2, _s3, _s4
+
+        if shared.lap_delta is not None:
+            live_delta = shared.lap_delta.delta(
+                shared.lap_delta.best,
+                player.lap_distance_travelled_m,
+                player.current_lap_time_ms,
+            )
+            if live_delta is not None:
+                best_lap_string += f"\n{humanise(live_delta)}"
     else:
         best_lap_string = humanise(player.current_lap_time_ms)
 
@@ -309,6 +272,48 @@ def prettyfy_lapdata(shared):
     )
 
 
+def gap_text(milliseconds: float, laps: int) -> str:
+    if laps > 0:
+        return f"+{laps} L"
+    if math.isnan(milliseconds):
+        # Not timed yet
+        return ""
+    # Tenths, so it doesn't redraw for every packet
+    return f"+{milliseconds / 1000:.1f}"
+
+
+def prettyfy_leaderboard(shared):
+    # Header 2
+    gaps = shared.gaps
+    participants = shared.participants
+    player_idx = shared.header.player_car_index
+
+    if gaps is not None:
+        # Plain lists, indexing NumPy arrays a value at a time is slow
+        intervals = zip(gaps.interval_ms.tolist(), gaps.interval_laps.tolist())
+        gaps_to_leader = zip(gaps.gap_ms.tolist(), gaps.gap_laps.tolist())
+        intervals = [gap_text(ms, laps) for ms, laps in intervals]
+        gaps_to_leader = [gap_text(ms, laps) for ms, laps in gaps_to_leader]
+
+    lines = [f"{'':2} {'':3} {'INT':>7} {'GAP':>7}"]
+    for position, car_idx in enumerate(shared.positions.order(), start=1):
+        try:
+            name = dc.driver_dict[participants[car_idx].driver_id]
+            code = name.split()[-1][:3].upper()
+        except (KeyError, IndexError, TypeError):
+            code = str(car_idx)
+
+        if gaps is None or position == 1:
+            interval = gap = ""
+        else:
+            interval = intervals[car_idx]
+            gap = gaps_to_leader[car_idx]
+        marker = ">" if car_idx == player_idx else " "
+        lines.append(f"{position:>2}{marker}{code:<3} {interval:>7} {gap:>7}")
+
+    return "\n".join(lines)
+
+
 def prettyfy_event(shared):
     # Header 3
     header = shared.header
@@ -377,6 +382,9 @@ def prettyfy_setup():
 
 def prettyfy_telemetry(shared):
     # Header 6
+    if shared.setup is None:
+        # Setups come twice a second, telemetry can beat the first one in
+        return "", "", "", ""
     header = shared.header
     telemetry = shared.telemetry.statuses[header.player_car_index]
     setup = shared.setup.setups[header.player_car_index]
@@ -472,74 +480,25 @@ def prettyfy_tyres(shared):
     # Header 12
     header = shared.header
     try:
-        tyres = shared.tyres[header.player_car_index]["tyre_sets_data"]
+        stock = shared.tyres[header.player_car_index]["stock"]
     except TypeError:
         softs, mediums, hards, inters = "", "", "", ""
         return softs, mediums, hards, inters
 
-    softs = [
-        tyre
-        for tyre in tyres
-        if tyre.visual_tyre_compound == 16 and tyre.available == 1 and tyre.fitted != 1
-    ]
-    mediums = [
-        tyre
-        for tyre in tyres
-        if tyre.visual_tyre_compound == 17 and tyre.available == 1 and tyre.fitted != 1
-    ]
-    hards = [
-        tyre
-        for tyre in tyres
-        if tyre.visual_tyre_compound == 18 and tyre.available == 1 and tyre.fitted != 1
-    ]
-    inters = [
-        tyre
-        for tyre in tyres
-        if (tyre.visual_tyre_compound == 7 and tyre.available == 1 and tyre.fitted != 1)
-    ]
-
-    count_new_softs = len([tyre for tyre in softs if tyre.wear == 0])
-    count_new_mediums = len([tyre for tyre in mediums if tyre.wear == 0])
-    count_new_hards = len([tyre for tyre in hards if tyre.wear == 0])
-    count_new_inters = len([tyre for tyre in inters if tyre.wear == 0])
-
-    try:
-        best_softs = min(softs, key=attrgetter("wear"))
-        best_mediums = min(mediums, key=attrgetter("wear"))
-        best_hards = min(hards, key=attrgetter("wear"))
-        best_inters = min(inters, key=attrgetter("wear"))
-    except ValueError:
+    # Shown once there's a set of each left
+    if any(held.best is None for held in stock.values()):
         return "", "", "", ""
 
-    _s1 = count_new_inters
-    _s2 = len(inters) - count_new_inters
-    _s3 = humanise(best_inters.lap_delta_time)
-    _s4 = best_inters.usable_life
-    inters_string = f"Inters: {_s1} new, {_s2} used\n       {_s3} secs\n{_s4}"
-    del _s1, _s2, _s3, _s4
-
-    _s1 = count_new_softs
-    _s2 = len(softs) - count_new_softs
-    _s3 = humanise(best_softs.lap_delta_time)
-    _s4 = best_softs.usable_life
-    softs_string = f"Softs: {_s1} new, {_s2} used\n       {_s3} secs\n{_s4}"
-    del _s1, _s2, _s3, _s4
-
-    _s1 = count_new_mediums
-    _s2 = len(mediums) - count_new_mediums
-    _s3 = humanise(best_mediums.lap_delta_time)
-    _s4 = best_mediums.usable_life
-    mediums_string = f"Mediums: {_s1} new, {_s2} used\n       {_s3} secs\n{_s4}"
-    del _s1, _s2, _s3, _s4
-
-    _s1 = count_new_hards
-    _s2 = len(hards) - count_new_hards
-    _s3 = humanise(best_hards.lap_delta_time)
-    _s4 = best_hards.usable_life
-    hards_string = f"Hards: {_s1} new, {_s2} used\n       {_s3} secs\n{_s4}"
-    del _s1, _s2, _s3, _s4
+    strings = {}
+    for compound, name in tyre_inventory.COMPOUNDS.items():
+        held = stock[compound]
+        _s1 = humanise(held.best.lap_delta_time)
+        _s2 = held.best.usable_life
+        strings[compound] = (
+            f"{name}: {held.new} new, {held.used} used\n       {_s1} secs\n{_s2}"
+        )
 
-    return softs_string, mediums_string, hards_string, inters_string
+    return strings[16], strings[17], strings[18], strings[7]
 
 
 def prettyfy_exmotion():
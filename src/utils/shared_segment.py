@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""What the packet ring and the state table have in common: a named shared memory
+segment that starts with a header whose magic goes in last, attached to by
+polling until that magic shows up, and readers claiming their id by binding its
+doorbell"""
+
+import struct
+import time
+from multiprocessing import shared_memory
+
+from utils import doorbell
+
+CACHE_LINE = 64
+
+## Counters use native "Q" rather than "<Q" so each is packed with a single
+## 8 byte copy instead of byte by byte, and a reader never sees half an update
+COUNTER_STRUCT = struct.Struct("Q")
+
+
+def align(size: int) -> int:
+    """size rounded up to a whole number of cache lines"""
+    return -(-size // CACHE_LINE) * CACHE_LINE
+
+
+def create(
+    name: str | None, size: int, header: struct.Struct, magic: bytes, *values
+) -> shared_memory.SharedMemory:
+    """A new segment with header packed at the start, magic then values"""
+    shm = shared_memory.SharedMemory(create=True, size=size, name=name)
+    # Magic goes in last so an attaching reader never sees half a header
+    header.pack_into(shm.buf, 0, b"\0" * len(magic), *values)
+    shm.buf[: len(magic)] = magic
+    return shm
+
+
+def attach(
+    name: str, magic: bytes, timeout: float, what: str
+) -> shared_memory.SharedMemory:
+    """Attach to a segment created by another process, waiting for it to appear"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+            if bytes(shm.buf[: len(magic)]) == magic:
+                return shm
+            shm.close()
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # Created but not sized yet
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{what} {name} did not appear within {timeout}s")
+        time.sleep(0.01)
+
+
+def bells(name: str, max_readers: int) -> list[str]:
+    """Doorbell name of every reader id of the segment called name"""
+    return [f"{name}/{reader}" for reader in range(max_readers)]
+
+
+def claim_reader(bells: list[str], reader: int) -> doorbell.Doorbell:
+    """Bind reader's doorbell. Binding is atomic and the kernel frees it when a
+    reader dies, so it doubles as the claim on this reader id"""
+    if not 0 <= reader < len(bells):
+        raise ValueError(f"Reader id must be below {len(bells)}")
+    try:
+        return doorbell.Doorbell(bells[reader])
+    except OSError as error:
+        raise RuntimeError(f"Reader {reader} is already in use") from error
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Latest packet of every type in named shared memory, so the TUI reads the game
+state straight out of a fixed layout instead of having decoded dataclasses pickled
+across a Queue. Each packet is kept in its own wire layout, which is already a
+fixed little endian record of every decoded value, so a reader can unpack just
+the fields it needs or hand the whole thing to the usual decoder.
+
+Every slot is guarded by a seqlock: the writer makes the slot's sequence number
+odd, writes the payload and then makes it even again. A reader copies the payload
+and only keeps it if the sequence number was even and unchanged throughout, so it
+never sees half of one packet and half of the next, and the writer never waits"""
+
+import struct
+from collections import Counter
+from multiprocessing import shared_memory
+
+from loguru import logger
+
+from models import udp_protocol
+from utils import doorbell, shared_segment
+from utils.packet_ring import DEFAULT_SLOT_SIZE
+from utils.shared_segment import CACHE_LINE, COUNTER_STRUCT, align
+
+TABLE_MAGIC = b"SMBT"
+TABLE_VERSION = 1
+
+## [magic:4][version:2][pad:2][slot_size:4][entry_count:4][max_readers:4]
+TABLE_HEADER_STRUCT = struct.Struct("<4sH2xIII")
+
+## Each entry is a cache line holding [published:8], then `depth` slots of
+## [seq:8][length:4][pad:4][payload:slot_size]
+ENTRIES_OFFSET = 64
+SLOT_STRUCT = struct.Struct("QI4x")
+
+# Packets sent once per car get an entry per car, keyed on the car index in their first byte
+PER_CAR_PACKETS = {
+    udp_protocol.SessionHistoryPacket.PACKET_ID,
+    udp_protocol.TyreSetsPacket.PACKET_ID,
+}
+MAX_CARS = 22
+
+# Events are one-offs rather than state, so a short history is kept for readers to walk
+EVENT_DEPTH = 64
+
+DEFAULT_MAX_READERS = 4
+
+# Reader ids used by this project
+TUI_READER = 0
+
+
+def entry_keys() -> list[tuple[int, int | None]]:
+    """(packet_id, car_idx) of every entry in table order, car_idx is None unless per car"""
+    keys = []
+    for packet_id in sorted(
+        {packet_id for _, packet_id in udp_protocol.PACKET_CLASSES}
+    ):
+        if packet_id in PER_CAR_PACKETS:
+            keys.extend((packet_id, car) for car in range(MAX_CARS))
+        else:
+            keys.append((packet_id, None))
+    return keys
+
+
+class StateTable:
+    """One entry per packet type (per car for history and tyre sets), holding the
+    last packet published for it. Event entries keep the last `EVENT_DEPTH`
+    packets so a reader sees every event, not just the latest one"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, reader: int | None = None):
+        self.shm = shm
+        self.buf = shm.buf
+
+        magic, version, slot_size, entry_count, max_readers = (
+            TABLE_HEADER_STRUCT.unpack_from(self.buf, 0)
+        )
+        if magic != TABLE_MAGIC or version != TABLE_VERSION:
+            raise ValueError(
+                f"{shm.name} is not a version {TABLE_VERSION} state table ({magic!r} v{version})"
+            )
+
+        self.slot_size = slot_size
+        self.stride = align(SLOT_STRUCT.size + slot_size)
+        self.max_readers = max_readers
+        # key -> (offset, depth)
+        self.entries = self.layout(slot_size)
+        if len(self.entries) != entry_count:
+            raise ValueError(
+                f"{shm.name} has {entry_count} entries, this build expects {len(self.entries)}"
+            )
+
+        # Writer: packets published per entry, picked up from the segment.
+        # Reader: packets seen per entry, starting from nothing so the first
+        # changes() hands over whatever the table already holds
+        if reader is None:
+            self.counts = {
+                key: COUNTER_STRUCT.unpack_from(self.buf, offset)[0]
+                for key, (offset, _) in self.entries.items()
+            }
+        else:
+            self.counts = dict.fromkeys(self.entries, 0)
+        self.lost = 0
+        # packet_id -> packets never handed over because a newer one replaced them first
+        self.conflated = Counter()
+
+        self.reader = reader
+        self.bells = shared_segment.bells(shm.name, max_readers)
+        if reader is not None:
+            self.doorbell = shared_segment.claim_reader(self.bells, reader)
+
+    @staticmethod
+    def layout(slot_size: int) -> dict:
+        stride = align(SLOT_STRUCT.size + slot_size)
+        entries = {}
+        offset = ENTRIES_OFFSET
+        for key in entry_keys():
+            depth = EVENT_DEPTH if key[0] == udp_protocol.EventPacket.PACKET_ID else 1
+            entries[key] = (offset, depth)
+            offset += CACHE_LINE + stride * depth
+        return entries
+
+    @classmethod
+    def segment_size(cls, slot_size: int) -> int:
+        offset, depth = list(cls.layout(slot_size).values())[-1]
+        return offset + CACHE_LINE + align(SLOT_STRUCT.size + slot_size) * depth
+
+    @classmethod
+    def create(
+        cls,
+        name: str | None = None,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        max_readers: int = DEFAULT_MAX_READERS,
+    ):
+        shm = shared_segment.create(
+            name,
+            cls.segment_size(slot_size),
+            TABLE_HEADER_STRUCT,
+            TABLE_MAGIC,
+            TABLE_VERSION,
+            slot_size,
+            len(cls.layout(slot_size)),
+            max_readers,
+        )
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name: str, reader: int | None = None, timeout: float = 5.0):
+        """Attach to a table created by another process, waiting for it to appear"""
+        shm = shared_segment.attach(name, TABLE_MAGIC, timeout, "State table")
+        return cls(shm, reader)
+
+    def key(self, packet_id: int, packet) -> tuple[int, int | None]:
+        if packet_id in PER_CAR_PACKETS:
+            return (packet_id, packet[udp_protocol.HEADER_STRUCT.size])
+        return (packet_id, None)
+
+    ## ------ WRITER ------- ##
+
+    def publish(self, packet_id: int, packet) -> bool:
+        """Store packet as the latest of its type, False if it has no entry or won't fit"""
+        length = len(packet)
+        key = self.key(packet_id, packet)
+        entry = self.entries.get(key)
+        if entry is None or length > self.slot_size:
+            return False
+
+        offset, depth = entry
+        count = self.counts[key]
+        slot = offset + CACHE_LINE + (count % depth) * self.stride
+        payload = slot + SLOT_STRUCT.size
+
+        # Odd while the payload is in flux, even and unique to this packet once done
+        COUNTER_STRUCT.pack_into(self.buf, slot, 2 * count + 1)
+        self.buf[payload : payload + length] = packet
+        SLOT_STRUCT.pack_into(self.buf, slot, 2 * count + 2, length)
+
+        self.counts[key] = count + 1
+        COUNTER_STRUCT.pack_into(self.buf, offset, count + 1)
+        return True
+
+    def notify(self):
+        """Wake every waiting reader, called once per published batch"""
+        for bell in self.bells:
+            doorbell.ring(bell)
+
+    ## ------ READER ------- ##
+
+    def _copy(self, offset: int, depth: int, count: int) -> bytes | None:
+        """Packet number `count` of an entry, or None if it has been overwritten"""
+        slot = offset + CACHE_LINE + (count % depth) * self.stride
+        seq, length = SLOT_STRUCT.unpack_from(self.buf, slot)
+        if seq != 2 * count + 2:
+            return None
+
+        payload = slot + SLOT_STRUCT.size
+        data = bytes(self.buf[payload : payload + length])
+        # The writer may have started on the slot while it was being copied
+        if COUNTER_STRUCT.unpack_from(self.buf, slot)[0] != seq:
+            return None
+        return data
+
+    def read(self, packet_id: int, car_idx: int | None = None) -> bytes | None:
+        """Latest packet of a type, None if nothing has been published for it yet"""
+        offset, depth = self.entries[(packet_id, car_idx)]
+        while True:
+            (count,) = COUNTER_STRUCT.unpack_from(self.buf, offset)
+            if not count:
+                return None
+            data = self._copy(offset, depth, count - 1)
+            if data is not None:
+                return data
+
+    def changes(self) -> list[bytes]:
+        """Everything published since the last call, in table order. State entries
+        only give their latest packet, event entries give every event still held"""
+        changed = []
+        for key, (offset, depth) in self.entries.items():
+            (count,) = COUNTER_STRUCT.unpack_from(self.buf, offset)
+            seen = self.counts[key]
+            if count == seen:
+                continue
+            self.counts[key] = count
+
+            if depth == 1:
+                # Only the newest matters, anything published before it is dropped
+                if count - seen > 1:
+                    self.conflated[key[0]] += count - seen - 1
+                data = self.read(*key)
+                if data is not None:
+                    changed.append(data)
+                continue
+
+            for number in range(max(seen, count - depth), count):
+                data = self._copy(offset, depth, number)
+                if data is None:
+                    self.lost += 1
+                else:
+                    changed.append(data)
+            if count - seen > depth:
+                self.lost += count - depth - seen
+                logger.warning(
+                    f"State table reader {self.reader} lost {count - depth - seen} of entry {key}"
+                )
+        return changed
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the writer publishes something new, or timeout"""
+        return self.doorbell.wait(timeout)
+
+    def close(self):
+        if self.reader is not None:
+            self.doorbell.close()
+        self.buf = None
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,476 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""A made up 22 car race sent over UDP like the game would, so the receiver,
+processor and TUI can be load tested on any box. The per frame packets go out at
+`--rate` Hz, the game's own maximum is 60 and this goes up to ten times that,
+everything else keeps the game's cadence.
+Run from `src/` with `python -m utils.synthetic_feed --rate 600`"""
+
+import argparse
+import math
+import random
+import socket
+import time
+from dataclasses import fields
+
+from loguru import logger
+
+from models import decode_dictionaries, udp_protocol
+from models.packet_schema import LazyRecords
+
+MAX_CARS = 22
+MAX_RATE = 600
+
+# Melbourne, one of the tracks the TUI has DRS zones for
+TRACK_ID = 0
+TRACK_LENGTH = 5278
+TOTAL_LAPS = 58
+
+# Ids the TUI can name, two cars a team
+DRIVER_IDS = sorted(decode_dictionaries.driver_dict)[:MAX_CARS]
+TEAM_IDS = sorted(decode_dictionaries.team_dict)[: MAX_CARS // 2]
+
+# Sent every frame
+PER_FRAME = (
+    udp_protocol.MotionPacket,
+    udp_protocol.LapdataPacket,
+    udp_protocol.TelemetryPacket,
+    udp_protocol.StatusPacket,
+    udp_protocol.ExMotion,
+)
+# Packet -> times a second, whatever the frame rate
+CADENCE = {
+    udp_protocol.SessionPacket: 2,
+    udp_protocol.ParticipantsPacket: 0.2,
+    udp_protocol.SetupPacket: 2,
+    udp_protocol.DamagePacket: 10,
+    udp_protocol.SessionHistoryPacket: 20,
+    udp_protocol.TyreSetsPacket: 20,
+    udp_protocol.LapPositionPacket: 1,
+}
+
+
+# A lap not driven yet, as session history pads its 100 laps with
+NO_LAP = udp_protocol.LapHistory.decode(bytes(udp_protocol.LapHistory.STRUCT.size))
+
+
+def blank(packet: type):
+    """An all zero packet to fill in, with plain lists in place of lazy records"""
+    values = packet.decode(bytes(packet.PACKET_SIZE))
+    for field in fields(values):
+        if isinstance(getattr(values, field.name), LazyRecords):
+            setattr(values, field.name, list(getattr(values, field.name)))
+    return values
+
+
+def split_ms(milliseconds: int) -> tuple[int, int]:
+    """(ms component, minutes component) as the game splits its deltas"""
+    return milliseconds % 60000, milliseconds // 60000
+
+
+class Race:
+    """Cars lapping at their own pace around a circle, speeding up and slowing
+    down through the lap, with overtakes, lap times and fastest laps falling
+    out of that. `frame()` gives the datagrams due for the next frame"""
+
+    def __init__(self, rate: float = 60, seed: int = 0, player: int = 0):
+        if not 0 < rate <= MAX_RATE:
+            raise ValueError(f"Rate must be above 0 and at most {MAX_RATE}Hz")
+        rng = random.Random(seed)
+
+        self.rate = rate
+        self.dt = 1 / rate
+        self.frame_id = 0
+        self.header = udp_protocol.Header(
+            udp_protocol.PACKET_FORMAT,
+            25,
+            1,
+            0,
+            1,
+            0,
+            rng.getrandbits(64),
+            0.0,
+            0,
+            0,
+            player,
+            255,
+        )
+
+        # Grid slots 8m apart, car 0 on pole
+        self.distance = [(MAX_CARS - 1 - idx) * 8.0 for idx in range(MAX_CARS)]
+        self.speed = [TRACK_LENGTH / rng.uniform(80.0, 84.0) for _ in range(MAX_CARS)]
+        self.lap_start = [0.0] * MAX_CARS
+        self.best_lap_ms = 0
+        self.history = [[] for _ in range(MAX_CARS)]
+        self.lap_positions = []
+        self.events = [
+            udp_protocol.EventPacket("SSTA"),
+            udp_protocol.EventPacket("LGOT"),
+        ]
+
+        self.packets = {packet: blank(packet) for packet in (*PER_FRAME, *CADENCE)}
+        # Frames between sends of each slower packet
+        self.every = {
+            packet: max(1, round(rate / hz)) for packet, hz in CADENCE.items()
+        }
+        self.fill_static()
+        self.positions = self.order()
+
+    def fill_static(self):
+        session = self.packets[udp_protocol.SessionPacket]
+        session.track_temp_c, session.air_temp_c = 34, 26
+        session.total_race_laps = TOTAL_LAPS
+        session.track_length_m = TRACK_LENGTH
+        session.session_type = 15
+        session.track_id = TRACK_ID
+        session.pit_speed_limit_kph = 80
+        session.session_duration_seconds = 7200
+        session.pit_stop_ideal_lap, session.pit_stop_latest_lap = 18, 26
+        session.sector_2_start_distance_m = TRACK_LENGTH / 3
+        session.sector_3_start_distance_m = TRACK_LENGTH * 2 / 3
+
+        participants = self.packets[udp_protocol.ParticipantsPacket]
+        participants.number_of_active_cars = MAX_CARS
+        for idx, car in enumerate(participants.cars):
+            car.is_ai_controlled_flag = int(idx != self.header.player_car_index)
+            car.driver_id = DRIVER_IDS[idx]
+            car.network_id = 255
+            car.team_id = TEAM_IDS[idx // 2]
+            car.race_number = idx + 1
+            car.nationality = idx + 1
+            car.name = f"SIM {idx + 1:02}".encode()
+            car.network_telemetry_flag = 1
+            car.show_online_names = 1
+            car.platform = 255
+
+        for idx, status in enumerate(self.packets[udp_protocol.StatusPacket].statuses):
+            status.traction_control, status.anti_lock_brakes = 0, 0
+            status.fuel_mix, status.front_brake_bias = 1, 56
+            status.current_fuel_in_tank_kg = 100.0
+            status.fuel_capacity = 110.0
+            status.max_rpm, status.idle_rpm, status.max_gears = 13500, 4000, 8
+            status.actual_tyre_compound, status.visual_tyre_compound = 18, 16
+            status.drs_allowed = int(idx % 3 == 0)
+            status.ers_store_energy = 4_000_000.0
+            status.ers_deploy_mode = 1
+
+        for setup in self.packets[udp_protocol.SetupPacket].setups:
+            setup.front_wing, setup.rear_wing = 25, 20
+            setup.front_left_tyre_pressure = setup.front_right_tyre_pressure = 23.0
+            setup.rear_left_tyre_pressure = setup.rear_right_tyre_pressure = 21.5
+            setup.fuel_load = 100.0
+
+        for telemetry in self.packets[udp_protocol.TelemetryPacket].statuses:
+            telemetry.engine_temperature = 110
+            for tyre in ("rl", "rr", "fl", "fr"):
+                setattr(telemetry, f"tyres_{tyre}_surface_temperature", 95)
+                setattr(telemetry, f"tyres_{tyre}_inner_temperature", 100)
+            telemetry.tyres_rl_pressure = telemetry.tyres_rr_pressure = 21.5
+            telemetry.tyres_fl_pressure = telemetry.tyres_fr_pressure = 23.0
+
+        tyre_sets = self.packets[udp_protocol.TyreSetsPacket]
+        for idx, tyre_set in enumerate(tyre_sets.tyre_set_data):
+            tyre_set.actual_tyre_compound = 16 + idx % 3
+            tyre_set.visual_tyre_compound = 16 + idx % 3
+            tyre_set.available = 1
+            tyre_set.life_span = tyre_set.usable_life = 25
+
+        for carlap in self.packets[udp_protocol.LapdataPacket].cars:
+            carlap.driver_status = 4
+            carlap.result_status = 2
+
+    def order(self) -> list[int]:
+        """Car indexes, leader first"""
+        return sorted(range(MAX_CARS), key=lambda idx: -self.distance[idx])
+
+    def pace(self, idx: int) -> float:
+        # Four straights and four corners a lap, averaging out at the car's speed
+        lap_fraction = self.distance[idx] / TRACK_LENGTH
+        return self.speed[idx] * (1 + 0.3 * math.sin(2 * math.pi * 4 * lap_fraction))
+
+    def step(self):
+        self.frame_id += 1
+        self.header.session_time += self.dt
+        now = self.header.session_time
+
+        laps_before = [int(distance // TRACK_LENGTH) for distance in self.distance]
+        velocity = []
+        for idx in range(MAX_CARS):
+            velocity.append(self.pace(idx))
+            self.distance[idx] += velocity[-1] * self.dt
+
+        positions = self.order()
+        for place, idx in enumerate(positions):
+            if idx != self.positions[place] and self.positions.index(idx) > place:
+                self.events.append(udp_protocol.Overtake(idx, self.positions[place]))
+        self.positions = positions
+
+        for idx in range(MAX_CARS):
+            if int(self.distance[idx] // TRACK_LENGTH) > laps_before[idx]:
+                self.complete_lap(idx, now)
+
+        self.fill_lapdata(velocity, now)
+        self.fill_motion(velocity)
+
+    def complete_lap(self, idx: int, now: float):
+        lap_ms = int((now - self.lap_start[idx]) * 1000)
+        self.lap_start[idx] = now
+        carlap = self.packets[udp_protocol.LapdataPacket].cars[idx]
+        carlap.last_lap_time_ms = lap_ms
+
+        sector_ms = lap_ms // 3
+        self.history[idx].append(
+            udp_protocol.LapHistory(
+                lap_ms,
+                *split_ms(sector_ms),
+                *split_ms(sector_ms),
+                *split_ms(sector_ms),
+                15,
+            )
+        )
+        del self.history[idx][:-100]
+
+        lap = len(self.history[idx])
+        if lap > len(self.lap_positions):
+            self.lap_positions.append([0] * MAX_CARS)
+        self.lap_positions[lap - 1][idx] = self.positions.index(idx) + 1
+
+        if not self.best_lap_ms or lap_ms < self.best_lap_ms:
+            self.best_lap_ms = lap_ms
+            self.events.append(udp_protocol.FastestLap(idx, lap_ms / 1000))
+
+    def fill_lapdata(self, velocity: list[float], now: float):
+        lapdata = self.packets[udp_protocol.LapdataPacket]
+        leader = self.positions[0]
+        for place, idx in enumerate(self.positions):
+            carlap = lapdata.cars[idx]
+            lap_distance = self.distance[idx] % TRACK_LENGTH
+            carlap.current_lap_time_ms = int((now - self.lap_start[idx]) * 1000)
+            carlap.lap_distance_travelled_m = lap_distance
+            carlap.session_distance_travelled_m = self.distance[idx]
+            carlap.car_position = place + 1
+            carlap.grid_position = idx + 1
+            carlap.current_lap_number = int(self.distance[idx] // TRACK_LENGTH) + 1
+            # Sector times as each sector is completed, cleared for a new lap
+            sector = min(2, int(lap_distance / TRACK_LENGTH * 3))
+            if sector == 0:
+                carlap.sector1_time_ms_component = 0
+                carlap.sector1_time_minutes_component = 0
+                carlap.sector2_time_ms_component = 0
+                carlap.sector2_time_minutes_component = 0
+            elif sector == 1 and carlap.sector == 0:
+                (
+                    carlap.sector1_time_ms_component,
+                    carlap.sector1_time_minutes_component,
+                ) = split_ms(carlap.current_lap_time_ms)
+            elif sector == 2 and carlap.sector == 1:
+                (
+                    carlap.sector2_time_ms_component,
+                    carlap.sector2_time_minutes_component,
+                ) = split_ms(
+                    carlap.current_lap_time_ms - carlap.sector1_time_ms_component
+                )
+            carlap.sector = sector
+
+            ahead = self.positions[max(place - 1, 0)]
+            gap_ms = int(
+                (self.distance[ahead] - self.distance[idx]) / velocity[idx] * 1000
+            )
+            leader_ms = int(
+                (self.distance[leader] - self.distance[idx]) / velocity[idx] * 1000
+            )
+            (
+                carlap.delta_to_car_in_front_ms_component,
+                carlap.delta_to_car_in_front_minutes_component,
+            ) = split_ms(gap_ms)
+            (
+                carlap.delta_to_leader_ms_component,
+                carlap.delta_to_leader_minutes_component,
+            ) = split_ms(leader_ms)
+
+    def fill_motion(self, velocity: list[float]):
+        radius = TRACK_LENGTH / (2 * math.pi)
+        motion = self.packets[udp_protocol.MotionPacket]
+        telemetry = self.packets[udp_protocol.TelemetryPacket]
+        status = self.packets[udp_protocol.StatusPacket]
+        damage = self.packets[udp_protocol.DamagePacket]
+
+        for idx in range(MAX_CARS):
+            angle = self.distance[idx] / radius
+            car = motion.cars[idx]
+            car.world_position_x = radius * math.cos(angle)
+            car.world_position_z = radius * math.sin(angle)
+            car.world_velocity_x = -velocity[idx] * math.sin(angle)
+            car.world_velocity_z = velocity[idx] * math.cos(angle)
+            car.world_forward_direction_x = int(-32767 * math.sin(angle))
+            car.world_forward_direction_z = int(32767 * math.cos(angle))
+            car.yaw_radians = math.remainder(angle + math.pi / 2, 2 * math.pi)
+            car.g_force_lateral = velocity[idx] ** 2 / radius / 9.81
+
+            kph = velocity[idx] * 3.6
+            accelerating = velocity[idx] > self.speed[idx]
+            car_telemetry = telemetry.statuses[idx]
+            car_telemetry.speed = int(kph)
+            car_telemetry.throttle = 1.0 if accelerating else 0.2
+            car_telemetry.brake = 0.0 if accelerating else 0.6
+            # Open down the first eighth of the lap by the cars allowed it
+            car_telemetry.drs = int(
+                accelerating
+                and self.distance[idx] % TRACK_LENGTH < TRACK_LENGTH / 8
+                and idx % 3 == 0
+            )
+            car_telemetry.gear = min(8, 1 + int(kph // 40))
+            car_telemetry.engine_rpm = 9000 + int(4000 * (kph % 40) / 40)
+            car_telemetry.rev_lights_percent = int(100 * (kph % 40) / 40)
+            car_telemetry.brakes_rl_temperature = (
+                car_telemetry.brakes_rr_temperature
+            ) = 300 if accelerating else 650
+            car_telemetry.brakes_fl_temperature = (
+                car_telemetry.brakes_fr_temperature
+            ) = car_telemetry.brakes_rl_temperature
+
+            laps = self.distance[idx] / TRACK_LENGTH
+            car_status = status.statuses[idx]
+            car_status.current_fuel_in_tank_kg = max(0.0, 100.0 - 1.6 * laps)
+            car_status.fuel_remaining_laps = (
+                car_status.current_fuel_in_tank_kg / 1.6 - (TOTAL_LAPS - laps)
+            )
+            car_status.tyre_age_laps = int(laps)
+
+            wear = min(100.0, 1.5 * laps)
+            car_damage = damage.statuses[idx]
+            car_damage.tyre_rl_wear_percentage = car_damage.tyre_rr_wear_percentage = (
+                wear
+            )
+            car_damage.tyre_fl_wear_percentage = car_damage.tyre_fr_wear_percentage = (
+                wear * 1.1
+            )
+
+        # Extended motion is only ever about the player's car
+        player = self.header.player_car_index
+        ex_motion = self.packets[udp_protocol.ExMotion]
+        bump = math.sin(2 * math.pi * 4 * self.distance[player] / TRACK_LENGTH)
+        ex_motion.suspension_rl_position = ex_motion.suspension_rr_position = 20 * bump
+        ex_motion.suspension_fl_position = ex_motion.suspension_fr_position = 15 * bump
+        ex_motion.front_wheels_angle = 0.1 * bump
+        ex_motion.front_aero_height, ex_motion.rear_aero_height = 0.03, 0.06
+
+    def due(self) -> list:
+        """The packets to send this frame, events first as the game sends them"""
+        due = [*self.events, *PER_FRAME]
+        self.events.clear()
+
+        for packet, every in self.every.items():
+            # Counted from the first frame, so everything has been sent once straight away
+            if (self.frame_id - 1) % every:
+                continue
+            due.append(packet)
+
+            # One car at a time for the per car packets
+            sent = (self.frame_id - 1) // every
+            if packet is udp_protocol.SessionHistoryPacket:
+                self.fill_history(sent % MAX_CARS)
+            elif packet is udp_protocol.TyreSetsPacket:
+                self.packets[packet].car_idx = sent % MAX_CARS
+            elif packet is udp_protocol.LapPositionPacket:
+                self.fill_lap_positions()
+        return due
+
+    def fill_history(self, idx: int):
+        history = self.packets[udp_protocol.SessionHistoryPacket]
+        laps = self.history[idx]
+        history.relevant_car_id = idx
+        history.number_of_laps_in_data = len(laps)
+        history.number_of_tyre_stints = 1
+        history.lap_history_data[:] = laps + [NO_LAP] * (100 - len(laps))
+        if laps:
+            best = min(range(len(laps)), key=lambda lap: laps[lap].lap_time_ms)
+            history.best_lap_number = history.best_s1_lap_number = best + 1
+            history.best_s2_lap_number = history.best_s3_lap_number = best + 1
+        history.tyre_history_data[0].tyre_actual_compound = 18
+        history.tyre_history_data[0].tyre_visual_compound = 16
+
+    def fill_lap_positions(self):
+        lap_positions = self.packets[udp_protocol.LapPositionPacket]
+        laps = self.lap_positions[-50:]
+        lap_positions.laps_in_data = len(laps)
+        lap_positions.lap_where_data_starts = len(self.lap_positions) - len(laps) + 1
+        lap_positions.position_for_vehicle_idx[: len(laps)] = laps
+
+    def frame(self) -> list[bytes]:
+        """Advance one frame and encode every datagram due in it"""
+        self.step()
+        self.header.frame_id = self.header.overall_frame = self.frame_id
+
+        datagrams = []
+        for item in self.due():
+            self.header.packet_id = item.PACKET_ID
+            body = (
+                item.encode()
+                if isinstance(item, udp_protocol.EventPacket)
+                else self.packets[item].encode()
+            )
+            datagrams.append(self.header.encode() + body)
+        return datagrams
+
+
+def run(
+    rate: float = 60,
+    host: str = "127.0.0.1",
+    port: int = 20127,
+    seconds: float | None = None,
+    seed: int = 0,
+):
+    race = Race(rate, seed)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = (host, port)
+
+    start = next_frame = time.perf_counter()
+    frames = sent = late = 0
+    try:
+        while seconds is None or time.perf_counter() - start < seconds:
+            for datagram in race.frame():
+                sock.sendto(datagram, address)
+                sent += 1
+            frames += 1
+
+            # Paced off the schedule rather than the last frame so sleeps don't drift
+            next_frame += race.dt
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                late += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Sent {sent} packets in {frames} frames over {elapsed:.1f}s, "
+            f"{frames / elapsed:.1f} frames/s and {sent / elapsed:.0f} packets/s, {late} frames late"
+        )
+        sock.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Send a made up 22 car race over UDP like the game would",
+        epilog="Run from `src/` with `python -m utils.synthetic_feed --rate 600`",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=60, help=f"frames a second, up to {MAX_RATE}"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=20127)
+    parser.add_argument(
+        "--seconds", type=float, help="stop after this long, default runs until ^C"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.rate, args.host, args.port, args.seconds, args.seed)
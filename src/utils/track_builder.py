@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Learns track geometry from captures made by `udp_recorder`, writing one
+`<track id>.geom` per track for `track_geometry.load_learned` to map at startup.
+
+Motion, lap data and telemetry packets of the same frame are joined on
+`overall_frame`, which unlike `frame_id` doesn't go back after a flashback, and
+every car's sample of that frame dropped into a bin every RESOLUTION_M metres
+round the lap. The centreline is the mean world position in each bin, and DRS and
+braking zones the runs of bins where enough of the cars passing had DRS open or
+were on the brakes. Binning is done a chunk of frames at a time with bincount,
+so most of a run is spent reading the capture.
+Run from `src/` with `python -m utils.track_builder race.log --out models/tracks`"""
+
+import argparse
+import ast
+import codecs
+import math
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from models import udp_arrays, udp_protocol
+from models.track_geometry import TRACKS_DIR, LearnedTrack, write_learned
+from models.udp_arrays import ArrayPacket
+from utils import udp_processor
+
+RESOLUTION_M = 5.0
+# Frames joined and binned at a time
+CHUNK = 4096
+# Brake pressure that counts as braking
+BRAKE_ON = 0.1
+# Share of the cars passing a bin on the brakes for it to be in a braking zone
+BRAKING_SHARE = 0.5
+# Share of the busiest bin's DRS use for a bin to be in a DRS zone. Relative as
+# only cars within a second of the one ahead get to open it
+DRS_SHARE = 0.5
+# Zones shorter than this many bins are noise
+MIN_BINS = 2
+
+MOTION = udp_arrays.MotionArray.PACKET_ID
+LAPDATA = udp_arrays.LapdataArray.PACKET_ID
+TELEMETRY = udp_arrays.TelemetryArray.PACKET_ID
+SESSION = udp_protocol.SessionPacket.PACKET_ID
+
+# Packet id -> columns kept of it
+COLUMNS = {
+    MOTION: ("world_position_x", "world_position_y", "world_position_z"),
+    LAPDATA: ("lap_distance_travelled_m", "car_position", "pit_status"),
+    TELEMETRY: ("drs", "brake"),
+}
+
+
+def column(packet, name: str) -> np.ndarray:
+    """Every car's name, from an ArrayPacket or the dataclass older formats decode to"""
+    if isinstance(packet, ArrayPacket):
+        return packet[name]
+    records = packet.cars if hasattr(packet, "cars") else packet.statuses
+    return np.array([getattr(record, name) for record in records])
+
+
+class Bins:
+    """Running per bin totals of one session, grown as further bins turn up"""
+
+    def __init__(self):
+        self.positions = np.zeros((3, 0))
+        self.counts = np.zeros(0)
+        self.drs = np.zeros(0)
+        self.braking = np.zeros(0)
+
+    def grow(self, size: int):
+        grow = size - len(self.counts)
+        if grow > 0:
+            self.positions = np.pad(self.positions, ((0, 0), (0, grow)))
+            self.counts = np.pad(self.counts, (0, grow))
+            self.drs = np.pad(self.drs, (0, grow))
+            self.braking = np.pad(self.braking, (0, grow))
+
+    def add(self, bins: np.ndarray, positions: np.ndarray, drs, braking):
+        """One sample in bin bins[i] at positions[:, i] per i"""
+        self.grow(int(bins.max()) + 1)
+        size = len(self.counts)
+        for axis in range(3):
+            self.positions[axis] += np.bincount(bins, positions[axis], size)
+        self.counts += np.bincount(bins, minlength=size)
+        self.drs += np.bincount(bins, drs, size)
+        self.braking += np.bincount(bins, braking, size)
+
+    def merge(self, other: "Bins"):
+        self.grow(len(other.counts))
+        held = len(other.counts)
+        self.positions[:, :held] += other.positions
+        self.counts[:held] += other.counts
+        self.drs[:held] += other.drs
+        self.braking[:held] += other.braking
+
+
+class Session:
+    """Columns of the frames of one session not binned yet"""
+
+    def __init__(self):
+        self.frames = {packet_id: [] for packet_id in COLUMNS}
+        self.columns = {packet_id: [] for packet_id in COLUMNS}
+        self.bins = Bins()
+
+    def add(self, packet_id: int, overall_frame: int, packet):
+        self.frames[packet_id].append(overall_frame)
+        self.columns[packet_id].append(
+            [column(packet, name) for name in COLUMNS[packet_id]]
+        )
+        if len(self.frames[packet_id]) >= CHUNK:
+            self.flush()
+
+    def flush(self, final: bool = False):
+        """Bin the frames every packet has turned up for. Frames past the newest all
+        three have reached may still be completed by the next chunk, so are kept"""
+        frames = {
+            packet_id: np.array(ids, np.int64) for packet_id, ids in self.frames.items()
+        }
+        if not all(len(ids) for ids in frames.values()):
+            # A packet type missing for a whole chunk isn't being sent at all
+            for packet_id in COLUMNS:
+                self.frames[packet_id], self.columns[packet_id] = [], []
+            return
+        # Not assumed unique, a packet captured twice joins once
+        joined, motion, lapdata = np.intersect1d(
+            frames[MOTION], frames[LAPDATA], return_indices=True
+        )
+        joined, telemetry, both = np.intersect1d(
+            frames[TELEMETRY], joined, return_indices=True
+        )
+        rows = {
+            MOTION: motion[both],
+            LAPDATA: lapdata[both],
+            TELEMETRY: telemetry,
+        }
+        if len(joined):
+            self._bin(
+                {
+                    packet_id: np.asarray(self.columns[packet_id])[index]
+                    for packet_id, index in rows.items()
+                }
+            )
+
+        reached = min(int(ids.max()) for ids in frames.values())
+        for packet_id, ids in frames.items():
+            keep = [] if final else np.flatnonzero(ids > reached).tolist()
+            self.frames[packet_id] = [self.frames[packet_id][i] for i in keep]
+            self.columns[packet_id] = [self.columns[packet_id][i] for i in keep]
+
+    def _bin(self, columns: dict):
+        """columns are [frame, column, car]"""
+        distance, place, pit_status = columns[LAPDATA].transpose(1, 0, 2)
+        # Racing on track, not in the pits or waiting to cross the line
+        valid = (place > 0) & (pit_status == 0) & (distance >= 0)
+        if not valid.any():
+            return
+        positions = columns[MOTION].transpose(1, 0, 2)[:, valid]
+        drs, brake = columns[TELEMETRY].transpose(1, 0, 2)[:, valid]
+        bins = (distance[valid] // RESOLUTION_M).astype(np.int64)
+        self.bins.add(bins, positions, drs > 0, brake > BRAKE_ON)
+
+
+def zones(share: np.ndarray, threshold: float) -> np.ndarray:
+    """(start, end) in metres of each run of MIN_BINS or more bins at or over
+    threshold. A zone over the line comes out as two"""
+    over = np.concatenate(([False], share >= threshold, [False]))
+    edges = np.flatnonzero(np.diff(over.astype(np.int8)))
+    starts, ends = edges[::2], edges[1::2]
+    long = ends - starts >= MIN_BINS
+    return np.column_stack((starts[long], ends[long])) * RESOLUTION_M
+
+
+def learn(track_id: int, length_m: float, bins: Bins) -> LearnedTrack:
+    size = math.ceil(length_m / RESOLUTION_M)
+    # Bins past the line, from distances a touch over the length, are dropped
+    bins.grow(size)
+    counts = bins.counts[:size]
+    seen = np.flatnonzero(counts)
+
+    centreline = np.zeros((size, 3))
+    if len(seen):
+        marks = np.arange(size)
+        for axis in range(3):
+            means = bins.positions[axis, seen] / counts[seen]
+            # Bins nobody was seen in, between ones somebody was
+            centreline[:, axis] = np.interp(marks, seen, means, period=size)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drs = np.nan_to_num(bins.drs[:size] / counts)
+        braking = np.nan_to_num(bins.braking[:size] / counts)
+    drs_zones = zones(drs, DRS_SHARE * drs.max()) if drs.any() else np.zeros((0, 2))
+    return LearnedTrack(
+        track_id,
+        length_m,
+        RESOLUTION_M,
+        centreline,
+        np.minimum(drs_zones, length_m),
+        np.minimum(zones(braking, BRAKING_SHARE), length_m),
+    )
+
+
+def parse_line(line: str) -> tuple[int, bytes]:
+    """A `(length, packet)` line of a capture. The bytes literal is unescaped
+    directly, several times quicker than literal_eval which it falls back to for
+    anything that doesn't come out the length it says"""
+    line = line.rstrip()
+    comma = line.index(",")
+    length = int(line[1:comma])
+    # `, b'` to `')`
+    data = codecs.escape_decode(line[comma + 4 : -2])[0]
+    if len(data) != length:
+        return ast.literal_eval(line)
+    return length, data
+
+
+def read_capture(path: Path, sessions: dict, tracks: dict):
+    """Feed the packets of one capture into sessions, keyed on session uuid, noting
+    each session's (track id, track length) in tracks"""
+    # Lines of packets the builder has no use for are skipped before being parsed
+    wanted = {
+        entry.size
+        for (_, packet_id, _), entry in udp_processor.DECODERS.items()
+        if packet_id in COLUMNS or packet_id == SESSION
+    }
+    with Path(path).open() as f:
+        for line in f:
+            if not line.strip() or int(line[1 : line.index(",")]) not in wanted:
+                continue
+            length, data = parse_line(line)
+            header, packet = udp_processor.decode_udp(data, length)
+            if packet is None:
+                continue
+            if header.packet_id == SESSION:
+                tracks[header.session_uuid] = (
+                    packet.track_id,
+                    float(packet.track_length_m),
+                )
+            elif header.packet_id in COLUMNS:
+                sessions[header.session_uuid].add(
+                    header.packet_id, header.overall_frame, packet
+                )
+
+
+def build(paths: list[Path]) -> dict[int, LearnedTrack]:
+    """Track id -> what the captures at paths show of it, sessions on the same
+    track pooled"""
+    sessions = defaultdict(Session)
+    tracks = {}
+    for path in paths:
+        read_capture(path, sessions, tracks)
+
+    pooled = {}
+    for session_uuid, session in sessions.items():
+        session.flush(final=True)
+        if session_uuid not in tracks:
+            logger.warning(f"No session packet for session {session_uuid}, skipped")
+            continue
+        track = tracks[session_uuid]
+        pooled.setdefault(track, Bins()).merge(session.bins)
+
+    return {
+        track_id: learn(track_id, length_m, bins)
+        for (track_id, length_m), bins in pooled.items()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Learn track geometry from udp_recorder captures",
+        epilog="Run from `src/` with `python -m utils.track_builder race.log --out models/tracks`",
+    )
+    parser.add_argument("captures", nargs="+", type=Path, help="eg race.log")
+    parser.add_argument(
+        "--out", type=Path, default=TRACKS_DIR, help=f"default {TRACKS_DIR}"
+    )
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for track_id, track in build(args.captures).items():
+        write_learned(args.out / f"{track_id}.geom", track)
+        logger.info(
+            f"Track {track_id}: {len(track.centreline)} centreline points, "
+            f"{len(track.drs_zones)} DRS zones, {len(track.braking_zones)} braking zones"
+        )
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""What tyres each car has left to fit, counted in one pass over its tyre sets.
+The game resends every car's sets every few frames and they rarely change, so a
+packet hashing the same as the car's last is skipped before it's even decoded"""
+
+from dataclasses import dataclass
+
+from models import udp_protocol
+from models.udp_arrays import MAX_CARS
+
+# Visual compounds the footer shows
+COMPOUNDS = {16: "Softs", 17: "Mediums", 18: "Hards", 7: "Inters"}
+
+TYRE_SETS = udp_protocol.TyreSetsPacket.PACKET_ID
+HEADER_SIZE = udp_protocol.HEADER_STRUCT.size
+
+
+@dataclass(slots=True)
+class Stock:
+    """Sets of one compound that are available and not fitted, and the least worn"""
+
+    new: int = 0
+    used: int = 0
+    best: udp_protocol.TyreSets | None = None
+
+
+def aggregate(tyre_sets: list) -> dict[int, Stock]:
+    """Visual compound -> Stock, for every one of COMPOUNDS"""
+    stock = {compound: Stock() for compound in COMPOUNDS}
+    for tyre in tyre_sets:
+        held = stock.get(tyre.visual_tyre_compound)
+        if held is None or tyre.available != 1 or tyre.fitted == 1:
+            continue
+        if tyre.wear == 0:
+            held.new += 1
+        else:
+            held.used += 1
+        if held.best is None or tyre.wear < held.best.wear:
+            held.best = tyre
+    return stock
+
+
+class TyreInventory:
+    """Hash of the last tyre set packet processed of each car"""
+
+    def __init__(self):
+        self.hashes = [None] * MAX_CARS
+
+    def copy(self) -> "TyreInventory":
+        inventory = TyreInventory()
+        inventory.hashes = list(self.hashes)
+        return inventory
+
+    def resent(self, packet: bytes) -> bool:
+        """True if packet is tyre sets the same as the last of its car, so there's
+        nothing to decode. The header is left out, it differs every send"""
+        if (
+            len(packet) != udp_protocol.TyreSetsPacket.PACKET_SIZE
+            or udp_protocol.HEADER_STRUCT.unpack_from(packet)[5] != TYRE_SETS
+        ):
+            # Left for the decoder to make what it can of
+            return False
+        body = bytes(packet[HEADER_SIZE:])
+        car_idx = body[0]
+        if car_idx >= MAX_CARS:
+            return False
+        digest = hash(body)
+        if self.hashes[car_idx] == digest:
+            return True
+        self.hashes[car_idx] = digest
+        return False
@@ -5,85 +5,128 @@
 ## Check `skeletons/tools/py` for a list of currently preferred tools
 """
 
-import struct
-import time
-from multiprocessing import Process, Queue, shared_memory
+from collections import Counter
+from dataclasses import replace
+from multiprocessing import Process
 
 from loguru import logger
 
-from models import udp_protocol
-from utils import udp_receiver
+from models import protocol_registry, udp_arrays, udp_protocol
+from models.packet_schema import HEADER_SIZE
+from utils import packet_ring, udp_receiver
+from utils.packet_ring import PacketRing
+from utils.state_table import StateTable
 
 
 def process_named_shared_memory(
-    output_queue: Queue,
     shared_memory_name: str = "udp_queue",
-    shared_memory_size: int = 100 * 1024 * 1024,
+    state_table_name: str = "simba_state",
+    reader: int = packet_ring.PROCESSOR_READER,
+    batch_size: int = 64,
 ):
-    shm = shared_memory.SharedMemory(name=shared_memory_name)
-    slot_size = 65535 + 9
-    read_idx = 0
+    # Slot size and count come from the ring header written by the receiver
+    ring = PacketRing.attach(shared_memory_name, reader, "processor")
+    table = StateTable.create(state_table_name)
+    pending = 0
 
     while True:
-        offset = read_idx * slot_size
-        ready = shm.buf[offset + 4 + 65535]
+        data = ring.read()
 
-        if ready == 1:
-            length = struct.unpack("I", shm.buf[offset : offset + 4])[0]
-            data = bytes(shm.buf[offset + 4 : offset + 4 + length])
+        if data is not None:
+            pending += publish_udp(table, data)
+            if pending < batch_size:
+                continue
 
-            # Clear flag and process
-            shm.buf[offset + 4 + 65535] = 0
-            output_queue.put_nowait(decode_udp(data, length))
-            read_idx = (read_idx + 1) % (shared_memory_size // slot_size)
-        else:
-            time.sleep(0.01)  # Backoff when empty
+        if pending:
+            # One wakeup per batch rather than per packet
+            table.notify()
+            pending = 0
+        if data is None:
+            # Sleep until the receiver publishes, the timeout only guards a lost ring
+            ring.wait(timeout=1.0)
+
+
+# (packet_format, packet_id, packet_version) -> Entry, looked up once per packet
+DECODERS = dict(protocol_registry.REGISTRY)
+# Packets with a record per car map onto NumPy arrays, standing in for their dataclasses
+for cls in udp_arrays.ARRAY_CLASSES.values():
+    key = (udp_protocol.PACKET_FORMAT, cls.PACKET_ID, protocol_registry.PACKET_VERSION)
+    DECODERS[key] = replace(DECODERS[key], decode=cls.decode)
+
+# (packet_format, packet_id, packet_version) -> number of packets nothing could decode
+unknown_packets = Counter()
+# (packet_format, packet_id, packet_version) -> number of packets the wrong length for their layout
+malformed_packets = Counter()
+# Key in malformed_packets of datagrams too short to hold a header
+RUNT = (None, None, None)
+
+
+def lookup(header: udp_protocol.Header, length: int):
+    """Decoder for the packet behind header, None (and counted) if there isn't one
+    or the packet is the wrong length for it"""
+    key = (header.packet_format, header.packet_id, header.packet_version)
+
+    entry = DECODERS.get(key)
+    if entry is None:
+        if not unknown_packets[key]:
+            logger.warning(
+                f"No decoder for packet format {key[0]} id {key[1]} v{key[2]}"
+            )
+        unknown_packets[key] += 1
+        return None
+
+    if length != entry.size:
+        # Decoding anyway would read the wrong bytes into every field
+        if not malformed_packets[key]:
+            logger.warning(
+                f"Packet format {key[0]} id {key[1]} v{key[2]} is {length} bytes, expected {entry.size}"
+            )
+        malformed_packets[key] += 1
+        return None
+
+    return entry.decode
+
+
+def runt(length: int) -> bool:
+    """True (and counted) if a datagram of length bytes can't hold a header"""
+    if length >= HEADER_SIZE:
+        return False
+    if not malformed_packets[RUNT]:
+        logger.warning(f"Packet is {length} bytes, shorter than a header")
+    malformed_packets[RUNT] += 1
+    return True
 
 
 def decode_udp(packet: bytes, length: int):
+    """(header, decoded packet), the packet None if it can't be decoded and both
+    None if there isn't even a header"""
+    if runt(length):
+        return (None, None)
+    # One view shared by the header and the body decode
+    mem = memoryview(packet)
+    header = udp_protocol.Header.decode(mem)
+
+    decode = lookup(header, length)
+    if decode is None:
+        return (header, None)
+
+    return (header, decode(mem))
+
+
+def publish_udp(table: StateTable, packet: bytes) -> bool:
+    """Store a raw packet in the state table, decoding is left to whoever reads it"""
+    if runt(len(packet)):
+        return False
     header = udp_protocol.Header.decode(packet)
-    match length:
-        case 1349:
-            values = udp_protocol.MotionPacket.decode(packet)
-        case 753:
-            values = udp_protocol.SessionPacket.decode(packet)
-        case 1285:
-            values = udp_protocol.LapdataPacket.decode(packet)
-        case 45:
-            values = udp_protocol.EventPacket.decode(packet)
-        case 1284:
-            values = udp_protocol.ParticipantsPacket.decode(packet)
-        case 1133:
-            values = udp_protocol.SetupPacket.decode(packet)
-        case 1352:
-            values = udp_protocol.TelemetryPacket.decode(packet)
-        case 1239:
-            values = udp_protocol.StatusPacket.decode(packet)
-        case 1042:
-            values = udp_protocol.ClassificationPacket.decode(packet)
-        case 954:
-            values = udp_protocol.LobbyPacket.decode(packet)
-        case 1041:
-            values = udp_protocol.DamagePacket.decode(packet)
-        case 1460:
-            values = udp_protocol.SessionHistoryPacket.decode(packet)
-        case 231:
-            values = udp_protocol.TyreSetsPacket.decode(packet)
-        case 273:
-            values = udp_protocol.TyreSetsPacket.decode(packet)
-        case 101:
-            values = udp_protocol.TimeTrialPacket.decode(packet)
-        case 1131:
-            values = udp_protocol.TimeTrialPacket.decode(packet)
-        case _:
-            values = None
-
-    return (header, values)
+
+    if lookup(header, len(packet)) is None:
+        return False
+
+    return table.publish(header.packet_id, packet)
 
 
 if __name__ == "__main__":
     receiver = Process(target=udp_receiver.udp_receiver, daemon=True)
     receiver.start()
 
-    queue = Queue()
-    process_named_shared_memory(output_queue=queue)
+    process_named_shared_memory()
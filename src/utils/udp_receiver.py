@@ -8,13 +8,14 @@
 ie sends them to shared memory"""
 
 import socket
-import struct
 import sys
-from multiprocessing import shared_memory
 
 from loguru import logger
 from rich.logging import RichHandler
 
+from utils import packet_ring
+from utils.packet_ring import MAX_DATAGRAM, PacketRing
+
 # Setup logger with RichHandler for better output
 logger.remove()
 logger.add(
@@ -33,34 +34,59 @@ logger.configure(
 )
 
 
+def open_socket(ip: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16 * 1024 * 1024)
+    sock.bind((ip, port))
+    return sock
+
+
+def receive_copy(sock, ring: PacketRing, batch_size: int) -> int:
+    """Original path: recvfrom allocates a fresh bytes per datagram which is then copied into the slot"""
+    data, addr = sock.recvfrom(MAX_DATAGRAM)
+    ring.write_payload[: len(data)] = data
+    ring.publish(len(data))
+    ring.notify()
+
+    return 1
+
+
+def receive_into(sock, ring: PacketRing, batch_size: int) -> int:
+    """Zero-copy path: the kernel writes each datagram straight into the next slot.
+    Python has no recvmmsg, so batching is done by blocking for the first datagram
+    and then draining whatever else is already queued with MSG_DONTWAIT"""
+    flags = 0
+    received = 0
+
+    while received < batch_size:
+        try:
+            length = sock.recv_into(ring.write_payload, MAX_DATAGRAM, flags)
+        except BlockingIOError:
+            break
+
+        ring.publish(length)
+        received += 1
+        flags = socket.MSG_DONTWAIT
+
+    # One wakeup per batch rather than per datagram
+    ring.notify()
+    return received
+
+
 def udp_receiver(
     port: int = 20127,
     ip: str = "0.0.0.0",
     shared_memory_name: str = "udp_queue",
-    shared_memory_size: int = 100 * 1024 * 1024,
+    slot_count: int = packet_ring.DEFAULT_SLOT_COUNT,
+    zero_copy: bool = True,
+    batch_size: int = 64,
 ):
-    # Create named shared memory visible to other programs
-    shm = shared_memory.SharedMemory(
-        create=True, size=shared_memory_size, name=shared_memory_name
-    )
+    # Create named shared memory visible to other programs, the geometry lives in its header
+    ring = PacketRing.create(shared_memory_name, slot_count=slot_count)
 
-    # Without offset, the code could not index into the correct position in the raw byte buffer to store packet metadata and payload separately.
-    # Simple header: [offset:4][length:4][ready:1] per packet slot
-    slot_size = 65535 + 9
-    max_slots = shared_memory_size // slot_size
-    write_idx = 0
+    receive = receive_into if zero_copy else receive_copy
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 16 * 1024 * 1024)
-    sock.bind((ip, port))
+    sock = open_socket(ip, port)
 
     while True:
-        data, addr = sock.recvfrom(65535)
-        offset = write_idx * slot_size
-
-        # Write atomically: length + data + ready flag
-        shm.buf[offset : offset + 4] = struct.pack("I", len(data))
-        shm.buf[offset + 4 : offset + 4 + len(data)] = data
-        shm.buf[offset + 4 + 65535] = 1  # Ready flag
-
-        write_idx = (write_idx + 1) % max_slots
+        receive(sock, ring, batch_size)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""#!/usr/bin/env -S uv run --script
+## Run this script using uv
+## init uv with `uv init && uv venv && source .venv/bin/activate`
+## Check `skeletons/tools/py` for a list of currently preferred tools
+"""
+
+"""Records the raw packet stream to disk alongside the TUI, as a second reader of
+the shared memory ring, in the `(length, packet)` per line format the tests and
+`test_layout` replay"""
+
+import argparse
+from pathlib import Path
+
+from loguru import logger
+
+from utils import packet_ring
+from utils.packet_ring import PacketRing
+
+
+def record(
+    filepath: str,
+    shared_memory_name: str = "udp_queue",
+    reader: int = packet_ring.RECORDER_READER,
+):
+    ring = PacketRing.attach(shared_memory_name, reader, "recorder")
+
+    try:
+        with Path(filepath).open("a") as f:
+            while True:
+                data = ring.read()
+
+                if data is not None:
+                    f.write(f"{(len(data), data)!r}\n")
+                else:
+                    # Only hit the disk when there's a lull
+                    f.flush()
+                    ring.wait(timeout=1.0)
+    finally:
+        logger.info(f"Recorder stopped: {ring.stats()['readers'].get(reader)}")
+        ring.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Record the raw packet stream from the shared memory ring to a capture file",
+        epilog="Run from `src/` with `python -m utils.udp_recorder race.log`",
+    )
+    parser.add_argument("filepath", help="capture file to append to, eg race.log")
+    parser.add_argument("--shared-memory-name", default="udp_queue")
+    args = parser.parse_args()
+
+    record(args.filepath, args.shared_memory_name)